@@ -2,6 +2,7 @@ from __future__ import division, print_function
 import copy
 
 import numpy as np
+import pandas as pd
 from scipy.special import gammaln
 
 from .utils import infer_parameters_from_function
@@ -48,6 +49,88 @@ class Likelihood(object):
         """
         return self.log_likelihood() - self.noise_log_likelihood()
 
+    @property
+    def timing_report(self):
+        """ The time spent in each stage of the likelihood evaluation, None
+        if the likelihood does not record it
+
+        Returns
+        -------
+        dict, None
+        """
+        return None
+
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        """ Calculate the log likelihood for many sets of parameters
+
+        Parameters which are not in `parameter_array` take their values from
+        `self.parameters`. This evaluates `log_likelihood` for each set of
+        parameters in turn, subclasses may overwrite it with a vectorized
+        implementation.
+
+        Parameters
+        ----------
+        parameter_array: array_like, pandas.DataFrame, dict
+            Either an array of shape (N, ndim), a DataFrame with a column
+            for each parameter, or a dictionary of arrays of length N
+        keys: list, optional
+            The names of the columns of an array, defaults to the keys of
+            `self.parameters`
+
+        Returns
+        -------
+        array_like: The N log likelihood values
+        """
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        original_parameters = {key: self.parameters[key] for key in samples
+                               if key in self.parameters}
+        log_l = np.zeros(number_of_samples)
+        try:
+            for ii in range(number_of_samples):
+                self.parameters.update(
+                    {key: samples[key][ii] for key in samples})
+                log_l[ii] = self.log_likelihood()
+        finally:
+            for key in samples:
+                if key in original_parameters:
+                    self.parameters[key] = original_parameters[key]
+                else:
+                    self.parameters.pop(key)
+        return log_l
+
+    def _parameter_batch(self, parameter_array, keys=None):
+        """ Convert a batch of parameters to a dictionary of arrays
+
+        Returns
+        -------
+        samples: dict
+            The arrays of parameter values
+        number_of_samples: int
+            The number of sets of parameters
+        """
+        if isinstance(parameter_array, pd.DataFrame):
+            samples = {key: parameter_array[key].values
+                       for key in parameter_array.columns}
+        elif isinstance(parameter_array, dict):
+            samples = {key: np.atleast_1d(parameter_array[key])
+                       for key in parameter_array}
+        else:
+            parameter_array = np.atleast_2d(parameter_array)
+            if keys is None:
+                keys = list(self.parameters.keys())
+            if parameter_array.shape[1] != len(keys):
+                raise ValueError(
+                    "parameter_array has {} columns but {} keys were "
+                    "given".format(parameter_array.shape[1], len(keys)))
+            samples = {key: parameter_array[:, ii]
+                       for ii, key in enumerate(keys)}
+        if len(samples) == 0:
+            raise ValueError("No parameters given")
+        lengths = set(len(samples[key]) for key in samples)
+        if len(lengths) != 1:
+            raise ValueError("All parameters must have the same length")
+        return samples, lengths.pop()
+
     @property
     def meta_data(self):
         try:
@@ -137,6 +220,30 @@ class Analytical1DLikelihood(Likelihood):
         """ Residual of the function against the data. """
         return self.y - self.func(self.x, **self.model_parameters)
 
+    def _model_batch(self, samples, number_of_samples):
+        """ Evaluate the function for a batch of parameters by broadcasting
+
+        The sampled parameters are passed to the function as columns, so a
+        function written with numpy operations returns an array with a row
+        for each set of parameters.
+
+        Returns
+        -------
+        array_like: The model of shape (number_of_samples, n), or None if the
+            function does not broadcast
+        """
+        model_parameters = dict()
+        for key in self.function_keys:
+            if key in samples:
+                model_parameters[key] = np.asarray(samples[key])[:, np.newaxis]
+            else:
+                model_parameters[key] = self.parameters[key]
+        try:
+            model = self.func(self.x, **model_parameters)
+            return np.broadcast_to(model, (number_of_samples, self.n))
+        except (TypeError, ValueError):
+            return None
+
 
 class GaussianLikelihood(Analytical1DLikelihood):
     def __init__(self, x, y, func, sigma=None):
@@ -173,6 +280,19 @@ class GaussianLikelihood(Analytical1DLikelihood):
                        np.log(2 * np.pi * self.sigma**2) / 2)
         return log_l
 
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        model = self._model_batch(samples, number_of_samples)
+        if model is None:
+            return Likelihood.log_likelihood_batch(self, samples)
+        if 'sigma' in samples:
+            sigma = np.asarray(samples['sigma'])[:, np.newaxis]
+        else:
+            sigma = self.sigma
+        residual = self.y - model
+        return np.sum(- (residual / sigma)**2 / 2 -
+                      np.log(2 * np.pi * sigma**2) / 2, axis=-1)
+
     def __repr__(self):
         return self.__class__.__name__ + '(x={}, y={}, func={}, sigma={})' \
             .format(self.x, self.y, self.func.__name__, self.sigma)
@@ -238,6 +358,19 @@ class PoissonLikelihood(Analytical1DLikelihood):
         else:
             return np.sum(-rate + self.y * np.log(rate) - gammaln(self.y + 1))
 
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        rate = self._model_batch(samples, number_of_samples)
+        if rate is None:
+            return Likelihood.log_likelihood_batch(self, samples)
+        if np.any(rate < 0.):
+            raise ValueError("Poisson rate function returns a negative value!")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_l = np.sum(-rate + self.y * np.log(rate) - gammaln(self.y + 1),
+                           axis=-1)
+        log_l[np.any(rate == 0., axis=-1)] = -np.inf
+        return log_l
+
     def __repr__(self):
         return Analytical1DLikelihood.__repr__(self)
 
@@ -281,6 +414,16 @@ class ExponentialLikelihood(Analytical1DLikelihood):
             return -np.inf
         return -np.sum(np.log(mu) + (self.y / mu))
 
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        mu = self._model_batch(samples, number_of_samples)
+        if mu is None:
+            return Likelihood.log_likelihood_batch(self, samples)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_l = -np.sum(np.log(mu) + (self.y / mu), axis=-1)
+        log_l[np.any(mu < 0., axis=-1)] = -np.inf
+        return log_l
+
     def __repr__(self):
         return Analytical1DLikelihood.__repr__(self)
 
@@ -349,6 +492,24 @@ class StudentTLikelihood(Analytical1DLikelihood):
                    gammaln((nu + 1) / 2) - gammaln(nu / 2))
         return log_l
 
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        model = self._model_batch(samples, number_of_samples)
+        if model is None:
+            return Likelihood.log_likelihood_batch(self, samples)
+        if 'nu' in samples:
+            nu = np.asarray(samples['nu'])[:, np.newaxis]
+        else:
+            nu = self.nu
+        if np.any(nu <= 0.):
+            raise ValueError("Number of degrees of freedom for Student's "
+                             "t-likelihood must be positive")
+        residual = self.y - model
+        return np.sum(
+            - (nu + 1) * np.log1p(self.lam * residual**2 / nu) / 2 +
+            np.log(self.lam / (nu * np.pi)) / 2 +
+            gammaln((nu + 1) / 2) - gammaln(nu / 2), axis=-1)
+
     def __repr__(self):
         base_string = '(x={}, y={}, func={}, nu={}, sigma={})'
         return self.__class__.__name__ + base_string.format(
@@ -153,6 +153,12 @@ def run_sampler(likelihood, priors=None, label='label', outdir='outdir',
     result.sampling_time = (end_time - start_time).total_seconds()
     logger.info('Sampling time: {}'.format(end_time - start_time))
 
+    timing_report = getattr(likelihood, 'timing_report', None)
+    if timing_report is not None:
+        if result.meta_data is None:
+            result.meta_data = dict()
+        result.meta_data['likelihood_timing'] = timing_report
+
     if sampler.use_ratio:
         result.log_noise_evidence = likelihood.noise_log_likelihood()
         result.log_bayes_factor = result.log_evidence
@@ -7,9 +7,16 @@ import argparse
 import traceback
 import inspect
 import subprocess
+from collections import defaultdict
+from timeit import default_timer
 
 import numpy as np
 
+try:
+    import scipy.fft as _scipy_fft
+except ImportError:
+    _scipy_fft = None
+
 logger = logging.getLogger('bilby')
 
 # Constants
@@ -17,6 +24,7 @@ logger = logging.getLogger('bilby')
 speed_of_light = 299792458.0  # speed of light in m/s
 parsec = 3.085677581 * 1e16
 solar_mass = 1.98855 * 1e30
+gravitational_constant = 6.67408 * 1e-11  # m^3 kg^-1 s^-2
 radius_of_earth = 6371 * 1e3  # metres
 
 
@@ -172,12 +180,12 @@ def gps_time_to_gmst(gps_time):
 
     Parameters
     -------
-    gps_time: float
+    gps_time: float, array_like
         gps time
 
     Returns
     -------
-    float: Greenwich mean sidereal time in radians
+    float, array_like: Greenwich mean sidereal time in radians
 
     """
     omega_earth = 2 * np.pi * (1 / 365.2425 + 1) / 86400.
@@ -185,7 +193,10 @@ def gps_time_to_gmst(gps_time):
     gmst_2000 = (6 + 39. / 60 + 51.251406103947375 / 3600) * np.pi / 12
     correction_2018 = -0.00017782487379358614
     sidereal_time = omega_earth * (gps_time - gps_2000) + gmst_2000 + correction_2018
-    gmst = fmod(sidereal_time, 2 * np.pi)
+    if isinstance(sidereal_time, float):
+        gmst = fmod(sidereal_time, 2 * np.pi)
+    else:
+        gmst = np.fmod(sidereal_time, 2 * np.pi)
     return gmst
 
 
@@ -288,20 +299,18 @@ def nfft(time_domain_strain, sampling_frequency):
         raise ValueError("Sampling frequency must be interger or float")
 
     # add one zero padding if time series doesn't have even number of samples
-    if np.mod(len(time_domain_strain), 2) == 1:
-        time_domain_strain = np.append(time_domain_strain, 0)
-    LL = len(time_domain_strain)
+    LL = len(time_domain_strain) + np.mod(len(time_domain_strain), 2)
     # frequency range
     frequency_array = sampling_frequency / 2 * np.linspace(0, 1, int(LL / 2 + 1))
 
     # calculate FFT
-    # rfft computes the fft for real inputs
-    frequency_domain_strain = np.fft.rfft(time_domain_strain)
+    # rfft computes the fft for real inputs, padding to LL samples
+    frequency_domain_strain = np.fft.rfft(time_domain_strain, n=LL)
 
     # normalise to units of strain / Hz
-    norm_frequency_domain_strain = frequency_domain_strain / sampling_frequency
+    frequency_domain_strain /= sampling_frequency
 
-    return norm_frequency_domain_strain, frequency_array
+    return frequency_domain_strain, frequency_array
 
 
 def infft(frequency_domain_strain, sampling_frequency):
@@ -329,6 +338,29 @@ def infft(frequency_domain_strain, sampling_frequency):
     return time_domain_strain
 
 
+def rfft(time_domain_strain, workers=None):
+    """ The FFT of real data along the last axis.
+
+    This uses `scipy.fft`, which can use several threads, if it is
+    available and `numpy.fft` otherwise.
+
+    Parameters
+    ----------
+    time_domain_strain: array_like
+        The real data, the FFT of each row of a 2D array is computed
+    workers: int, optional
+        The number of threads to use, the default is one. This is ignored
+        if `scipy.fft` is not available.
+
+    Returns
+    -------
+    array: The FFT of the data
+    """
+    if _scipy_fft is None:
+        return np.fft.rfft(time_domain_strain)
+    return _scipy_fft.rfft(time_domain_strain, workers=workers)
+
+
 def setup_logger(outdir=None, label=None, log_level='INFO', print_version=False):
     """ Setup logging output: call at the start of the script to use
 
@@ -692,6 +724,89 @@ def run_commandline(cl, log_level=20, raise_error=True, return_output=True):
         process.communicate()
 
 
+class StageTimer(object):
+    """ Cumulative wall time and number of calls of the named stages of a
+    calculation
+
+    Timing is opt-in, when the timer is disabled entering a stage does
+    nothing.
+
+    Example
+    -------
+    >>> timer = StageTimer(enabled=True)
+    >>> with timer('source_model'):
+    ...     waveform = source_model(frequencies, **parameters)
+    >>> timer.report
+    {'source_model': {'calls': 1, 'total_time': ..., 'mean_time': ...}}
+
+    Attributes
+    ----------
+    enabled: bool
+        Whether the stages are timed
+    total_time, calls: dict
+        The cumulative time in seconds and number of calls of each stage
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(enabled={})'.format(self.enabled)
+
+    def __call__(self, stage):
+        """ Context manager timing a stage """
+        if not self.enabled:
+            return _untimed_stage
+        return _TimedStage(self, stage)
+
+    def add(self, stage, time):
+        """ Record a single call of a stage which took `time` seconds """
+        self.total_time[stage] += time
+        self.calls[stage] += 1
+
+    def reset(self):
+        """ Clear the recorded times """
+        self.total_time = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    @property
+    def report(self):
+        """ The number of calls, total and mean time in seconds of each
+        stage """
+        return {stage: dict(calls=self.calls[stage],
+                            total_time=self.total_time[stage],
+                            mean_time=self.total_time[stage] / self.calls[stage])
+                for stage in self.calls}
+
+
+class _TimedStage(object):
+
+    def __init__(self, timer, stage):
+        self.timer = timer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, *args):
+        self.timer.add(self.stage, default_timer() - self.start)
+        return False
+
+
+class _UntimedStage(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_untimed_stage = _UntimedStage()
+
+
 #  Instantiate the default argument parser at runtime
 command_line_args, command_line_parser = set_up_command_line_arguments()
 #  Instantiate the default logging
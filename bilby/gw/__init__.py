@@ -1,5 +1,5 @@
-from . import (calibration, conversion, detector, likelihood, prior, series, source,
-               utils, waveform_generator)
+from . import (bessel, calibration, conversion, detector, likelihood, localization, prior, reduced_basis, search,
+               series, source, utils, waveform_generator)
 
 from .waveform_generator import WaveformGenerator
 from .likelihood import GravitationalWaveTransient
@@ -0,0 +1,46 @@
+"""
+The logarithm of the modified Bessel function used to marginalize the
+likelihood over the phase.
+"""
+from __future__ import division
+
+import math
+
+import numpy as np
+from scipy.special import i0e
+
+
+def ln_i0(value):
+    """ Natural logarithm of the zeroth order modified Bessel function of the
+    first kind, log(I_0(|value|))
+
+    This is evaluated directly from the exponentially scaled Bessel function
+    as log(i0e(x)) + x, so it does not overflow for large arguments. For small
+    arguments the leading terms of the series, x^2 / 4 - x^4 / 64 + x^6 / 576,
+    are used to avoid the cancellation between the two terms.
+
+    Parameters
+    ----------
+    value: float, array_like
+        The argument of the Bessel function
+
+    Returns
+    -------
+    float, array_like: log(I_0(|value|))
+    """
+    if np.ndim(value) == 0:
+        return _ln_i0_scalar(abs(value))
+    value = np.abs(value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(
+            value < 1e-2, value ** 2 / 4 - value ** 4 / 64 + value ** 6 / 576,
+            np.log(i0e(value)) + value)
+    return np.where(np.isinf(value), np.inf, result)
+
+
+def _ln_i0_scalar(value):
+    if value < 1e-2:
+        return value ** 2 / 4 - value ** 4 / 64 + value ** 6 / 576
+    elif math.isinf(value):
+        return np.inf
+    return math.log(i0e(value)) + value
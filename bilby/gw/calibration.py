@@ -45,6 +45,28 @@ class Recalibrate(object):
         self.set_calibration_parameters(**params)
         return np.ones_like(frequency_array)
 
+    def get_calibration_factor_batch(self, frequency_array, samples):
+        """Apply calibration model for many sets of parameters
+
+        Subclasses may overwrite this with a vectorized version
+
+        Parameters
+        ----------
+        frequency_array: array-like
+            The frequency values to calculate the calibration factor for.
+        samples: list
+            Dictionaries of sampling parameters which include calibration
+            parameters.
+
+        Returns
+        -------
+        calibration_factor : array-like
+            The factors to multiply the strain by, with shape
+            (len(samples), len(frequency_array)).
+        """
+        return np.array([self.get_calibration_factor(frequency_array, **sample)
+                         for sample in samples])
+
     def set_calibration_parameters(self, **params):
         self.params.update({key[len(self.prefix):]: params[key] for key in params
                             if self.prefix in key})
@@ -66,6 +88,11 @@ class CubicSpline(Recalibrate):
         This assumes the spline points follow
         np.logspace(np.log(minimum_frequency), np.log(maximum_frequency), n_points)
 
+        The splines are linear in the values at the spline points, unless
+        these are large enough for the spline to need interior knots, so the
+        calibration factor is computed by multiplying the values with a basis
+        matrix. The basis is computed once for each frequency array.
+
         Parameters
         ----------
         prefix: str
@@ -84,6 +111,11 @@ class CubicSpline(Recalibrate):
         self.minimum_frequency = minimum_frequency
         self.maximum_frequency = maximum_frequency
         self.__spline_points = np.logspace(np.log10(minimum_frequency), np.log10(maximum_frequency), n_points)
+        self._amplitude_keys = ['{}amplitude_{}'.format(self.prefix, ii) for ii in range(n_points)]
+        self._phase_keys = ['{}phase_{}'.format(self.prefix, ii) for ii in range(n_points)]
+        self._node_basis = self._spline_basis(self.spline_points)
+        self._basis_frequencies = None
+        self._basis = None
 
     @property
     def spline_points(self):
@@ -93,6 +125,62 @@ class CubicSpline(Recalibrate):
         return self.__class__.__name__ + '(prefix=\'{}\', minimum_frequency={}, maximum_frequency={}, n_points={})'\
             .format(self.prefix, self.minimum_frequency, self.maximum_frequency, self.n_points)
 
+    def _spline_basis(self, frequency_array):
+        """ The splines through unit values at each spline point evaluated
+        at the frequencies, with shape (len(frequency_array), n_points) """
+        return np.array([UnivariateSpline(self.spline_points, values)(frequency_array)
+                         for values in np.eye(self.n_points)]).T
+
+    def spline_basis(self, frequency_array):
+        """ The basis matrix of the splines on the frequencies, cached for
+        the last frequency array
+
+        Parameters
+        ----------
+        frequency_array: array-like
+            The frequency values to calculate the basis for.
+
+        Returns
+        -------
+        basis: array-like
+            The (len(frequency_array), n_points) basis matrix.
+        """
+        if self._basis_frequencies is None or \
+                self._basis_frequencies.shape != np.shape(frequency_array) or \
+                not np.array_equal(self._basis_frequencies, frequency_array):
+            self._basis_frequencies = np.array(frequency_array)
+            self._basis = self._spline_basis(self._basis_frequencies)
+        return self._basis
+
+    def _is_linear(self, values):
+        """ Whether UnivariateSpline fits the values at the spline points
+        without interior knots, i.e., the residual is below the default
+        smoothing factor, one per spline point """
+        residual = values - np.dot(values, self._node_basis.T)
+        return np.sum(residual ** 2, axis=-1) <= self.n_points
+
+    def _spline(self, frequency_array, values):
+        """ The splines through the rows of values on the frequencies """
+        splines = np.dot(values, self.spline_basis(frequency_array).T)
+        for ii in np.where(~self._is_linear(values))[0]:
+            splines[ii] = UnivariateSpline(self.spline_points, values[ii])(frequency_array)
+        return splines
+
+    def _calibration_parameters(self, samples):
+        """ The amplitude and phase values at the spline points for each
+        sample, with shape (len(samples), n_points) """
+        try:
+            amplitudes = [[sample[key] for key in self._amplitude_keys] for sample in samples]
+            phases = [[sample[key] for key in self._phase_keys] for sample in samples]
+        except KeyError:
+            amplitudes = []
+            phases = []
+            for sample in samples:
+                self.set_calibration_parameters(**sample)
+                amplitudes.append([self.params['amplitude_{}'.format(ii)] for ii in range(self.n_points)])
+                phases.append([self.params['phase_{}'.format(ii)] for ii in range(self.n_points)])
+        return np.array(amplitudes, dtype=float), np.array(phases, dtype=float)
+
     def get_calibration_factor(self, frequency_array, **params):
         """Apply calibration model
 
@@ -111,14 +199,28 @@ class CubicSpline(Recalibrate):
         calibration_factor : array-like
             The factor to multiply the strain by.
         """
-        self.set_calibration_parameters(**params)
-        amplitude_parameters = [self.params['amplitude_{}'.format(ii)] for ii in range(self.n_points)]
-        amplitude_spline = UnivariateSpline(self.spline_points, amplitude_parameters)
-        delta_amplitude = amplitude_spline(frequency_array)
+        return self.get_calibration_factor_batch(frequency_array, [params])[0]
 
-        phase_parameters = [self.params['phase_{}'.format(ii)] for ii in range(self.n_points)]
-        phase_spline = UnivariateSpline(self.spline_points, phase_parameters)
-        delta_phase = phase_spline(frequency_array)
+    def get_calibration_factor_batch(self, frequency_array, samples):
+        """Apply calibration model for many sets of parameters
+
+        Parameters
+        ----------
+        frequency_array: array-like
+            The frequency values to calculate the calibration factor for.
+        samples: list
+            Dictionaries of sampling parameters which include calibration
+            parameters.
+
+        Returns
+        -------
+        calibration_factor : array-like
+            The factors to multiply the strain by, with shape
+            (len(samples), len(frequency_array)).
+        """
+        amplitude_parameters, phase_parameters = self._calibration_parameters(samples)
+        delta_amplitude = self._spline(frequency_array, amplitude_parameters)
+        delta_phase = self._spline(frequency_array, phase_parameters)
 
         calibration_factor = (1 + delta_amplitude) * (2 + 1j * delta_phase) / (2 - 1j * delta_phase)
 
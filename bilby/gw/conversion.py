@@ -269,6 +269,220 @@ def convert_to_lal_binary_neutron_star_parameters(parameters):
     return converted_parameters, added_keys
 
 
+class CompiledParameterConversion(object):
+
+    def __init__(self, steps, keys):
+        """ A parameter conversion planned for a fixed set of keys
+
+        The branches of the conversion which apply to the keys are worked out
+        once, leaving a fixed sequence of functions of the parameters. This
+        avoids the copies and key tests of the conversion functions and works
+        for arrays of parameters.
+
+        Parameters
+        ----------
+        steps: list
+            The steps of the conversion, tuples of the names of the outputs,
+            the function and the names of its inputs
+        keys: iterable
+            The keys of the parameters the conversion is for
+        """
+        self.steps = list(steps)
+        self.keys = frozenset(keys)
+        self.added_keys = list()
+        for outputs, _, _ in self.steps:
+            self.added_keys += [key for key in outputs
+                                if key not in self.keys and key not in self.added_keys]
+
+    def __call__(self, parameters):
+        """
+        Parameters
+        ----------
+        parameters: dict
+            The parameters, the values can be floats or arrays
+
+        Return
+        ------
+        converted_parameters: dict
+            dict of the required parameters
+        added_keys: list
+            keys which are added to parameters during function call
+        """
+        converted_parameters = dict(parameters)
+        for outputs, function, inputs in self.steps:
+            values = function(*[converted_parameters[key] for key in inputs])
+            if len(outputs) == 1:
+                converted_parameters[outputs[0]] = values
+            else:
+                converted_parameters.update(zip(outputs, values))
+        return converted_parameters, list(self.added_keys)
+
+    def prune(self, required_keys):
+        """ The conversion without the steps which are not needed to compute
+        `required_keys`
+
+        Parameters
+        ----------
+        required_keys: iterable
+            The keys which are used after the conversion
+
+        Returns
+        -------
+        CompiledParameterConversion: The reduced conversion
+        """
+        needed = set(required_keys)
+        steps = list()
+        for step in reversed(self.steps):
+            outputs, _, inputs = step
+            if needed.intersection(outputs):
+                steps.insert(0, step)
+                needed.difference_update(outputs)
+                needed.update(inputs)
+        return CompiledParameterConversion(steps, self.keys)
+
+
+def compile_parameter_conversion(conversion, keys, required_keys=None):
+    """
+    Plan a parameter conversion for a fixed set of keys.
+
+    This supports `convert_to_lal_binary_black_hole_parameters` and
+    `convert_to_lal_binary_neutron_star_parameters`.
+
+    Parameters
+    ----------
+    conversion: func
+        The conversion function
+    keys: iterable
+        The keys of the parameters to convert
+    required_keys: iterable, optional
+        If given, only the steps needed to compute these keys are kept
+
+    Returns
+    -------
+    CompiledParameterConversion: The planned conversion, None if the
+        conversion function is not supported
+    """
+    keys = frozenset(keys)
+    if conversion is convert_to_lal_binary_black_hole_parameters:
+        steps = _binary_black_hole_conversion_steps(set(keys))
+    elif conversion is convert_to_lal_binary_neutron_star_parameters:
+        steps = _binary_neutron_star_conversion_steps(set(keys))
+    else:
+        return None
+    compiled = CompiledParameterConversion(steps, keys)
+    if required_keys is not None:
+        compiled = compiled.prune(required_keys)
+    return compiled
+
+
+def _binary_black_hole_conversion_steps(keys):
+    """ The steps of `convert_to_lal_binary_black_hole_parameters` for the
+    given keys, `keys` is updated with the keys which are added """
+    steps = list()
+
+    def add(outputs, function, inputs):
+        steps.append((outputs, function, inputs))
+        keys.update(outputs)
+
+    if 'chirp_mass' in keys:
+        if 'total_mass' in keys:
+            add(('symmetric_mass_ratio',),
+                chirp_mass_and_total_mass_to_symmetric_mass_ratio,
+                ('chirp_mass', 'total_mass'))
+        if 'symmetric_mass_ratio' in keys:
+            add(('mass_ratio',), symmetric_mass_ratio_to_mass_ratio,
+                ('symmetric_mass_ratio',))
+        if 'total_mass' not in keys:
+            add(('total_mass',), chirp_mass_and_mass_ratio_to_total_mass,
+                ('chirp_mass', 'mass_ratio'))
+        add(('mass_1', 'mass_2'),
+            total_mass_and_mass_ratio_to_component_masses,
+            ('mass_ratio', 'total_mass'))
+    elif 'total_mass' in keys:
+        if 'symmetric_mass_ratio' in keys:
+            add(('mass_ratio',), symmetric_mass_ratio_to_mass_ratio,
+                ('symmetric_mass_ratio',))
+        if 'mass_ratio' in keys:
+            add(('mass_1', 'mass_2'),
+                total_mass_and_mass_ratio_to_component_masses,
+                ('mass_ratio', 'total_mass'))
+        elif 'mass_1' in keys:
+            add(('mass_2',), np.subtract, ('total_mass', 'mass_1'))
+        elif 'mass_2' in keys:
+            add(('mass_1',), np.subtract, ('total_mass', 'mass_2'))
+    elif 'symmetric_mass_ratio' in keys:
+        add(('mass_ratio',), symmetric_mass_ratio_to_mass_ratio,
+            ('symmetric_mass_ratio',))
+        if 'mass_1' in keys:
+            add(('mass_2',), np.multiply, ('mass_1', 'mass_ratio'))
+        elif 'mass_2' in keys:
+            add(('mass_1',), np.divide, ('mass_2', 'mass_ratio'))
+    elif 'mass_ratio' in keys:
+        if 'mass_1' in keys:
+            add(('mass_2',), np.multiply, ('mass_1', 'mass_ratio'))
+        if 'mass_2' in keys:
+            add(('mass_1',), np.divide, ('mass_2', 'mass_ratio'))
+
+    for angle in ['tilt_1', 'tilt_2', 'iota']:
+        cos_angle = str('cos_' + angle)
+        if cos_angle in keys:
+            add((angle,), np.arccos, (cos_angle,))
+
+    if 'redshift' in keys:
+        add(('luminosity_distance',), redshift_to_luminosity_distance,
+            ('redshift',))
+    elif 'comoving_distance' in keys:
+        add(('luminosity_distance',), comoving_distance_to_luminosity_distance,
+            ('comoving_distance',))
+
+    return steps
+
+
+def _binary_neutron_star_conversion_steps(keys):
+    """ The steps of `convert_to_lal_binary_neutron_star_parameters` for the
+    given keys, `keys` is updated with the keys which are added """
+    steps = _binary_black_hole_conversion_steps(keys)
+
+    if not any([key in keys for key in
+                ['lambda_1', 'lambda_2', 'lambda_tilde', 'delta_lambda']]):
+        steps.append((('lambda_1', 'lambda_2'), _no_tidal_deformability, ()))
+        keys.update(['lambda_1', 'lambda_2'])
+        return steps
+
+    if 'delta_lambda' in keys:
+        steps.append((('lambda_1', 'lambda_2'),
+                      lambda_tilde_delta_lambda_to_lambda_1_lambda_2,
+                      ('lambda_tilde', 'delta_lambda', 'mass_1', 'mass_2')))
+        keys.update(['lambda_1', 'lambda_2'])
+    elif 'lambda_tilde' in keys:
+        steps.append((('lambda_1', 'lambda_2'),
+                      lambda_tilde_to_lambda_1_lambda_2,
+                      ('lambda_tilde', 'mass_1', 'mass_2')))
+        keys.update(['lambda_1', 'lambda_2'])
+    if 'lambda_2' not in keys:
+        steps.append((('lambda_2',), _lambda_2_from_lambda_1,
+                      ('lambda_1', 'mass_1', 'mass_2')))
+        keys.add('lambda_2')
+    elif 'lambda_1' in keys:
+        steps.append((('lambda_2',), _lambda_2_if_none,
+                      ('lambda_2', 'lambda_1', 'mass_1', 'mass_2')))
+    return steps
+
+
+def _no_tidal_deformability():
+    return 0, 0
+
+
+def _lambda_2_from_lambda_1(lambda_1, mass_1, mass_2):
+    return lambda_1 * mass_1**5 / mass_2**5
+
+
+def _lambda_2_if_none(lambda_2, lambda_1, mass_1, mass_2):
+    if lambda_2 is None:
+        return _lambda_2_from_lambda_1(lambda_1, mass_1, mass_2)
+    return lambda_2
+
+
 def total_mass_and_mass_ratio_to_component_masses(mass_ratio, total_mass):
     """
     Convert total mass and mass ratio of a binary to its component masses.
@@ -622,6 +836,14 @@ def _generate_all_cbc_parameters(sample, defaults, base_conversion,
     output_sample = generate_mass_parameters(output_sample)
     output_sample = generate_spin_parameters(output_sample)
     if likelihood is not None:
+        if likelihood.sky_marginalization:
+            output_sample = \
+                generate_sky_samples_from_marginalized_likelihood(
+                    output_sample, likelihood)
+        if likelihood.calibration_marginalization:
+            output_sample = \
+                generate_calibration_samples_from_marginalized_likelihood(
+                    output_sample, likelihood)
         if likelihood.distance_marginalization:
             output_sample = \
                 generate_distance_samples_from_marginalized_likelihood(
@@ -920,17 +1142,28 @@ def compute_snrs(sample, likelihood):
             all_interferometers = likelihood.interferometers
             matched_filter_snrs = {ifo.name: [] for ifo in all_interferometers}
             optimal_snrs = {ifo.name: [] for ifo in all_interferometers}
-            for ii in range(len(sample)):
-                signal_polarizations =\
-                    likelihood.waveform_generator.frequency_domain_strain(
-                        dict(sample.iloc[ii]))
-                for ifo in all_interferometers:
-                    signal = ifo.get_detector_response(
-                        signal_polarizations, sample.iloc[ii])
-                    matched_filter_snrs[ifo.name].append(
-                        ifo.matched_filter_snr_squared(signal=signal) ** 0.5)
-                    optimal_snrs[ifo.name].append(
-                        ifo.optimal_snr_squared(signal=signal) ** 0.5)
+            block_size = likelihood._batch_block_size
+            for start in range(0, len(sample), block_size):
+                block = sample.iloc[start:start + block_size]
+                block_polarizations =\
+                    likelihood.waveform_generator.frequency_domain_strain_batch(
+                        block)
+                for ii in range(len(block)):
+                    if block_polarizations is None:
+                        for ifo in all_interferometers:
+                            matched_filter_snrs[ifo.name].append(np.nan)
+                            optimal_snrs[ifo.name].append(np.nan)
+                        continue
+                    signal_polarizations = {
+                        mode: block_polarizations[mode][ii]
+                        for mode in block_polarizations}
+                    for ifo in all_interferometers:
+                        signal = ifo.get_detector_response(
+                            signal_polarizations, block.iloc[ii])
+                        matched_filter_snrs[ifo.name].append(
+                            ifo.matched_filter_snr_squared(signal=signal) ** 0.5)
+                        optimal_snrs[ifo.name].append(
+                            ifo.optimal_snr_squared(signal=signal) ** 0.5)
 
             for ifo in likelihood.interferometers:
                 sample['{}_matched_filter_snr'.format(ifo.name)] =\
@@ -944,6 +1177,151 @@ def compute_snrs(sample, likelihood):
         logger.debug('Not computing SNRs.')
 
 
+def generate_sky_samples_from_marginalized_likelihood(samples, likelihood):
+    """
+    Reconstruct the sky location posterior from a run which used a likelihood
+    which explicitly marginalised over the sky location.
+
+    For each sample a point of the sky grid is drawn with probability
+    proportional to the prior weight times the likelihood at that point, the
+    sky location is then drawn uniformly in right ascension and the sine of
+    the declination within the grid cell.
+
+    Parameters
+    ----------
+    samples: DataFrame, dict
+        Posterior from run with sky marginalisation turned on.
+    likelihood: bilby.gw.likelihood.GravitationalWaveTransient
+        Likelihood used during sampling.
+
+    Return
+    ------
+    sample: DataFrame, dict
+        Returns the posterior with ra and dec samples.
+    """
+    if not likelihood.sky_marginalization:
+        return samples
+    if isinstance(samples, dict):
+        samples = _generate_sky_sample_from_marginalized_likelihood(
+            samples, likelihood)
+    elif isinstance(samples, DataFrame):
+        sky_samples = [_generate_sky_sample_from_marginalized_likelihood(
+            dict(samples.iloc[ii]), likelihood) for ii in range(len(samples))]
+        for key in ['ra', 'dec']:
+            samples[key] = [sample[key] for sample in sky_samples]
+    return samples
+
+
+def _generate_sky_sample_from_marginalized_likelihood(sample, likelihood):
+    """
+    Generate a single sample from the posterior distribution for the sky
+    location when using a likelihood which explicitly marginalises over the
+    sky location.
+
+    Parameters
+    ----------
+    sample: dict
+        The set of parameters used with the marginalised likelihood.
+    likelihood: bilby.gw.likelihood.GravitationalWaveTransient
+        The likelihood used.
+
+    Returns
+    -------
+    sample: dict
+        Modifed dictionary with the sky location sampled from the posterior.
+    """
+    likelihood.parameters.update(sample)
+    signal_polarizations = \
+        likelihood.waveform_generator.frequency_domain_strain(sample)
+    sky_log_like = likelihood._sky_grid_log_likelihood_ratio(
+        signal_polarizations)
+    sky_post = np.exp(sky_log_like - max(sky_log_like)) *\
+        likelihood._sky_prior_weights
+    index = np.random.choice(len(sky_post), p=sky_post / np.sum(sky_post))
+    sample['ra'] = np.mod(
+        likelihood._sky_ra[index] +
+        np.random.uniform(-0.5, 0.5) * likelihood._sky_delta_ra, 2 * np.pi)
+    sample['dec'] = np.arcsin(np.clip(
+        np.sin(likelihood._sky_dec[index]) +
+        np.random.uniform(-0.5, 0.5) * likelihood._sky_delta_sin_dec, -1, 1))
+    return sample
+
+
+def generate_calibration_samples_from_marginalized_likelihood(
+        samples, likelihood):
+    """
+    Reconstruct the calibration posterior from a run which used a likelihood
+    which explicitly marginalised over the calibration uncertainty.
+
+    For each sample one of the calibration response curves drawn by the
+    likelihood is chosen with probability proportional to the likelihood
+    and the calibration parameters of that draw are assigned.
+
+    Parameters
+    ----------
+    samples: DataFrame, dict
+        Posterior from run with calibration marginalisation turned on.
+    likelihood: bilby.gw.likelihood.GravitationalWaveTransient
+        Likelihood used during sampling.
+
+    Return
+    ------
+    sample: DataFrame, dict
+        Returns the posterior with the calibration parameters.
+    """
+    if not likelihood.calibration_marginalization:
+        return samples
+    if isinstance(samples, dict):
+        samples = _generate_calibration_sample_from_marginalized_likelihood(
+            samples, likelihood)
+    elif isinstance(samples, DataFrame):
+        calibration_samples = [
+            _generate_calibration_sample_from_marginalized_likelihood(
+                dict(samples.iloc[ii]), likelihood)
+            for ii in range(len(samples))]
+        for name in likelihood._calibration_draws:
+            for key in likelihood._calibration_draws[name]:
+                samples[key] = [sample[key] for sample in calibration_samples]
+    return samples
+
+
+def _generate_calibration_sample_from_marginalized_likelihood(
+        sample, likelihood):
+    """
+    Generate a single sample from the posterior distribution for the
+    calibration parameters when using a likelihood which explicitly
+    marginalises over the calibration uncertainty.
+
+    Parameters
+    ----------
+    sample: dict
+        The set of parameters used with the marginalised likelihood.
+    likelihood: bilby.gw.likelihood.GravitationalWaveTransient
+        The likelihood used.
+
+    Returns
+    -------
+    sample: dict
+        Modifed dictionary with the calibration parameters sampled from the
+        posterior.
+    """
+    likelihood.parameters.update(sample)
+    signal_polarizations = \
+        likelihood.waveform_generator.frequency_domain_strain(sample)
+    calibration_log_like = likelihood._calibration_log_likelihood_ratio(
+        signal_polarizations)
+    calibration_post = np.exp(
+        calibration_log_like - max(calibration_log_like))
+    index = np.random.choice(
+        len(calibration_post),
+        p=calibration_post / np.sum(calibration_post))
+    for name in likelihood._calibration_draws:
+        draws = likelihood._calibration_draws[name]
+        for key in draws:
+            sample[key] = draws[key][index]
+    return sample
+
+
 def generate_distance_samples_from_marginalized_likelihood(samples, likelihood):
     """
     Reconstruct the distance posterior from a run which used a likelihood which
@@ -1,7 +1,9 @@
 from __future__ import division, print_function, absolute_import
 
+import hashlib
 import os
 import sys
+from collections import defaultdict
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -124,6 +126,98 @@ class InterferometerList(list):
 
         return all_injection_polarizations
 
+    @property
+    def detector_tensors(self):
+        """ The (n_interferometers, 3, 3) array of the detector tensors """
+        return np.array([interferometer.detector_tensor for interferometer in self])
+
+    @property
+    def vertices(self):
+        """ The (n_interferometers, 3) array of the vertex positions """
+        return np.array([interferometer.vertex for interferometer in self])
+
+    def antenna_response(self, ra, dec, time, psi, modes=None):
+        """ The antenna response of all the interferometers for arrays of sky
+        locations, see `bilby.gw.utils.get_antenna_response`
+
+        Parameters
+        ----------
+        ra, dec, time, psi: float, array_like
+            The right ascension, declination, geocentric GPS time and
+            polarisation angle
+        modes: list, optional
+            The polarisation modes, by default plus, cross, breathing,
+            longitudinal, x and y
+
+        Returns
+        -------
+        dict: The (n_interferometers,) + the shape of the sky locations arrays
+            of antenna responses for each mode
+        """
+        if self.response_table is not None and modes is not None and \
+                all(mode.lower() in ['plus', 'cross'] for mode in modes):
+            responses = self.response_table.network_response(ra, dec, time, psi, modes)
+            responses.pop('time_delay')
+            return responses
+        return gwutils.get_antenna_response(self.detector_tensors, ra, dec, time, psi, modes)
+
+    def time_delay_from_geocenter(self, ra, dec, time):
+        """ The time delay from the geocenter of all the interferometers for
+        arrays of sky locations
+
+        Parameters
+        ----------
+        ra, dec, time: float, array_like
+            The right ascension, declination and GPS time
+
+        Returns
+        -------
+        array_like: The (n_interferometers,) + the shape of the sky locations
+            array of time delays in seconds
+        """
+        if self.response_table is not None:
+            return self.response_table.network_response(ra, dec, time, 0, modes=[])['time_delay']
+        return gwutils.time_delay_geocentric(self.vertices, np.zeros(3), ra, dec, time)
+
+    @property
+    def response_table(self):
+        """ The `AntennaResponseTable` used by the interferometers, None if
+        the exact antenna responses and time delays are used """
+        tables = [interferometer.response_table for interferometer in self]
+        if len(tables) > 0 and all(table is not None and table is tables[0] for table in tables):
+            return tables[0]
+        return None
+
+    def enable_antenna_response_table(self, resolution=0.5, filename=None):
+        """ Interpolate the plus and cross antenna responses and the time
+        delays from an `AntennaResponseTable` rather than computing them
+
+        The table is loaded from `filename` if it exists and was made for the
+        same detector geometry and resolution, otherwise it is computed and
+        saved. By default the table is only kept in memory.
+
+        Parameters
+        ----------
+        resolution: float, optional
+            The grid spacing in degrees, see `AntennaResponseTable` for the
+            accuracy
+        filename: str, optional
+            The table file, e.g., in the output directory of the run
+
+        Returns
+        -------
+        AntennaResponseTable: The table
+        """
+        table = AntennaResponseTable(self, resolution=resolution, filename=filename)
+        for ii, interferometer in enumerate(self):
+            interferometer.set_antenna_response_table(table, ii)
+        return table
+
+    def disable_antenna_response_table(self):
+        """ Compute the antenna responses and time delays exactly """
+        for interferometer in self:
+            interferometer.set_antenna_response_table(None)
+
     def save_data(self, outdir, label=None):
         """ Creates a save file for the data in plain text format
 
@@ -258,6 +352,387 @@ class InterferometerList(list):
         return res
 
 
+class DerivedArrayCache(object):
+    """ Cache of arrays derived from the static data of a detector
+
+    Arrays such as the frequency mask, the masked strain and the interpolated
+    power spectral density are the same on every likelihood evaluation. They
+    are computed once and stored until either `invalidate` is called or one
+    of the dependencies passed to `get` changes. The cached arrays are
+    returned as they are, so changes made to them in place persist until the
+    cache is invalidated.
+
+    Attributes
+    ----------
+    hits, misses: dict
+        The number of times each array was returned from, or added to, the
+        cache
+    version: int
+        Incremented every time the cache is invalidated
+    """
+
+    def __init__(self):
+        self._arrays = dict()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.version = 0
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(keys={})'.format(sorted(self._arrays))
+
+    def get(self, key, function, dependencies=()):
+        """ Return the cached array, computing it if needed
+
+        Parameters
+        ----------
+        key: str
+            The name of the array
+        function: callable
+            Function without arguments returning the array
+        dependencies: tuple, optional
+            Values the array depends on, the array is recomputed if these
+            differ from those of the cached array
+
+        Returns
+        -------
+        array_like: The cached array
+        """
+        if key in self._arrays:
+            cached_dependencies, array = self._arrays[key]
+            if cached_dependencies == dependencies:
+                self.hits[key] += 1
+                return array
+        self.misses[key] += 1
+        array = function()
+        self._arrays[key] = (dependencies, array)
+        return array
+
+    def invalidate(self, *keys):
+        """ Remove arrays from the cache
+
+        Parameters
+        ----------
+        *keys: str
+            The names of the arrays to remove, if none are given the whole
+            cache is cleared
+        """
+        if len(keys) == 0:
+            self._arrays.clear()
+        for key in keys:
+            self._arrays.pop(key, None)
+        self.version += 1
+
+    @property
+    def statistics(self):
+        """ The number of cache hits and misses for each array """
+        return {key: dict(hits=self.hits[key], misses=self.misses[key])
+                for key in set(self.hits) | set(self.misses)}
+
+
+class AntennaResponseTable(object):
+    """ The plus and cross antenna patterns and the time delays from the
+    geocenter of a network of detectors tabulated over the sky
+
+    The table uses Earth fixed coordinates, the declination and the hour angle
+    `ra - gmst`, at `psi=0`. Looking up a sky location and time is a bilinear
+    interpolation, and the polarisation angle is applied analytically,
+
+        F_plus(psi) = F_plus(0) cos(2 psi) + F_cross(0) sin(2 psi)
+        F_cross(psi) = F_cross(0) cos(2 psi) - F_plus(0) sin(2 psi).
+
+    The interpolation error is at most h^2 / 8 times the largest second
+    derivative on a grid with spacing h in radians. With the default spacing
+    of 0.5 degrees this is ~4e-5 for the antenna patterns and ~4e-7 s
+    (~2e-3 rad at 1 kHz) for the time delays, the largest errors at random
+    sky locations are measured when the table is made, see `maximum_errors`.
+
+    If a file is given the table is saved to it, together with a hash of the
+    detector geometry and the resolution, and memory mapped, so it is only
+    computed once and is shared by processes using the same file. A file made
+    for other detectors or another resolution is replaced. Unpickling a table
+    loaded from a file maps the file again rather than copying the table.
+
+    Attributes
+    ----------
+    names: list
+        The names of the detectors
+    resolution: float
+        The grid spacing in degrees
+    table: array_like
+        The (n_declinations, n_hour_angles, 3, n_detectors) array of the plus
+        and cross antenna patterns at psi=0 and time delays
+    maximum_errors: dict
+        The largest errors of the antenna patterns and time delays at random
+        sky locations, None for tables loaded from files
+    """
+
+    _number_of_test_points = 10000
+    _test_point_seed = 1234
+
+    def __init__(self, interferometers, resolution=0.5, filename=None):
+        """
+        Parameters
+        ----------
+        interferometers: list
+            The interferometers, or an `InterferometerList`
+        resolution: float, optional
+            The grid spacing in degrees
+        filename: str, optional
+            The file to save the table to or load it from. By default, or if
+            the file can not be written, the table is kept in memory.
+        """
+        self.names = [interferometer.name for interferometer in interferometers]
+        self.resolution = resolution
+        self._detector_tensors = np.array(
+            [interferometer.detector_tensor for interferometer in interferometers])
+        self._vertices = np.array([interferometer.vertex for interferometer in interferometers])
+        self._number_of_declinations = int(round(180. / resolution)) + 1
+        self._number_of_hour_angles = int(round(360. / resolution)) + 1
+        self._declination_spacing = np.pi / (self._number_of_declinations - 1)
+        self._hour_angle_spacing = 2 * np.pi / (self._number_of_hour_angles - 1)
+        self.maximum_errors = None
+        self.filename = filename
+        self._set_table(self._load())
+        if self.table is None:
+            self._set_table(self._create_table())
+            self.maximum_errors = self._measure_errors()
+            if self.filename is not None:
+                self._save()
+                loaded = self._load()
+                if loaded is not None:
+                    self._set_table(loaded)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(names={}, resolution={}, filename={})'.format(
+            self.names, self.resolution, self.filename)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(self.table, np.memmap):
+            state['table'] = None
+            state['_values'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.table is None:
+            self._set_table(self._load())
+            if self.table is None:
+                self._set_table(self._create_table())
+
+    def _set_table(self, table):
+        """ Set the table, `_values` is a plain array view of it which is
+        faster to index than a memory map """
+        self.table = table
+        self._values = None if table is None else np.asarray(table)
+
+    @property
+    def _hash(self):
+        """ Hash of the detector geometry and resolution """
+        settings = hashlib.sha1(self._detector_tensors.tobytes())
+        settings.update(self._vertices.tobytes())
+        settings.update(repr(self.resolution).encode())
+        return settings.hexdigest()
+
+    @property
+    def _shape(self):
+        return (self._number_of_declinations, self._number_of_hour_angles, 3, len(self.names))
+
+    def _create_table(self):
+        """ Compute the antenna patterns and time delays on the grid """
+        declinations = np.linspace(-np.pi / 2, np.pi / 2, self._number_of_declinations)
+        hour_angles = np.linspace(0, 2 * np.pi, self._number_of_hour_angles)
+        declinations, hour_angles = np.meshgrid(declinations, hour_angles, indexing='ij')
+        ra, dec, time = self._sky_location(hour_angles, declinations)
+        responses = gwutils.get_antenna_response(
+            self._detector_tensors, ra, dec, time, 0, ['plus', 'cross'])
+        time_delays = gwutils.time_delay_geocentric(
+            self._vertices, np.zeros(3), ra, dec, time)
+        return np.ascontiguousarray(np.transpose(
+            [responses['plus'], responses['cross'], time_delays], (2, 3, 0, 1)))
+
+    @staticmethod
+    def _sky_location(hour_angles, declinations):
+        """ The right ascension, declination and time of hour angles """
+        time = 0.
+        return hour_angles + utils.gps_time_to_gmst(time), declinations, time
+
+    def _measure_errors(self):
+        """ The largest interpolation errors at random sky locations, drawn
+        with a private random state so the global one is left alone """
+        random_state = np.random.RandomState(self._test_point_seed)
+        ra = random_state.uniform(0, 2 * np.pi, self._number_of_test_points)
+        dec = np.arcsin(random_state.uniform(-1, 1, self._number_of_test_points))
+        time = random_state.uniform(1e9, 2e9, self._number_of_test_points)
+        psi = random_state.uniform(0, np.pi, self._number_of_test_points)
+        expected = gwutils.get_antenna_response(
+            self._detector_tensors, ra, dec, time, psi, ['plus', 'cross'])
+        expected['time_delay'] = gwutils.time_delay_geocentric(
+            self._vertices, np.zeros(3), ra, dec, time)
+        actual = self.network_response(ra, dec, time, psi)
+        errors = dict()
+        for ii, name in enumerate(self.names):
+            for key in ['plus', 'cross', 'time_delay']:
+                errors[(name, key)] = float(np.max(abs(actual[key][ii] - expected[key][ii])))
+        return errors
+
+    def _load(self):
+        """ Memory map the table file, None if there is no file or it was
+        made for other detectors or another resolution
+
+        The file is the hash of the detector geometry and resolution followed
+        by the table in the `.npy` format.
+        """
+        if self.filename is None or not os.path.isfile(self.filename):
+            return None
+        expected_hash = self._hash.encode()
+        try:
+            with open(self.filename, 'rb') as file:
+                file_hash = file.read(len(expected_hash))
+                if file_hash != expected_hash:
+                    logger.info('Antenna response table {} was made for other detectors or another '
+                                'resolution, rebuilding.'.format(self.filename))
+                    return None
+                if np.lib.format.read_magic(file) == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+                offset = file.tell()
+            table = np.memmap(self.filename, dtype=dtype, mode='r', shape=shape,
+                              order='F' if fortran_order else 'C', offset=offset)
+        except (IOError, ValueError) as e:
+            logger.warning('Unable to load antenna response table {}: {}'.format(self.filename, e))
+            return None
+        if table.shape != self._shape:
+            logger.info('Antenna response table {} has shape {} rather than {}, rebuilding.'
+                        .format(self.filename, table.shape, self._shape))
+            return None
+        logger.info('Loaded antenna response table from {}.'.format(self.filename))
+        return table
+
+    def _save(self):
+        """ Save the table, replacing any existing file atomically so that
+        processes sharing the file never see a partial table """
+        temporary_filename = '{}.{}.tmp'.format(self.filename, os.getpid())
+        try:
+            with open(temporary_filename, 'wb') as file:
+                file.write(self._hash.encode())
+                np.lib.format.write_array(file, self.table)
+            os.rename(temporary_filename, self.filename)
+        except (IOError, OSError) as e:
+            logger.warning('Unable to save antenna response table to {}: {}'.format(self.filename, e))
+
+    def _weights(self, ra, dec, time):
+        """ The indices of the grid cells containing the sky locations and the
+        fractional positions in the cells """
+        if all(isinstance(value, (int, float)) for value in [ra, dec, time]):
+            hour_angle = ((ra - utils.gps_time_to_gmst(time)) % (2 * np.pi)) / self._hour_angle_spacing
+            declination = (dec + np.pi / 2) / self._declination_spacing
+            jj = min(int(hour_angle), self._number_of_hour_angles - 2)
+            ii = min(int(declination), self._number_of_declinations - 2)
+        else:
+            hour_angle = np.mod(ra - utils.gps_time_to_gmst(time), 2 * np.pi) / self._hour_angle_spacing
+            declination = (np.asarray(dec) + np.pi / 2) / self._declination_spacing
+            jj = np.minimum(hour_angle.astype(int), self._number_of_hour_angles - 2)
+            ii = np.minimum(declination.astype(int), self._number_of_declinations - 2)
+            ii, jj = np.broadcast_arrays(ii, jj)
+        return ii, jj, hour_angle - jj, declination - ii
+
+    def _interpolate(self, weights, quantities=slice(None), index=slice(None)):
+        """ Bilinear interpolation of the table, the quantities and detectors
+        are the leading axes of the result """
+        ii, jj, xx, yy = weights
+        if isinstance(ii, int):
+            cell = self._values[ii:ii + 2, jj:jj + 2, quantities, index]
+            coefficients = np.array([(1 - yy) * (1 - xx), (1 - yy) * xx, yy * (1 - xx), yy * xx])
+            return np.dot(coefficients, cell.reshape(4, -1)).reshape(cell.shape[2:])[()]
+        values = self._values[:, :, quantities, index]
+        block_shape = values.shape[2:]
+        values = values.reshape((-1,) + block_shape)
+        corner = ii * self._number_of_hour_angles + jj
+        extra_dimensions = len(block_shape)
+        xx = np.reshape(xx, xx.shape + (1,) * extra_dimensions)
+        yy = np.reshape(yy, yy.shape + (1,) * extra_dimensions)
+        interpolated = (
+            (1 - yy) * ((1 - xx) * np.take(values, corner, axis=0) +
+                        xx * np.take(values, corner + 1, axis=0)) +
+            yy * ((1 - xx) * np.take(values, corner + self._number_of_hour_angles, axis=0) +
+                  xx * np.take(values, corner + self._number_of_hour_angles + 1, axis=0)))
+        if extra_dimensions == 0:
+            return interpolated
+        return np.moveaxis(interpolated, list(range(-extra_dimensions, 0)), list(range(extra_dimensions)))
+
+    @staticmethod
+    def _rotate(plus, cross, psi, mode):
+        """ The antenna response for polarisation angle psi from those at
+        psi=0 """
+        cos_2psi = np.cos(2 * psi)
+        sin_2psi = np.sin(2 * psi)
+        if mode.lower() == 'plus':
+            return plus * cos_2psi + cross * sin_2psi
+        elif mode.lower() == 'cross':
+            return cross * cos_2psi - plus * sin_2psi
+        raise ValueError("The antenna response table only contains the plus and cross modes")
+
+    def antenna_response(self, index, ra, dec, time, psi, mode):
+        """ The interpolated antenna response
+
+        Parameters
+        ----------
+        index: int
+            The index of the detector
+        ra, dec, time, psi: float, array_like
+            The right ascension, declination, geocentric GPS time and
+            polarisation angle
+        mode: str
+            The polarisation mode, plus or cross
+
+        Returns
+        -------
+        float, array_like: The antenna response
+        """
+        plus, cross = self._interpolate(self._weights(ra, dec, time), slice(0, 2), index)
+        return self._rotate(plus, cross, psi, mode)
+
+    def time_delay(self, index, ra, dec, time):
+        """ The interpolated time delay from the geocenter
+
+        Parameters
+        ----------
+        index: int
+            The index of the detector
+        ra, dec, time: float, array_like
+            The right ascension, declination and GPS time
+
+        Returns
+        -------
+        float, array_like: The time delay in seconds
+        """
+        return self._interpolate(self._weights(ra, dec, time), 2, index)
+
+    def network_response(self, ra, dec, time, psi, modes=('plus', 'cross')):
+        """ The interpolated antenna responses and time delays of all the
+        detectors
+
+        Parameters
+        ----------
+        ra, dec, time, psi: float, array_like
+            The right ascension, declination, geocentric GPS time and
+            polarisation angle
+        modes: iterable, optional
+            The polarisation modes, plus and/or cross
+
+        Returns
+        -------
+        dict: The (n_detectors,) + the shape of the sky locations arrays of
+            antenna responses for each mode and time delays, `time_delay`
+        """
+        plus, cross, time_delay = self._interpolate(self._weights(ra, dec, time))
+        responses = {mode: self._rotate(plus, cross, psi, mode) for mode in modes}
+        responses['time_delay'] = time_delay
+        return responses
+
+
 class InterferometerStrainData(object):
     """ Strain data for an interferometer """
 
@@ -279,6 +754,7 @@ class InterferometerStrainData(object):
             This corresponds to alpha * duration / 2 for scipy tukey window.
 
         """
+        self._cache = DerivedArrayCache()
         self.minimum_frequency = minimum_frequency
         self.maximum_frequency = maximum_frequency
         self.roll_off = roll_off
@@ -330,6 +806,19 @@ class InterferometerStrainData(object):
         else:
             return True
 
+    @property
+    def cache_statistics(self):
+        """ The number of cache hits and misses of the derived arrays """
+        return self._cache.statistics
+
+    def invalidate_cache(self):
+        """ Clear the cached frequency mask and masked strain
+
+        This is done automatically when the data is set through the public
+        interface.
+        """
+        self._cache.invalidate()
+
     @property
     def minimum_frequency(self):
         return self.__minimum_frequency
@@ -337,6 +826,7 @@ class InterferometerStrainData(object):
     @minimum_frequency.setter
     def minimum_frequency(self, minimum_frequency):
         self.__minimum_frequency = minimum_frequency
+        self._cache.invalidate()
 
     @property
     def maximum_frequency(self):
@@ -349,17 +839,55 @@ class InterferometerStrainData(object):
     @maximum_frequency.setter
     def maximum_frequency(self, maximum_frequency):
         self.__maximum_frequency = maximum_frequency
+        self._cache.invalidate()
 
     @property
     def frequency_mask(self):
         """Masking array for limiting the frequency band.
 
+        The mask is cached until the frequencies or the frequency bounds
+        change.
+
         Returns
         -------
         array_like: An array of boolean values
         """
-        return ((self.frequency_array > self.minimum_frequency) &
-                (self.frequency_array < self.maximum_frequency))
+        return self._cache.get(
+            'frequency_mask',
+            lambda: ((self.frequency_array > self.minimum_frequency) &
+                     (self.frequency_array < self.maximum_frequency)),
+            dependencies=(self.minimum_frequency, self.maximum_frequency))
+
+    @property
+    def frequency_slice(self):
+        """ Slice selecting the frequencies between the frequency bounds
+
+        The frequency array is sorted, so the frequencies selected by
+        `frequency_mask` are contiguous and the in-band arrays are views.
+
+        Returns
+        -------
+        slice: The slice of in-band frequencies
+        """
+        return self._cache.get(
+            'frequency_slice', self._calculate_frequency_slice,
+            dependencies=(self.minimum_frequency, self.maximum_frequency))
+
+    def _calculate_frequency_slice(self):
+        indices = np.flatnonzero(self.frequency_mask)
+        if len(indices) == 0:
+            return slice(0, 0)
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+
+    @property
+    def in_band_frequency_array(self):
+        """ The frequencies between the frequency bounds in Hz """
+        return self.frequency_array[self.frequency_slice]
+
+    @property
+    def in_band_frequency_domain_strain(self):
+        """ The frequency domain strain between the frequency bounds """
+        return self.frequency_domain_strain[self.frequency_slice]
 
     @property
     def alpha(self):
@@ -415,7 +943,7 @@ class InterferometerStrainData(object):
         time domain data, divided by the sampling frequency.
         """
         if self._frequency_domain_strain is not None:
-            return self._frequency_domain_strain * self.frequency_mask
+            return self._masked_frequency_domain_strain()
         elif self._time_domain_strain is not None:
             logger.info("Generating frequency domain strain from given time "
                         "domain strain.")
@@ -425,10 +953,25 @@ class InterferometerStrainData(object):
             window = self.time_domain_window()
             self._frequency_domain_strain, self.frequency_array = utils.nfft(
                 self._time_domain_strain * window, self.sampling_frequency)
-            return self._frequency_domain_strain * self.frequency_mask
+            return self._masked_frequency_domain_strain()
         else:
             raise ValueError("frequency domain strain data not yet set")
 
+    def _masked_frequency_domain_strain(self):
+        return self._cache.get(
+            'frequency_domain_strain',
+            lambda: self._frequency_domain_strain * self.frequency_mask,
+            dependencies=(self.minimum_frequency, self.maximum_frequency))
+
+    @property
+    def _frequency_domain_strain(self):
+        return self.__frequency_domain_strain
+
+    @_frequency_domain_strain.setter
+    def _frequency_domain_strain(self, frequency_domain_strain):
+        self.__frequency_domain_strain = frequency_domain_strain
+        self._cache.invalidate('frequency_domain_strain')
+
     @frequency_domain_strain.setter
     def frequency_domain_strain(self, frequency_domain_strain):
         if not len(self.frequency_array) == len(frequency_domain_strain):
@@ -437,7 +980,7 @@ class InterferometerStrainData(object):
 
     def add_to_frequency_domain_strain(self, x):
         """Deprecated"""
-        self._frequency_domain_strain += x
+        self._frequency_domain_strain = self._frequency_domain_strain + x
 
     def low_pass_filter(self, filter_freq=None):
         """ Low pass filter the data """
@@ -769,6 +1312,7 @@ class InterferometerStrainData(object):
         self._times_and_frequencies = CoupledTimeAndFrequencySeries(duration=duration,
                                                                     sampling_frequency=sampling_frequency,
                                                                     start_time=start_time)
+        self._cache.invalidate()
 
     @property
     def sampling_frequency(self):
@@ -777,6 +1321,7 @@ class InterferometerStrainData(object):
     @sampling_frequency.setter
     def sampling_frequency(self, sampling_frequency):
         self._times_and_frequencies.sampling_frequency = sampling_frequency
+        self._cache.invalidate()
 
     @property
     def duration(self):
@@ -785,6 +1330,7 @@ class InterferometerStrainData(object):
     @duration.setter
     def duration(self, duration):
         self._times_and_frequencies.duration = duration
+        self._cache.invalidate()
 
     @property
     def start_time(self):
@@ -793,6 +1339,7 @@ class InterferometerStrainData(object):
     @start_time.setter
     def start_time(self, start_time):
         self._times_and_frequencies.start_time = start_time
+        self._cache.invalidate()
 
     @property
     def frequency_array(self):
@@ -802,6 +1349,7 @@ class InterferometerStrainData(object):
     @frequency_array.setter
     def frequency_array(self, frequency_array):
         self._times_and_frequencies.frequency_array = frequency_array
+        self._cache.invalidate()
 
     @property
     def time_array(self):
@@ -811,11 +1359,15 @@ class InterferometerStrainData(object):
     @time_array.setter
     def time_array(self, time_array):
         self._times_and_frequencies.time_array = time_array
+        self._cache.invalidate()
 
 
 class Interferometer(object):
     """Class for the Interferometer """
 
+    response_table = None
+    _response_table_index = 0
+
     def __init__(self, name, power_spectral_density, minimum_frequency, maximum_frequency,
                  length, latitude, longitude, elevation, xarm_azimuth, yarm_azimuth,
                  xarm_tilt=0., yarm_tilt=0., calibration_model=Recalibrate()):
@@ -852,7 +1404,19 @@ class Interferometer(object):
         calibration_model: Recalibration
             Calibration model, this applies the calibration correction to the
             template, the default model applies no correction.
-        """
+
+        Attributes
+        ----------
+        timer: bilby.core.utils.StageTimer
+            Records the time spent computing the antenna response, the time
+            shift and the calibration in `get_detector_response`, if enabled.
+            This is disabled by default.
+        response_table: AntennaResponseTable
+            The table the plus and cross antenna responses and the time delay
+            are interpolated from, see `set_antenna_response_table`. None by
+            default, when they are computed exactly.
+        """
+        self.timer = utils.StageTimer()
         self.__x_updated = False
         self.__y_updated = False
         self.__vertex_updated = False
@@ -867,6 +1431,7 @@ class Interferometer(object):
         self.yarm_azimuth = yarm_azimuth
         self.xarm_tilt = xarm_tilt
         self.yarm_tilt = yarm_tilt
+        self._cache = DerivedArrayCache()
         self.power_spectral_density = power_spectral_density
         self.calibration_model = calibration_model
         self._strain_data = InterferometerStrainData(
@@ -899,6 +1464,43 @@ class Interferometer(object):
                     float(self.elevation), float(self.xarm_azimuth), float(self.yarm_azimuth), float(self.xarm_tilt),
                     float(self.yarm_tilt))
 
+    @property
+    def power_spectral_density(self):
+        """ A bilby.gw.detector.PowerSpectralDensity instance """
+        return self._power_spectral_density
+
+    @power_spectral_density.setter
+    def power_spectral_density(self, power_spectral_density):
+        self._power_spectral_density = power_spectral_density
+        self._cache.invalidate()
+
+    @property
+    def cache_statistics(self):
+        """ The number of cache hits and misses of the derived arrays
+
+        This includes the arrays cached by the strain data.
+        """
+        statistics = self.strain_data.cache_statistics
+        statistics.update(self._cache.statistics)
+        return statistics
+
+    def invalidate_cache(self):
+        """ Clear the cached power spectral density and strain data arrays
+
+        This is done automatically when the data, the power spectral density
+        or the frequency bounds are set through the public interface. Call
+        this after modifying a cached array in place to recompute it.
+        """
+        self._cache.invalidate()
+        self.strain_data.invalidate_cache()
+
+    def _cached_spectral_density(self, key, function):
+        dependencies = (
+            self.power_spectral_density.power_spectral_density_interpolated,
+            self.strain_data.window_factor, self.strain_data._cache,
+            self.strain_data._cache.version)
+        return self._cache.get(key, function, dependencies=dependencies)
+
     @property
     def minimum_frequency(self):
         return self.strain_data.minimum_frequency
@@ -1233,26 +1835,49 @@ class Interferometer(object):
 
         Parameters
         -------
-        ra: float
+        ra: float, array_like
             right ascension in radians
-        dec: float
+        dec: float, array_like
             declination in radians
-        time: float
+        time: float, array_like
             geocentric GPS time
-        psi: float
+        psi: float, array_like
             binary polarisation angle counter-clockwise about the direction of propagation
         mode: str
             polarisation mode (e.g. 'plus', 'cross')
 
         Returns
         -------
-        array_like: A 3x3 array representation of the antenna response for the specified mode
+        float, array_like: The antenna response for the specified mode, an
+            array for arrays of sky locations
 
         """
+        if self.response_table is not None and mode.lower() in ['plus', 'cross']:
+            return self.response_table.antenna_response(
+                self._response_table_index, ra, dec, time, psi, mode)
         polarization_tensor = gwutils.get_polarization_tensor(ra, dec, time, psi, mode)
-        return np.einsum('ij,ij->', self.detector_tensor, polarization_tensor)
+        return np.einsum('ij,...ij->...', self.detector_tensor, polarization_tensor)
+
+    def set_antenna_response_table(self, table, index=0):
+        """ Interpolate the plus and cross antenna responses and the time
+        delay from an `AntennaResponseTable`, see
+        `InterferometerList.enable_antenna_response_table`
 
-    def get_detector_response(self, waveform_polarizations, parameters):
+        Parameters
+        ----------
+        table: AntennaResponseTable, None
+            The table, None to compute the responses exactly
+        index: int, optional
+            The index of this interferometer in the table
+        """
+        if table is not None and table.names[index] != self.name:
+            raise ValueError("Entry {} of the antenna response table is {}, not {}".format(
+                index, table.names[index], self.name))
+        self.response_table = table
+        self._response_table_index = index
+
+    def get_detector_response(self, waveform_polarizations, parameters,
+                              frequencies=None, in_band=False, calibrate=True):
         """ Get the detector response for a particular waveform
 
         Parameters
@@ -1261,35 +1886,59 @@ class Interferometer(object):
             polarizations of the waveform
         parameters: dict
             parameters describing position and time of arrival of the signal
+        frequencies: array_like, optional
+            The frequencies at which the waveform polarizations are evaluated.
+            If not given, the polarizations are assumed to be evaluated on
+            `self.frequency_array` and the frequency mask is applied.
+            Passing `self.in_band_frequency_array` gives the in-band response.
+        in_band: bool, optional
+            If true, the polarizations evaluated on `self.frequency_array` are
+            sliced to the in-band frequencies and the response is returned on
+            `self.in_band_frequency_array`.
+        calibrate: bool, optional
+            If false, the calibration model is not applied, e.g., when the
+            likelihood marginalizes over the calibration uncertainty.
 
         Returns
         -------
         array_like: A 3x3 array representation of the detector response (signal observed in the interferometer)
         """
-        signal = {}
-        for mode in waveform_polarizations.keys():
-            det_response = self.antenna_response(
+        if in_band:
+            frequencies = self.in_band_frequency_array
+            waveform_polarizations = {
+                mode: waveform_polarizations[mode][..., self.frequency_slice]
+                for mode in waveform_polarizations}
+
+        with self.timer('antenna_response'):
+            signal = {}
+            for mode in waveform_polarizations.keys():
+                det_response = self.antenna_response(
+                    parameters['ra'],
+                    parameters['dec'],
+                    parameters['geocent_time'],
+                    parameters['psi'], mode)
+
+                signal[mode] = waveform_polarizations[mode] * det_response
+            signal_ifo = sum(signal.values())
+
+        if frequencies is None:
+            frequencies = self.frequency_array
+            signal_ifo *= self.strain_data.frequency_mask
+
+        with self.timer('time_shift'):
+            time_shift = self.time_delay_from_geocenter(
                 parameters['ra'],
                 parameters['dec'],
-                parameters['geocent_time'],
-                parameters['psi'], mode)
-
-            signal[mode] = waveform_polarizations[mode] * det_response
-        signal_ifo = sum(signal.values())
-
-        signal_ifo *= self.strain_data.frequency_mask
-
-        time_shift = self.time_delay_from_geocenter(
-            parameters['ra'],
-            parameters['dec'],
-            self.strain_data.start_time)
-        dt = parameters['geocent_time'] + time_shift - self.strain_data.start_time
+                self.strain_data.start_time)
+            dt = parameters['geocent_time'] + time_shift - self.strain_data.start_time
 
-        signal_ifo = signal_ifo * np.exp(
-            -1j * 2 * np.pi * dt * self.frequency_array)
+            signal_ifo = signal_ifo * np.exp(
+                -1j * 2 * np.pi * dt * frequencies)
 
-        signal_ifo *= self.calibration_model.get_calibration_factor(
-            self.frequency_array, prefix='recalib_{}_'.format(self.name), **parameters)
+        if calibrate:
+            with self.timer('calibration'):
+                signal_ifo *= self.calibration_model.get_calibration_factor(
+                    frequencies, prefix='recalib_{}_'.format(self.name), **parameters)
 
         return signal_ifo
 
@@ -1415,7 +2064,9 @@ class Interferometer(object):
         array_like: An array representation of the ASD
 
         """
-        return self.power_spectral_density_array ** 0.5
+        return self._cached_spectral_density(
+            'amplitude_spectral_density_array',
+            lambda: self.power_spectral_density_array ** 0.5)
 
     @property
     def power_spectral_density_array(self):
@@ -1428,8 +2079,10 @@ class Interferometer(object):
         array_like: An array representation of the PSD
 
         """
-        return (self.power_spectral_density.power_spectral_density_interpolated(self.frequency_array) *
-                self.strain_data.window_factor)
+        return self._cached_spectral_density(
+            'power_spectral_density_array',
+            lambda: (self.power_spectral_density.power_spectral_density_interpolated(self.frequency_array) *
+                     self.strain_data.window_factor))
 
     @property
     def frequency_array(self):
@@ -1444,6 +2097,26 @@ class Interferometer(object):
         """ The frequency domain strain in units of strain / Hz """
         return self.strain_data.frequency_domain_strain
 
+    @property
+    def frequency_slice(self):
+        return self.strain_data.frequency_slice
+
+    @property
+    def in_band_frequency_array(self):
+        """ The frequencies between the frequency bounds in Hz """
+        return self.strain_data.in_band_frequency_array
+
+    @property
+    def in_band_frequency_domain_strain(self):
+        """ The frequency domain strain between the frequency bounds in units
+        of strain / Hz """
+        return self.strain_data.in_band_frequency_domain_strain
+
+    @property
+    def in_band_power_spectral_density_array(self):
+        """ The power spectral density between the frequency bounds """
+        return self.power_spectral_density_array[self.frequency_slice]
+
     @property
     def time_domain_strain(self):
         """ The time domain strain in units of s """
@@ -1472,6 +2145,8 @@ class Interferometer(object):
         -------
         float: The time delay from geocenter in seconds
         """
+        if self.response_table is not None:
+            return self.response_table.time_delay(self._response_table_index, ra, dec, time)
         return gwutils.time_delay_geocentric(self.vertex, np.array([0, 0, 0]), ra, dec, time)
 
     def vertex_position_geocentric(self):
@@ -1487,38 +2162,52 @@ class Interferometer(object):
         """
         return gwutils.get_vertex_position_geocentric(self.__latitude, self.__longitude, self.__elevation)
 
-    def optimal_snr_squared(self, signal):
+    def optimal_snr_squared(self, signal, in_band=False):
         """
 
         Parameters
         ----------
         signal: array_like
             Array containing the signal
+        in_band: bool, optional
+            If true, the signal is evaluated on `self.in_band_frequency_array`
 
         Returns
         -------
         float: The optimal signal to noise ratio possible squared
         """
+        if in_band:
+            power_spectral_density = self.in_band_power_spectral_density_array
+        else:
+            power_spectral_density = self.power_spectral_density_array
         return gwutils.optimal_snr_squared(signal=signal,
-                                           power_spectral_density=self.power_spectral_density_array,
+                                           power_spectral_density=power_spectral_density,
                                            duration=self.strain_data.duration)
 
-    def matched_filter_snr_squared(self, signal):
+    def matched_filter_snr_squared(self, signal, in_band=False):
         """
 
         Parameters
         ----------
         signal: array_like
             Array containing the signal
+        in_band: bool, optional
+            If true, the signal is evaluated on `self.in_band_frequency_array`
 
         Returns
         -------
         float: The matched filter signal to noise ratio squared
 
         """
+        if in_band:
+            frequency_domain_strain = self.in_band_frequency_domain_strain
+            power_spectral_density = self.in_band_power_spectral_density_array
+        else:
+            frequency_domain_strain = self.frequency_domain_strain
+            power_spectral_density = self.power_spectral_density_array
         return gwutils.matched_filter_snr_squared(signal=signal,
-                                                  frequency_domain_strain=self.frequency_domain_strain,
-                                                  power_spectral_density=self.power_spectral_density_array,
+                                                  frequency_domain_strain=frequency_domain_strain,
+                                                  power_spectral_density=power_spectral_density,
                                                   duration=self.strain_data.duration)
 
     @property
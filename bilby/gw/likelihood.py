@@ -1,20 +1,25 @@
 from __future__ import division
+import hashlib
+import os
+
 import numpy as np
-from scipy.interpolate import interp2d, interp1d
+from past.builtins import basestring
+from scipy.interpolate import RegularGridInterpolator
 
 try:
     from scipy.special import logsumexp
 except ImportError:
     from scipy.misc import logsumexp
-from scipy.special import i0e
 
 from ..core import likelihood
-from ..core.utils import logger
-from ..core.prior import Prior, Uniform
+from ..core.utils import (logger, gravitational_constant, solar_mass,
+                          speed_of_light, StageTimer)
+from ..core.prior import DeltaFunction, Prior, PriorDict, Uniform
+from .bessel import ln_i0
 from .detector import InterferometerList
 from .prior import BBHPriorDict
 from .source import lal_binary_black_hole
-from .utils import noise_weighted_inner_product
+from .utils import get_antenna_response, noise_weighted_inner_product
 from .waveform_generator import WaveformGenerator
 
 
@@ -46,6 +51,35 @@ class GravitationalWaveTransient(likelihood.Likelihood):
         This is done analytically using a Bessel function.
     priors: dict, optional
         If given, used in the distance and phase marginalization.
+    distance_marginalization_lookup_table: str, optional
+        The file to store the distance marginalization lookup table in. The
+        table is reused if the file was built for the same distance prior,
+        phase marginalization and grid size, otherwise it is rebuilt and the
+        file overwritten. By default the table is only kept in memory.
+    sky_marginalization: bool, optional
+        If true, marginalize over the sky location in the likelihood. The
+        likelihood is evaluated on a fixed grid of sky locations, reusing a
+        single waveform, and summed weighted by the ra and dec priors. This
+        can not be combined with time marginalization. The sky locations can
+        be reconstructed with
+        `bilby.gw.conversion.generate_sky_samples_from_marginalized_likelihood`.
+    sky_marginalization_resolution: float, optional
+        The spacing of the sky grid in degrees, in right ascension and at
+        the equator in declination. The grid needs to resolve the sky
+        localisation, loud signals seen by several detectors may need finer
+        grids than the default of one degree (~40000 points).
+    calibration_marginalization: bool, optional
+        If true, marginalize over the calibration uncertainty in the
+        likelihood. `number_of_response_curves` calibration response curves
+        are drawn from the `recalib_` priors of each detector when the
+        likelihood is set up and the likelihood is averaged over them. This
+        can not be combined with time or sky marginalization. The calibration
+        parameters can be reconstructed with
+        `bilby.gw.conversion.generate_calibration_samples_from_marginalized_likelihood`.
+    number_of_response_curves: int, optional
+        The number of calibration response curves to average over. The
+        curves take 24 bytes per curve and in-band frequency for each
+        detector, e.g., ~200 MB for 1000 curves and 8000 frequencies.
 
     Returns
     -------
@@ -55,19 +89,49 @@ class GravitationalWaveTransient(likelihood.Likelihood):
 
     """
 
+    _batch_block_size = 100
+    _sky_marginalization_oversampling = 4
+    _lookup_table_shape = (400, 800)
+    _number_of_distances = 10000
+    _lookup_table_block_size = 100
+    _lookup_table_chunk_size = int(1e7)
+
     def __init__(self, interferometers, waveform_generator, time_marginalization=False, distance_marginalization=False,
-                 phase_marginalization=False, priors=None):
+                 phase_marginalization=False, priors=None, distance_marginalization_lookup_table=None,
+                 sky_marginalization=False, sky_marginalization_resolution=1.,
+                 calibration_marginalization=False, number_of_response_curves=1000):
 
         self.waveform_generator = waveform_generator
         likelihood.Likelihood.__init__(self, dict())
         self.interferometers = InterferometerList(interferometers)
+        self.timer = StageTimer()
         self.time_marginalization = time_marginalization
         self.distance_marginalization = distance_marginalization
         self.phase_marginalization = phase_marginalization
+        self.sky_marginalization = sky_marginalization
+        self.calibration_marginalization = calibration_marginalization
         self.priors = priors
         self._check_set_duration_and_sampling_frequency_of_waveform_generator()
         self.meta_data = self.interferometers.meta_data
 
+        if self.sky_marginalization:
+            if self.time_marginalization:
+                raise ValueError("Sky marginalization can not be combined with time marginalization")
+            self._check_prior_is_set(key='ra')
+            self._check_prior_is_set(key='dec')
+            self._setup_sky_marginalization(sky_marginalization_resolution)
+            priors['ra'] = float(0)
+            priors['dec'] = float(0)
+
+        if self.calibration_marginalization:
+            if self.time_marginalization or self.sky_marginalization:
+                raise ValueError("Calibration marginalization can not be combined with time or sky marginalization")
+            self._setup_calibration_marginalization(number_of_response_curves)
+            for name in self._calibration_draws:
+                for key in self._calibration_draws[name]:
+                    if isinstance(self.priors[key], Prior) and not isinstance(self.priors[key], DeltaFunction):
+                        priors[key] = float(0)
+
         if self.time_marginalization:
             self._check_prior_is_set(key='geocent_time')
             self._setup_time_marginalization()
@@ -75,15 +139,14 @@ class GravitationalWaveTransient(likelihood.Likelihood):
 
         if self.phase_marginalization:
             self._check_prior_is_set(key='phase')
-            self._bessel_function_interped = None
-            self._setup_phase_marginalization()
             priors['phase'] = float(0)
 
         if self.distance_marginalization:
             self._check_prior_is_set(key='luminosity_distance')
             self._distance_array = np.linspace(self.priors['luminosity_distance'].minimum,
-                                               self.priors['luminosity_distance'].maximum, int(1e4))
-            self._setup_distance_marginalization()
+                                               self.priors['luminosity_distance'].maximum,
+                                               self._number_of_distances)
+            self._setup_distance_marginalization(distance_marginalization_lookup_table)
             priors['luminosity_distance'] = float(self._ref_dist)
 
     def __repr__(self):
@@ -92,6 +155,36 @@ class GravitationalWaveTransient(likelihood.Likelihood):
             .format(self.interferometers, self.waveform_generator, self.time_marginalization,
                     self.distance_marginalization, self.phase_marginalization, self.priors)
 
+    def enable_timing(self, enabled=True):
+        """ Record the time spent in each stage of the likelihood evaluation
+
+        A single `bilby.core.utils.StageTimer` is shared by the likelihood,
+        the waveform generator and the interferometers. It records the
+        parameter conversion and source model calls, the antenna response,
+        time shift and calibration of the detector response, the inner
+        products and the marginalization. The times are summarised by
+        `timing_report`.
+
+        Parameters
+        ----------
+        enabled: bool, optional
+            Whether to time the stages, timing can be switched off again
+            with `enable_timing(False)`
+        """
+        self.timer.enabled = enabled
+        self.waveform_generator.timer = self.timer
+        for interferometer in self.interferometers:
+            interferometer.timer = self.timer
+
+    @property
+    def timing_report(self):
+        """ The number of calls, total and mean time in seconds of each
+        stage of the likelihood evaluation, None unless `enable_timing` has
+        been called """
+        if not self.timer.enabled and len(self.timer.calls) == 0:
+            return None
+        return self.timer.report
+
     def _check_set_duration_and_sampling_frequency_of_waveform_generator(self):
         """ Check the waveform_generator has the same duration and
         sampling_frequency as the interferometers. If they are unset, then
@@ -134,7 +227,8 @@ class GravitationalWaveTransient(likelihood.Likelihood):
         if priors is not None:
             self.__prior = priors.copy()
         elif any([self.time_marginalization, self.phase_marginalization,
-                  self.distance_marginalization]):
+                  self.distance_marginalization, self.sky_marginalization,
+                  self.calibration_marginalization]):
             raise ValueError("You can't use a marginalized likelihood without specifying a priors")
         else:
             self.__prior = None
@@ -143,9 +237,9 @@ class GravitationalWaveTransient(likelihood.Likelihood):
         log_l = 0
         for interferometer in self.interferometers:
             log_l -= noise_weighted_inner_product(
-                interferometer.frequency_domain_strain,
-                interferometer.frequency_domain_strain,
-                interferometer.power_spectral_density_array,
+                interferometer.in_band_frequency_domain_strain,
+                interferometer.in_band_frequency_domain_strain,
+                interferometer.in_band_power_spectral_density_array,
                 self.waveform_generator.duration) / 2
         return log_l.real
 
@@ -156,62 +250,196 @@ class GravitationalWaveTransient(likelihood.Likelihood):
         if waveform_polarizations is None:
             return np.nan_to_num(-np.inf)
 
+        if self.sky_marginalization:
+            log_l = self._sky_grid_log_likelihood_ratio(waveform_polarizations)
+            with self.timer('marginalization'):
+                return logsumexp(log_l, b=self._sky_prior_weights)
+
+        if self.calibration_marginalization:
+            log_l = self._calibration_log_likelihood_ratio(waveform_polarizations)
+            with self.timer('marginalization'):
+                return logsumexp(log_l) - np.log(len(log_l))
+
         matched_filter_snr_squared = 0
         optimal_snr_squared = 0
-        matched_filter_snr_squared_tc_array = np.zeros(
-            self.interferometers.frequency_array[0:-1].shape,
-            dtype=np.complex128)
+        integrands = []
         for interferometer in self.interferometers:
             signal_ifo = interferometer.get_detector_response(
-                waveform_polarizations, self.parameters)
+                waveform_polarizations, self.parameters, in_band=True)
 
-            matched_filter_snr_squared += interferometer.matched_filter_snr_squared(signal=signal_ifo)
-            optimal_snr_squared += interferometer.optimal_snr_squared(signal=signal_ifo)
+            with self.timer('inner_products'):
+                matched_filter_snr_squared += interferometer.matched_filter_snr_squared(
+                    signal=signal_ifo, in_band=True)
+                optimal_snr_squared += interferometer.optimal_snr_squared(
+                    signal=signal_ifo, in_band=True)
             if self.time_marginalization:
-                matched_filter_snr_squared_tc_array +=\
-                    4 / self.waveform_generator.duration * np.fft.fft(
-                        signal_ifo[0:-1] *
-                        interferometer.frequency_domain_strain.conjugate()[0:-1] /
-                        interferometer.power_spectral_density_array[0:-1])
+                # the Nyquist bin is never in band, so the in-band
+                # frequencies lie within the first N - 1 bins
+                integrands.append((
+                    interferometer.frequency_slice,
+                    signal_ifo *
+                    interferometer.in_band_frequency_domain_strain.conjugate() /
+                    interferometer.in_band_power_spectral_density_array))
 
         if self.time_marginalization:
+            matched_filter_snr_squared_tc_array =\
+                self._time_marginalized_matched_filter_snr_squared(integrands)
+        else:
+            matched_filter_snr_squared_tc_array = None
 
-            if self.distance_marginalization:
-                rho_mf_ref_tc_array, rho_opt_ref = self._setup_rho(
-                    matched_filter_snr_squared_tc_array, optimal_snr_squared)
-                if self.phase_marginalization:
-                    dist_marged_log_l_tc_array = self._interp_dist_margd_loglikelihood(
-                        abs(rho_mf_ref_tc_array), rho_opt_ref)
-                    log_l = logsumexp(dist_marged_log_l_tc_array,
-                                      b=self.time_prior_array)
-                else:
-                    dist_marged_log_l_tc_array = self._interp_dist_margd_loglikelihood(
-                        rho_mf_ref_tc_array.real, rho_opt_ref)
-                    log_l = logsumexp(dist_marged_log_l_tc_array,
-                                      b=self.time_prior_array)
-            elif self.phase_marginalization:
-                log_l = logsumexp(self._bessel_function_interped(abs(
-                    matched_filter_snr_squared_tc_array)),
-                    b=self.time_prior_array) - optimal_snr_squared / 2
-            else:
-                log_l = logsumexp(
-                    matched_filter_snr_squared_tc_array.real,
-                    b=self.time_prior_array) - optimal_snr_squared / 2
+        return self._log_likelihood_ratio_from_snrs(
+            matched_filter_snr_squared, optimal_snr_squared,
+            matched_filter_snr_squared_tc_array)
+
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        """ Calculate the log likelihood for many sets of parameters
 
-        elif self.distance_marginalization:
-            rho_mf_ref, rho_opt_ref = self._setup_rho(matched_filter_snr_squared, optimal_snr_squared)
-            if self.phase_marginalization:
-                rho_mf_ref = abs(rho_mf_ref)
-            log_l = self._interp_dist_margd_loglikelihood(rho_mf_ref.real, rho_opt_ref)[0]
+        The waveform for each set of parameters is generated in turn, the
+        detector responses and inner products are then evaluated for blocks
+        of samples at once. With time, distance, sky or calibration
+        marginalization each set of parameters is evaluated in turn.
+
+        Parameters
+        ----------
+        parameter_array: array_like, pandas.DataFrame, dict
+            Either an array of shape (N, ndim), a DataFrame with a column
+            for each parameter, or a dictionary of arrays of length N
+        keys: list, optional
+            The names of the columns of an array, defaults to the keys of
+            `self.parameters`
+
+        Returns
+        -------
+        array_like: The N log likelihood values
+        """
+        samples, number_of_samples = self._parameter_batch(parameter_array, keys)
+        if self.time_marginalization or self.distance_marginalization or self.sky_marginalization or \
+                self.calibration_marginalization:
+            return likelihood.Likelihood.log_likelihood_batch(self, samples)
+
+        log_l = np.zeros(number_of_samples)
+        for start in range(0, number_of_samples, self._batch_block_size):
+            parameters = []
+            for ii in range(start, min(start + self._batch_block_size, number_of_samples)):
+                sample = self.parameters.copy()
+                sample.update({key: samples[key][ii] for key in samples})
+                parameters.append(sample)
+            log_l[start:start + len(parameters)] = self._log_likelihood_ratio_block(parameters)
+        return log_l + self.noise_log_likelihood()
+
+    def _log_likelihood_ratio_block(self, parameters):
+        """ Vectorized log likelihood ratio for a list of parameter dictionaries """
+        log_l = np.full(len(parameters), np.nan_to_num(-np.inf))
+        polarizations = self.waveform_generator.frequency_domain_strain_batch(
+            {key: [sample[key] for sample in parameters] for key in parameters[0]})
+        if polarizations is None:
+            return log_l
+        modes = list(polarizations.keys())
+        valid = np.where(np.all([np.all(np.isfinite(polarizations[mode]), axis=1)
+                                 for mode in modes], axis=0))[0]
+        if len(valid) == 0:
+            return log_l
+        parameters = [parameters[ii] for ii in valid]
+        polarizations = {mode: polarizations[mode][valid] for mode in modes}
+        ra, dec, geocent_time, psi = [np.array([sample[key] for sample in parameters])
+                                      for key in ['ra', 'dec', 'geocent_time', 'psi']]
 
-        elif self.phase_marginalization:
-            matched_filter_snr_squared = self._bessel_function_interped(abs(matched_filter_snr_squared))
-            log_l = matched_filter_snr_squared - optimal_snr_squared / 2
+        matched_filter_snr_squared = 0
+        optimal_snr_squared = 0
+        for interferometer in self.interferometers:
+            frequency_slice = interferometer.frequency_slice
+            frequencies = interferometer.in_band_frequency_array
+            antenna_response = get_antenna_response(
+                interferometer.detector_tensor, ra, dec, geocent_time, psi, modes)
+            signal = 0
+            for mode in modes:
+                signal = signal + polarizations[mode][:, frequency_slice] * antenna_response[mode][:, np.newaxis]
+
+            time_shift = interferometer.time_delay_from_geocenter(
+                ra, dec, interferometer.strain_data.start_time)
+            dt = geocent_time + time_shift - interferometer.strain_data.start_time
+            signal = signal * np.exp(
+                -1j * 2 * np.pi * dt[:, np.newaxis] * frequencies)
+            signal = signal * interferometer.calibration_model.get_calibration_factor_batch(
+                frequencies, parameters)
+
+            duration = interferometer.strain_data.duration
+            psd = interferometer.in_band_power_spectral_density_array
+            matched_filter_snr_squared = matched_filter_snr_squared + 4 / duration * np.sum(
+                np.conj(signal) * interferometer.in_band_frequency_domain_strain / psd, axis=-1)
+            optimal_snr_squared = optimal_snr_squared + 4 / duration * np.sum(
+                abs(signal) ** 2 / psd, axis=-1)
 
+        if self.phase_marginalization:
+            log_l[valid] = (ln_i0(abs(matched_filter_snr_squared)) -
+                            optimal_snr_squared / 2)
         else:
-            log_l = matched_filter_snr_squared.real - optimal_snr_squared / 2
+            log_l[valid] = matched_filter_snr_squared.real - optimal_snr_squared / 2
+        return log_l
 
-        return log_l.real
+    def _log_likelihood_ratio_from_snrs(
+            self, matched_filter_snr_squared, optimal_snr_squared,
+            matched_filter_snr_squared_tc_array=None):
+        """ Combine the network matched filter and optimal SNRs into the log
+        likelihood ratio, applying any requested marginalization
+
+        Parameters
+        ----------
+        matched_filter_snr_squared: complex, array_like
+            The network matched filter SNR squared
+        optimal_snr_squared: float, array_like
+            The network optimal SNR squared
+        matched_filter_snr_squared_tc_array: array_like, optional
+            The network matched filter SNR squared as a function of
+            coalescence time at the times supported by the prior,
+            `self._time_indices`, only used for time marginalization.
+
+        Returns
+        -------
+        float, array_like: The log likelihood ratio, an array for arrays of
+            SNRs without time marginalization
+        """
+        with self.timer('marginalization'):
+            if self.time_marginalization:
+
+                if self.distance_marginalization:
+                    rho_mf_ref_tc_array, rho_opt_ref = self._setup_rho(
+                        matched_filter_snr_squared_tc_array, optimal_snr_squared)
+                    if self.phase_marginalization:
+                        dist_marged_log_l_tc_array = self._interp_dist_margd_loglikelihood(
+                            abs(rho_mf_ref_tc_array), rho_opt_ref)
+                        log_l = logsumexp(dist_marged_log_l_tc_array,
+                                          b=self._time_prior_weights)
+                    else:
+                        dist_marged_log_l_tc_array = self._interp_dist_margd_loglikelihood(
+                            rho_mf_ref_tc_array.real, rho_opt_ref)
+                        log_l = logsumexp(dist_marged_log_l_tc_array,
+                                          b=self._time_prior_weights)
+                elif self.phase_marginalization:
+                    log_l = logsumexp(ln_i0(abs(
+                        matched_filter_snr_squared_tc_array)),
+                        b=self._time_prior_weights) - optimal_snr_squared / 2
+                else:
+                    log_l = logsumexp(
+                        matched_filter_snr_squared_tc_array.real,
+                        b=self._time_prior_weights) - optimal_snr_squared / 2
+
+            elif self.distance_marginalization:
+                rho_mf_ref, rho_opt_ref = self._setup_rho(matched_filter_snr_squared, optimal_snr_squared)
+                if self.phase_marginalization:
+                    rho_mf_ref = abs(rho_mf_ref)
+                log_l = self._interp_dist_margd_loglikelihood(rho_mf_ref.real, rho_opt_ref)
+                if np.ndim(matched_filter_snr_squared) == 0:
+                    log_l = log_l[0]
+
+            elif self.phase_marginalization:
+                matched_filter_snr_squared = ln_i0(abs(matched_filter_snr_squared))
+                log_l = matched_filter_snr_squared - optimal_snr_squared / 2
+
+            else:
+                log_l = matched_filter_snr_squared.real - optimal_snr_squared / 2
+
+            return log_l.real
 
     def _setup_rho(self, matched_filter_snr_squared, optimal_snr_squared):
         rho_opt_ref = (optimal_snr_squared.real *
@@ -236,48 +464,427 @@ class GravitationalWaveTransient(likelihood.Likelihood):
     @property
     def _rho_opt_ref_array(self):
         """ Optimal filter snr at fiducial distance of ref_dist Mpc """
-        return np.logspace(-5, 10, self._dist_margd_loglikelihood_array.shape[0])
+        return np.logspace(-5, 10, self._lookup_table_shape[0])
 
     @property
     def _rho_mf_ref_array(self):
         """ Matched filter snr at fiducial distance of ref_dist Mpc """
         if self.phase_marginalization:
-            return np.logspace(-5, 10, self._dist_margd_loglikelihood_array.shape[1])
+            return np.logspace(-5, 10, self._lookup_table_shape[1])
         else:
-            return np.hstack((-np.logspace(3, -3, self._dist_margd_loglikelihood_array.shape[1] / 2),
-                              np.logspace(-3, 10, self._dist_margd_loglikelihood_array.shape[1] / 2)))
+            return np.hstack((-np.logspace(3, -3, self._lookup_table_shape[1] // 2),
+                              np.logspace(-3, 10, self._lookup_table_shape[1] // 2)))
 
-    def _setup_distance_marginalization(self):
-        self._create_lookup_table()
-        self._interp_dist_margd_loglikelihood = interp2d(self._rho_mf_ref_array, self._rho_opt_ref_array,
-                                                         self._dist_margd_loglikelihood_array)
+    @property
+    def _lookup_table_hash(self):
+        """ Hash of the settings which determine the lookup table """
+        settings = '{}, phase_marginalization={}, shape={}, distances={}'.format(
+            repr(self.priors['luminosity_distance']), self.phase_marginalization,
+            self._lookup_table_shape, self._number_of_distances)
+        return hashlib.sha1(settings.encode()).hexdigest()
+
+    def _setup_distance_marginalization(self, lookup_table=None):
+        if lookup_table is None:
+            self._create_lookup_table()
+        elif not self._load_lookup_table(lookup_table):
+            self._create_lookup_table()
+            self._save_lookup_table(lookup_table)
+        self._distance_interpolant = RegularGridInterpolator(
+            (self._rho_opt_ref_array, self._rho_mf_ref_array),
+            self._dist_margd_loglikelihood_array, bounds_error=False,
+            fill_value=None)
+
+    def _interp_dist_margd_loglikelihood(self, rho_mf_ref, rho_opt_ref):
+        """ Evaluate the distance marginalized log likelihood
+
+        Parameters
+        ----------
+        rho_mf_ref: float, array_like
+            The matched filter SNR squared at the reference distance
+        rho_opt_ref: float, array_like
+            The optimal SNR squared at the reference distance
+
+        Returns
+        -------
+        array_like: The log likelihood for each (rho_mf_ref, rho_opt_ref) pair
+        """
+        rho_opt_ref, rho_mf_ref = np.broadcast_arrays(
+            np.atleast_1d(rho_opt_ref), np.atleast_1d(rho_mf_ref))
+        return self._distance_interpolant(
+            np.stack([rho_opt_ref, rho_mf_ref], axis=-1))
+
+    def _load_lookup_table(self, filename):
+        """ Load the lookup table if it was built with the same settings """
+        if not os.path.isfile(filename):
+            return False
+        try:
+            loaded = np.load(filename)
+            if str(loaded['hash']) != self._lookup_table_hash:
+                logger.info('Lookup table {} was built with different settings, '
+                            'rebuilding.'.format(filename))
+                return False
+            self._dist_margd_loglikelihood_array = loaded['lookup_table']
+            self.distance_prior_array = loaded['distance_prior_array']
+        except (IOError, KeyError, ValueError) as e:
+            logger.warning('Unable to load lookup table {}: {}'.format(filename, e))
+            return False
+        logger.info('Loaded distance marginalisation lookup table from {}.'
+                    .format(filename))
+        return True
+
+    def _save_lookup_table(self, filename):
+        """ Save the lookup table, replacing any existing file atomically so
+        that processes sharing the file never see a partial table """
+        temporary_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        try:
+            with open(temporary_filename, 'wb') as file:
+                np.savez(file, hash=self._lookup_table_hash,
+                         lookup_table=self._dist_margd_loglikelihood_array,
+                         distance_prior_array=self.distance_prior_array)
+            os.rename(temporary_filename, filename)
+        except (IOError, OSError) as e:
+            logger.warning('Unable to save lookup table to {}: {}'.format(filename, e))
 
     def _create_lookup_table(self):
         """ Make the lookup table """
-        self.distance_prior_array = np.array([self.priors['luminosity_distance'].prob(distance)
-                                              for distance in self._distance_array])
+        self.distance_prior_array = np.asarray(
+            self.priors['luminosity_distance'].prob(self._distance_array))
         logger.info('Building lookup table for distance marginalisation.')
 
-        self._dist_margd_loglikelihood_array = np.zeros((400, 800))
-        for ii, rho_opt_ref in enumerate(self._rho_opt_ref_array):
-            for jj, rho_mf_ref in enumerate(self._rho_mf_ref_array):
-                optimal_snr_squared_array = rho_opt_ref * self._ref_dist ** 2. / self._distance_array ** 2
-                matched_filter_snr_squared_array = rho_mf_ref * self._ref_dist / self._distance_array
-                if self.phase_marginalization:
-                    matched_filter_snr_squared_array =\
-                        self._bessel_function_interped(abs(matched_filter_snr_squared_array))
-                self._dist_margd_loglikelihood_array[ii][jj] = \
-                    logsumexp(matched_filter_snr_squared_array - optimal_snr_squared_array / 2,
-                              b=self.distance_prior_array * self._delta_distance)
-        log_norm = logsumexp(0. / self._distance_array - 0. / self._distance_array ** 2.,
-                             b=self.distance_prior_array * self._delta_distance)
+        ratio = self._ref_dist / self._distance_array
+        with np.errstate(divide='ignore'):
+            log_weights = np.log(self.distance_prior_array * self._delta_distance)
+        matched_filter_snr_squared_array = np.outer(self._rho_mf_ref_array, ratio)
+        if self.phase_marginalization:
+            matched_filter_snr_squared_array =\
+                ln_i0(abs(matched_filter_snr_squared_array))
+        optimal_snr_squared_array = np.outer(self._rho_opt_ref_array, ratio ** 2)
+
+        self._dist_margd_loglikelihood_array = self._log_sum_exp_difference(
+            matched_filter_snr_squared_array + log_weights,
+            optimal_snr_squared_array / 2)
+        log_norm = logsumexp(log_weights)
         self._dist_margd_loglikelihood_array -= log_norm
 
-    def _setup_phase_marginalization(self):
-        self._bessel_function_interped = interp1d(
-            np.logspace(-5, 10, int(1e6)), np.logspace(-5, 10, int(1e6)) +
-            np.log([i0e(snr) for snr in np.logspace(-5, 10, int(1e6))]),
-            bounds_error=False, fill_value=(0, np.nan))
+    def _log_sum_exp_difference(self, aa, bb):
+        """ Compute log(sum_k exp(aa[j, k] - bb[i, k])) for all i and j
+
+        The sum is split into blocks of `_lookup_table_block_size` distances.
+        Within each block the terms factorise into exp(aa) and exp(-bb)
+        shifted by their block maximum and minimum, so each block is a matrix
+        product. Blocks in which the shifted product underflows are only
+        evaluated directly, in chunks of at most `_lookup_table_chunk_size`
+        terms, if they can contribute to the sum.
+
+        Parameters
+        ----------
+        aa: array_like
+            Array of shape (J, K), may contain -inf
+        bb: array_like
+            Finite array of shape (I, K)
+
+        Returns
+        -------
+        array_like: Array of shape (I, J)
+        """
+        block_size = self._lookup_table_block_size
+        number_of_blocks = int(np.ceil(aa.shape[1] / block_size))
+        padding = ((0, 0), (0, number_of_blocks * block_size - aa.shape[1]))
+        aa = np.pad(aa, padding, mode='constant', constant_values=-np.inf).reshape(
+            len(aa), number_of_blocks, block_size)
+        bb = np.pad(bb, padding, mode='constant', constant_values=np.inf).reshape(
+            len(bb), number_of_blocks, block_size)
+
+        aa_max = np.max(aa, axis=-1)
+        bb_min = np.min(bb, axis=-1)
+        exp_aa = np.exp(aa - np.where(np.isfinite(aa_max), aa_max, 0)[..., np.newaxis])
+        exp_bb = np.exp(bb_min[..., np.newaxis] - bb)
+
+        result = np.full((len(bb), len(aa)), -np.inf)
+        underflows = []
+        for block in range(number_of_blocks):
+            block_sum = exp_bb[:, block].dot(exp_aa[:, block].T)
+            underflow = block_sum < 1e-280
+            with np.errstate(divide='ignore'):
+                log_block_sum = (np.log(np.where(underflow, 0, block_sum)) +
+                                 aa_max[np.newaxis, :, block] - bb_min[:, np.newaxis, block])
+            result = np.logaddexp(result, log_block_sum)
+            ii, jj = np.nonzero(underflow & np.isfinite(aa_max[np.newaxis, :, block]))
+            underflows.append((ii, jj, np.full(len(ii), block),
+                               aa_max[jj, block] - bb_min[ii, block] + np.log(block_size)))
+
+        ii, jj, blocks, upper_bounds = [np.concatenate(values) for values in zip(*underflows)]
+        needed = upper_bounds > result[ii, jj] + np.log(1e-16)
+        ii, jj, blocks = ii[needed], jj[needed], blocks[needed]
+        chunk_size = max(1, self._lookup_table_chunk_size // block_size)
+        for start in range(0, len(ii), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            np.logaddexp.at(result, (ii[chunk], jj[chunk]), logsumexp(
+                aa[jj[chunk], blocks[chunk]] - bb[ii[chunk], blocks[chunk]], axis=-1))
+        return result
+
+    def _setup_sky_marginalization(self, resolution):
+        """ Set up a sky grid regular in right ascension and the sine of the
+        declination weighted by the ra and dec priors
+
+        Parameters
+        ----------
+        resolution: float
+            The grid spacing in degrees
+        """
+        number_of_ra = int(round(360. / resolution))
+        number_of_sin_dec = int(round(2 / np.radians(resolution)))
+        self._sky_delta_ra = 2 * np.pi / number_of_ra
+        self._sky_delta_sin_dec = 2. / number_of_sin_dec
+        ra = (np.arange(number_of_ra) + 0.5) * self._sky_delta_ra
+        sin_dec = -1 + (np.arange(number_of_sin_dec) + 0.5) * self._sky_delta_sin_dec
+        ra, sin_dec = [array.flatten() for array in np.meshgrid(ra, sin_dec)]
+        dec = np.arcsin(sin_dec)
+        sky_prior_array = (
+            self.priors['ra'].prob(ra) * self._sky_delta_ra *
+            self.priors['dec'].prob(dec) * self._sky_delta_sin_dec / np.cos(dec))
+        supported = sky_prior_array > 0
+        self._setup_sky_grid(ra[supported], dec[supported], sky_prior_array[supported])
+        logger.info('Marginalizing over {} sky locations.'.format(len(self._sky_ra)))
+
+    def _setup_sky_grid(self, ra, dec, prior_weights):
+        """ Set the sky grid and compute the antenna responses and time delays
+        at each point
+
+        The antenna responses at psi=0 are computed at the middle of the
+        geocent_time prior; the Earth rotates by ~7e-5 radians per second so
+        this is accurate for time priors of up to a few seconds. The time
+        delays are computed at the start of the data, as in
+        `Interferometer.get_detector_response`.
+
+        Parameters
+        ----------
+        ra, dec: array_like
+            The sky locations
+        prior_weights: array_like
+            The prior probability of each sky location
+        """
+        self._sky_ra = ra
+        self._sky_dec = dec
+        self._sky_prior_weights = prior_weights
+
+        time_prior = self.priors.get('geocent_time')
+        if isinstance(time_prior, Prior) and np.isfinite(time_prior.minimum) and \
+                np.isfinite(time_prior.maximum):
+            reference_time = (time_prior.minimum + time_prior.maximum) / 2
+        elif isinstance(time_prior, (int, float)):
+            reference_time = float(time_prior)
+        else:
+            reference_time = self.interferometers.start_time + self.interferometers.duration / 2
+        responses = self.interferometers.antenna_response(
+            self._sky_ra, self._sky_dec, reference_time, 0, ['plus', 'cross'])
+        self._sky_plus = responses['plus']
+        self._sky_cross = responses['cross']
+        self._sky_time_delays = self.interferometers.time_delay_from_geocenter(
+            self._sky_ra, self._sky_dec, self.interferometers.start_time)
+
+        self._sky_number_of_times = int(
+            self._sky_marginalization_oversampling * self.interferometers.duration *
+            self.waveform_generator.sampling_frequency)
+        self._sky_marginalization_integrand = np.zeros(
+            (2 * len(self.interferometers), self._sky_number_of_times), dtype=np.complex128)
+
+    def _sky_matched_filter_time_series(self, waveform_polarizations):
+        """ The matched filter SNR squared of each polarization in each
+        detector as a function of the time shift, and the inner products of
+        the polarizations
+
+        The time series are computed with a single FFT, oversampled by
+        `_sky_marginalization_oversampling`.
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            The plus and cross polarizations
+
+        Returns
+        -------
+        time_series: array_like
+            The (2 n_detectors, n_times) array of matched filter SNRs squared
+            of the plus and cross polarizations for time shifts of
+            k duration / n_times from the start of the data
+        inner_products: array_like
+            The (n_detectors, 3) array of the plus-plus, plus-cross and
+            cross-cross inner products
+        """
+        if set(waveform_polarizations) != {'plus', 'cross'}:
+            raise ValueError("Sky marginalization only supports the plus and cross polarizations")
+        duration = self.waveform_generator.duration
+        buffer = self._sky_marginalization_integrand
+        buffer.fill(0)
+        inner_products = np.zeros((len(self.interferometers), 3))
+        for ii, interferometer in enumerate(self.interferometers):
+            frequency_slice = interferometer.frequency_slice
+            frequencies = interferometer.in_band_frequency_array
+            calibration = interferometer.calibration_model.get_calibration_factor(
+                frequencies, prefix='recalib_{}_'.format(interferometer.name), **self.parameters)
+            psd = interferometer.in_band_power_spectral_density_array
+            signal_plus = waveform_polarizations['plus'][frequency_slice] * calibration
+            signal_cross = waveform_polarizations['cross'][frequency_slice] * calibration
+            inner_products[ii] = 4 / duration * np.array([
+                np.sum(abs(signal_plus) ** 2 / psd),
+                np.sum((signal_plus.conjugate() * signal_cross).real / psd),
+                np.sum(abs(signal_cross) ** 2 / psd)])
+            weighted_data = interferometer.in_band_frequency_domain_strain / psd
+            buffer[2 * ii, frequency_slice] = signal_plus.conjugate() * weighted_data
+            buffer[2 * ii + 1, frequency_slice] = signal_cross.conjugate() * weighted_data
+        time_series = 4 / duration * self._sky_number_of_times * np.fft.ifft(buffer, axis=-1)
+        return time_series, inner_products
+
+    def _interpolate_sky_grid_snrs(self, time_series, inner_products, geocent_time, psi):
+        """ The network matched filter and optimal SNRs squared at each point
+        of the sky grid
+
+        The matched filter time series are interpolated to the arrival time at
+        each grid point with four point Lagrange interpolation. The relative
+        interpolation error at frequency f is at most
+        ~0.02 (2 pi f / (oversampling * sampling_frequency))^4.
+
+        Parameters
+        ----------
+        time_series, inner_products: array_like
+            The output of `_sky_matched_filter_time_series`
+        geocent_time, psi: float
+            The geocentric time and polarisation angle
+
+        Returns
+        -------
+        matched_filter_snr_squared, optimal_snr_squared: array_like
+            The SNRs squared at each point of the grid
+        """
+        cos_2psi = np.cos(2 * psi)
+        sin_2psi = np.sin(2 * psi)
+        plus = self._sky_plus * cos_2psi + self._sky_cross * sin_2psi
+        cross = self._sky_cross * cos_2psi - self._sky_plus * sin_2psi
+        optimal_snr_squared = np.sum(
+            plus ** 2 * inner_products[:, :1] + 2 * plus * cross * inner_products[:, 1:2] +
+            cross ** 2 * inner_products[:, 2:], axis=0)
+
+        time_shifts = geocent_time - self.interferometers.start_time + self._sky_time_delays
+        position = time_shifts * self._sky_number_of_times / self.waveform_generator.duration
+        index = np.floor(position).astype(int)
+        offset = position - index
+        weights = [-offset * (offset - 1) * (offset - 2) / 6,
+                   (offset + 1) * (offset - 1) * (offset - 2) / 2,
+                   -(offset + 1) * offset * (offset - 2) / 2,
+                   (offset + 1) * offset * (offset - 1) / 6]
+        matched_filter_snr_squared = 0
+        for ii in range(len(self.interferometers)):
+            for jj, weight in enumerate(weights):
+                samples = np.take(time_series[2 * ii:2 * ii + 2], index[ii] + jj - 1,
+                                  axis=-1, mode='wrap')
+                matched_filter_snr_squared = matched_filter_snr_squared + weight[ii] * (
+                    plus[ii] * samples[0] + cross[ii] * samples[1])
+        return matched_filter_snr_squared, optimal_snr_squared
+
+    def _sky_grid_snrs(self, waveform_polarizations):
+        """ The network matched filter and optimal SNRs squared at each point
+        of the sky grid for the current parameters
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            The plus and cross polarizations
+
+        Returns
+        -------
+        matched_filter_snr_squared, optimal_snr_squared: array_like
+            The SNRs squared at each point of the grid
+        """
+        with self.timer('inner_products'):
+            time_series, inner_products = self._sky_matched_filter_time_series(waveform_polarizations)
+            return self._interpolate_sky_grid_snrs(
+                time_series, inner_products, self.parameters['geocent_time'], self.parameters['psi'])
+
+    def _sky_grid_log_likelihood_ratio(self, waveform_polarizations):
+        """ The log likelihood ratio at each point of the sky grid, including
+        any distance and phase marginalization """
+        return self._log_likelihood_ratio_from_snrs(*self._sky_grid_snrs(waveform_polarizations))
+
+    def _setup_calibration_marginalization(self, number_of_response_curves):
+        """ Draw the calibration parameters of each detector from the prior
+        and compute the response curves on the in-band frequencies
+
+        The complex conjugates and squared moduli of the curves of each
+        detector are stored as arrays of shape (number_of_response_curves,
+        number of in-band frequencies), the draws of different detectors with
+        the same index are combined.
+        Detectors without `recalib_` priors are not recalibrated.
+
+        Parameters
+        ----------
+        number_of_response_curves: int
+            The number of draws
+        """
+        self._calibration_draws = dict()
+        self._calibration_conjugate_response_curves = dict()
+        self._calibration_response_curves_squared = dict()
+        for interferometer in self.interferometers:
+            prefix = 'recalib_{}_'.format(interferometer.name)
+            keys = [key for key in self.priors if key.startswith(prefix)]
+            if len(keys) == 0:
+                continue
+            draws = PriorDict({key: self.priors[key] for key in keys}).sample(
+                size=number_of_response_curves)
+            frequencies = interferometer.in_band_frequency_array
+            self._calibration_draws[interferometer.name] = draws
+            curves = interferometer.calibration_model.get_calibration_factor_batch(
+                frequencies, [{key: draws[key][ii] for key in keys}
+                              for ii in range(number_of_response_curves)])
+            self._calibration_response_curves_squared[interferometer.name] = abs(curves) ** 2
+            self._calibration_conjugate_response_curves[interferometer.name] = curves.conjugate()
+        if len(self._calibration_draws) == 0:
+            raise ValueError("Calibration marginalization requires calibration priors, recalib_<detector>_*")
+        logger.info('Marginalizing over {} calibration response curves for {}.'.format(
+            number_of_response_curves, ', '.join(sorted(self._calibration_draws))))
+
+    def _calibration_log_likelihood_ratio(self, waveform_polarizations):
+        """ The log likelihood ratio for each set of calibration response
+        curves, including any distance and phase marginalization
+
+        The uncalibrated inner product integrands of each detector are
+        multiplied by the stack of response curves, so all of the curves
+        are evaluated with two matrix-vector products per detector.
+
+        Parameters
+        ----------
+        waveform_polarizations: dict
+            The waveform polarizations
+
+        Returns
+        -------
+        array_like: The log likelihood ratio for each draw
+        """
+        matched_filter_snr_squared = 0
+        optimal_snr_squared = 0
+        for interferometer in self.interferometers:
+            signal_ifo = interferometer.get_detector_response(
+                waveform_polarizations, self.parameters, in_band=True,
+                calibrate=interferometer.name not in self._calibration_draws)
+
+            with self.timer('inner_products'):
+                psd = interferometer.in_band_power_spectral_density_array
+                duration = interferometer.strain_data.duration
+                matched_filter_integrand = 4 / duration * signal_ifo.conjugate() * \
+                    interferometer.in_band_frequency_domain_strain / psd
+                optimal_integrand = 4 / duration * abs(signal_ifo) ** 2 / psd
+                if interferometer.name in self._calibration_draws:
+                    matched_filter_snr_squared = matched_filter_snr_squared + np.dot(
+                        self._calibration_conjugate_response_curves[interferometer.name],
+                        matched_filter_integrand)
+                    optimal_snr_squared = optimal_snr_squared + np.dot(
+                        self._calibration_response_curves_squared[interferometer.name],
+                        optimal_integrand)
+                else:
+                    matched_filter_snr_squared = matched_filter_snr_squared + np.sum(matched_filter_integrand)
+                    optimal_snr_squared = optimal_snr_squared + np.sum(optimal_integrand)
+
+        return self._log_likelihood_ratio_from_snrs(matched_filter_snr_squared, optimal_snr_squared)
 
     def _setup_time_marginalization(self):
         delta_tc = 2 / self.waveform_generator.sampling_frequency
@@ -288,6 +895,792 @@ class GravitationalWaveTransient(likelihood.Likelihood):
                     self.waveform_generator.sampling_frequency + 1))[1:]
         self.time_prior_array =\
             self.priors['geocent_time'].prob(times) * delta_tc
+        self._time_indices = np.where(self.time_prior_array > 0)[0]
+        self._time_prior_weights = self.time_prior_array[self._time_indices]
+        self._time_marginalization_integrand = np.zeros(
+            len(times), dtype=np.complex128)
+
+    def _time_marginalized_matched_filter_snr_squared(self, integrands):
+        """ The network matched filter SNR squared at the times supported by
+        the geocent_time prior
+
+        The integrands of all of the detectors are summed into a single
+        preallocated buffer so that only one FFT is needed per call.
+
+        Parameters
+        ----------
+        integrands: list
+            Pairs of the frequency slice and the in-band integrand,
+            h^* d / S_n, for each detector
+
+        Returns
+        -------
+        array_like: The matched filter SNR squared at the times
+            `self._time_indices`
+        """
+        with self.timer('marginalization'):
+            buffer = self._time_marginalization_integrand
+            buffer.fill(0)
+            for frequency_slice, integrand in integrands:
+                buffer[frequency_slice] += integrand
+            return 4 / self.waveform_generator.duration *\
+                np.fft.fft(buffer)[self._time_indices]
+
+
+class RelativeBinningGravitationalWaveTransient(GravitationalWaveTransient):
+    """ A gravitational-wave transient likelihood using relative binning
+
+    The waveform is assumed to differ from a fiducial waveform, close to the
+    maximum likelihood, by a smoothly varying ratio. The ratio is linearly
+    interpolated across a small number of frequency bins, so the waveform
+    only needs to be evaluated at the bin edges and the noise weighted inner
+    products reduce to sums over precomputed summary data, see Zackay et al.
+    (arXiv:1806.08792).
+
+    The frequency_domain_source_model of the waveform_generator must be able
+    to evaluate the waveform at arbitrary frequencies, e.g.,
+    `bilby.gw.source.lal_binary_black_hole_frequency_sequence`.
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters
+    fiducial_parameters: dict
+        The parameters of the fiducial waveform, these should be close to the
+        maximum likelihood parameters.
+    epsilon: float, optional
+        The maximum dephasing across each bin, smaller values give more bins
+        and a more accurate likelihood.
+    chi: float, optional
+        Scaling of the dephasing bound used to place the bins.
+    distance_marginalization: bool, optional
+        If true, marginalize over distance in the likelihood.
+        This uses a look up table calculated at run time.
+    time_marginalization: bool, optional
+        If true, marginalize over time in the likelihood.
+        This uses time dependent summary data computed at the times supported
+        by the prior.
+    phase_marginalization: bool, optional
+        If true, marginalize over phase in the likelihood.
+        This is done analytically using a Bessel function.
+    priors: dict, optional
+        If given, used in the distance and phase marginalization.
+    distance_marginalization_lookup_table: str, optional
+        The file to store the distance marginalization lookup table in, see
+        `GravitationalWaveTransient`.
+
+    Returns
+    -------
+    Likelihood: `bilby.core.likelihood.Likelihood`
+        A likelihood object, able to compute the likelihood of the data given
+        some model parameters
+
+    """
+
+    def __init__(self, interferometers, waveform_generator, fiducial_parameters,
+                 epsilon=0.5, chi=1, time_marginalization=False,
+                 distance_marginalization=False, phase_marginalization=False,
+                 priors=None, distance_marginalization_lookup_table=None):
+        GravitationalWaveTransient.__init__(
+            self, interferometers=interferometers,
+            waveform_generator=waveform_generator,
+            time_marginalization=time_marginalization,
+            distance_marginalization=distance_marginalization,
+            phase_marginalization=phase_marginalization, priors=priors,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table)
+        self.fiducial_parameters = fiducial_parameters.copy()
+        if self.time_marginalization:
+            self.fiducial_parameters['geocent_time'] =\
+                float(self.interferometers.start_time)
+        self.epsilon = epsilon
+        self.chi = chi
+        self._setup_bins()
+        self._setup_summary_data()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\tfiducial_parameters={}, ' \
+                                         'epsilon={}, chi={},\n\ttime_marginalization={}, ' \
+                                         'distance_marginalization={}, phase_marginalization={}, priors={})'\
+            .format(self.interferometers, self.waveform_generator, self.fiducial_parameters, self.epsilon,
+                    self.chi, self.time_marginalization, self.distance_marginalization,
+                    self.phase_marginalization, self.priors)
+
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        """ Calculate the log likelihood for many sets of parameters, each
+        set of parameters is evaluated in turn """
+        return likelihood.Likelihood.log_likelihood_batch(
+            self, parameter_array, keys=keys)
+
+    def _setup_bins(self):
+        """ Place the bin edges such that the dephasing of a post-Newtonian
+        power law waveform across each bin is less than epsilon """
+        frequency_array = self.waveform_generator.frequency_array
+        minimum_frequency = min(
+            [ifo.minimum_frequency for ifo in self.interferometers])
+        maximum_frequency = max(
+            [ifo.maximum_frequency for ifo in self.interferometers])
+        in_band = np.where((frequency_array >= minimum_frequency) &
+                           (frequency_array <= maximum_frequency))[0]
+        if len(in_band) < 2:
+            raise ValueError("Not enough frequencies in band to set up the "
+                             "relative binning")
+        f_min = frequency_array[in_band[0]]
+        f_max = frequency_array[in_band[-1]]
+
+        gammas = np.array([-5 / 3, -2 / 3, 1, 5 / 3, 7 / 3])
+        fine_frequencies = np.linspace(f_min, f_max, 10000)
+        delta_alpha = 2 * np.pi * self.chi / abs(f_min ** gammas - f_max ** gammas)
+        dephasing = np.sum(
+            np.sign(gammas) * delta_alpha * fine_frequencies[:, np.newaxis] ** gammas,
+            axis=1)
+        dephasing -= dephasing[0]
+        number_of_bins = max(int(dephasing[-1] / self.epsilon), 1)
+        edge_frequencies = np.interp(
+            np.linspace(0, dephasing[-1], number_of_bins + 1),
+            dephasing, fine_frequencies)
+
+        delta_f = frequency_array[1] - frequency_array[0]
+        edge_indices = np.round(
+            (edge_frequencies - frequency_array[0]) / delta_f).astype(int)
+        edge_indices = np.unique(np.clip(edge_indices, in_band[0], in_band[-1]))
+        edge_indices[0] = in_band[0]
+        edge_indices[-1] = in_band[-1]
+
+        self.bin_edge_indices = np.unique(edge_indices)
+        self.bin_frequencies = frequency_array[self.bin_edge_indices]
+        self.number_of_bins = len(self.bin_frequencies) - 1
+        logger.info('Using {} frequency bins for relative binning.'.format(
+            self.number_of_bins))
+
+    def _setup_summary_data(self):
+        """ Compute the fiducial waveform and the summary data per bin """
+        fiducial_polarizations = self.waveform_generator.frequency_domain_strain(
+            self.fiducial_parameters)
+        if fiducial_polarizations is None:
+            raise ValueError("Unable to generate the fiducial waveform for "
+                             "parameters {}".format(self.fiducial_parameters))
+        fiducial_edge_polarizations = {
+            mode: fiducial_polarizations[mode][self.bin_edge_indices]
+            for mode in fiducial_polarizations}
+
+        frequency_array = self.waveform_generator.frequency_array
+        first, last = self.bin_edge_indices[0], self.bin_edge_indices[-1] + 1
+        bin_starts = self.bin_edge_indices[:-1] - first
+        bin_sizes = np.diff(self.bin_edge_indices)
+        bin_sizes[-1] += 1
+        bin_centres = (self.bin_frequencies[:-1] + self.bin_frequencies[1:]) / 2
+        frequency_offsets = (frequency_array[first:last] -
+                             np.repeat(bin_centres, bin_sizes))
+        duration = self.waveform_generator.duration
+
+        if self.time_marginalization:
+            number_of_times = len(frequency_array) - 1
+
+        self._summary_data = []
+        for interferometer in self.interferometers:
+            fiducial_signal = interferometer.get_detector_response(
+                fiducial_polarizations, self.fiducial_parameters)[first:last]
+            strain = interferometer.frequency_domain_strain[first:last]
+            psd = interferometer.power_spectral_density_array[first:last]
+
+            data_integrand = 4 / duration * np.conj(fiducial_signal) * strain / psd
+            power_integrand = 4 / duration * abs(fiducial_signal) ** 2 / psd
+            summary = dict(
+                a0=np.add.reduceat(data_integrand, bin_starts),
+                a1=np.add.reduceat(data_integrand * frequency_offsets, bin_starts),
+                b0=np.add.reduceat(power_integrand, bin_starts),
+                b1=np.add.reduceat(power_integrand * frequency_offsets, bin_starts))
+
+            fiducial_edge_signal = interferometer.get_detector_response(
+                fiducial_edge_polarizations, self.fiducial_parameters,
+                frequencies=self.bin_frequencies)
+            nonzero = fiducial_edge_signal != 0
+            summary['inverse_fiducial'] = np.zeros_like(fiducial_edge_signal)
+            summary['inverse_fiducial'][nonzero] = 1 / fiducial_edge_signal[nonzero]
+
+            if self.time_marginalization:
+                summary['c0'], summary['c1'] = self._time_dependent_summary_data(
+                    np.conj(data_integrand), frequency_offsets, bin_starts,
+                    np.arange(first, last), self._time_indices, number_of_times)
+            self._summary_data.append(summary)
+
+    @staticmethod
+    def _time_dependent_summary_data(integrand, frequency_offsets, bin_starts,
+                                     frequency_indices, time_indices,
+                                     number_of_times, chunk_size=int(1e7)):
+        """ Summary data for the time marginalization, the integrand is
+        shifted to each of the times supported by the prior, matching the FFT
+        used by `GravitationalWaveTransient` """
+        keep = frequency_indices < number_of_times
+        integrand = integrand[keep]
+        frequency_offsets = frequency_offsets[keep]
+        frequency_indices = frequency_indices[keep]
+        bin_starts = bin_starts[bin_starts < len(frequency_indices)]
+
+        c0 = np.zeros((len(bin_starts), len(time_indices)), dtype=complex)
+        c1 = np.zeros((len(bin_starts), len(time_indices)), dtype=complex)
+        step = max(chunk_size // max(len(frequency_indices), 1), 1)
+        for start in range(0, len(time_indices), step):
+            times = time_indices[start:start + step]
+            phases = np.outer(frequency_indices, times) % number_of_times
+            shifted = integrand[:, np.newaxis] * np.exp(
+                -2j * np.pi * phases / number_of_times)
+            c0[:, start:start + step] = np.add.reduceat(shifted, bin_starts, axis=0)
+            c1[:, start:start + step] = np.add.reduceat(
+                shifted * frequency_offsets[:, np.newaxis], bin_starts, axis=0)
+        return c0, c1
+
+    def log_likelihood_ratio(self):
+        waveform_polarizations =\
+            self.waveform_generator.frequency_domain_strain(
+                self.parameters, frequency_array=self.bin_frequencies)
+
+        if waveform_polarizations is None:
+            return np.nan_to_num(-np.inf)
+
+        matched_filter_snr_squared = 0
+        optimal_snr_squared = 0
+        if self.time_marginalization:
+            matched_filter_snr_squared_tc_array = np.zeros(
+                len(self._time_indices), dtype=np.complex128)
+        else:
+            matched_filter_snr_squared_tc_array = None
+
+        bin_widths = np.diff(self.bin_frequencies)
+        for interferometer, summary in zip(self.interferometers, self._summary_data):
+            signal_ifo = interferometer.get_detector_response(
+                waveform_polarizations, self.parameters,
+                frequencies=self.bin_frequencies)
+            ratio = signal_ifo * summary['inverse_fiducial']
+            r0 = (ratio[1:] + ratio[:-1]) / 2
+            r1 = (ratio[1:] - ratio[:-1]) / bin_widths
+
+            with self.timer('inner_products'):
+                matched_filter_snr_squared += np.sum(
+                    np.conj(r0) * summary['a0'] + np.conj(r1) * summary['a1'])
+                optimal_snr_squared += np.sum(
+                    abs(r0) ** 2 * summary['b0'] +
+                    2 * (r0 * np.conj(r1)).real * summary['b1']).real
+            if self.time_marginalization:
+                with self.timer('marginalization'):
+                    n_bins = summary['c0'].shape[0]
+                    matched_filter_snr_squared_tc_array +=\
+                        r0[:n_bins].dot(summary['c0']) + r1[:n_bins].dot(summary['c1'])
+
+        return self._log_likelihood_ratio_from_snrs(
+            matched_filter_snr_squared, optimal_snr_squared,
+            matched_filter_snr_squared_tc_array)
+
+
+class ROQGravitationalWaveTransient(GravitationalWaveTransient):
+    """ A reduced order quadrature gravitational-wave transient likelihood
+
+    The waveform is only evaluated at the empirical interpolation nodes of a
+    linear basis, used for the matched filter, and a quadratic basis, used
+    for the optimal SNR. The data dependent ROQ weights are precomputed and
+    tabulated over a grid of arrival times in each detector so that the time
+    shift of the signal is applied with a lookup, see Smith et al.
+    (arXiv:1604.08253).
+
+    The bases are the empirical interpolants, arrays of shape
+    (number_of_nodes, number_of_frequencies), defined on the frequencies
+    `interferometer.frequency_array[interferometer.frequency_mask]`. They can
+    be passed as `.npy` files, e.g., as produced by `bilby_reduced_basis`, in
+    which case they are memory mapped rather than loaded into memory.
+
+    The frequency_domain_source_model of the waveform_generator must be able
+    to evaluate the waveform at arbitrary frequencies, e.g.,
+    `bilby.gw.source.lal_binary_black_hole_frequency_sequence`.
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters
+    linear_matrix: str, array_like
+        The linear basis interpolant, or the path to a `.npy` file
+    quadratic_matrix: str, array_like
+        The quadratic basis interpolant, or the path to a `.npy` file
+    frequency_nodes_linear: str, array_like
+        The empirical interpolation nodes of the linear basis
+    frequency_nodes_quadratic: str, array_like
+        The empirical interpolation nodes of the quadratic basis
+    distance_marginalization: bool, optional
+        If true, marginalize over distance in the likelihood.
+        This uses a look up table calculated at run time.
+    phase_marginalization: bool, optional
+        If true, marginalize over phase in the likelihood.
+        This is done analytically using a Bessel function.
+    priors: dict, optional
+        If given, used in the distance and phase marginalization. The
+        geocent_time prior sets the range of the weight tables, unless
+        `time_range` is given.
+    time_range: tuple, optional
+        The minimum and maximum geocent_time covered by the weight tables,
+        required if there is no geocent_time prior. The tables have one row
+        per `time_resolution` in this range, so this should be as narrow as
+        the arrival time allows.
+    time_resolution: float, optional
+        The spacing of the tabulated weights in seconds, defaults to an
+        eighth of the sampling period. The weights are interpolated between
+        the tabulated times with a four point Lagrange interpolant, the
+        relative error at frequency f scales as (2 pi f time_resolution)^4.
+    distance_marginalization_lookup_table: str, optional
+        The file to store the distance marginalization lookup table in, see
+        `GravitationalWaveTransient`.
+
+    Returns
+    -------
+    Likelihood: `bilby.core.likelihood.Likelihood`
+        A likelihood object, able to compute the likelihood of the data given
+        some model parameters
+
+    """
+
+    _time_padding = 0.045
+    _weights_size_warning = 2 ** 30
+
+    def __init__(self, interferometers, waveform_generator, linear_matrix,
+                 quadratic_matrix, frequency_nodes_linear,
+                 frequency_nodes_quadratic, distance_marginalization=False,
+                 phase_marginalization=False, priors=None, time_resolution=None,
+                 distance_marginalization_lookup_table=None, time_range=None):
+        GravitationalWaveTransient.__init__(
+            self, interferometers=interferometers,
+            waveform_generator=waveform_generator,
+            distance_marginalization=distance_marginalization,
+            phase_marginalization=phase_marginalization, priors=priors,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table)
+        self.linear_matrix = self._load_array(linear_matrix)
+        self.quadratic_matrix = self._load_array(quadratic_matrix)
+        self.frequency_nodes_linear = np.array(
+            self._load_array(frequency_nodes_linear), dtype=float)
+        self.frequency_nodes_quadratic = np.array(
+            self._load_array(frequency_nodes_quadratic), dtype=float)
+        if time_resolution is None:
+            time_resolution = 1 / (8 * self.interferometers.sampling_frequency)
+        self.time_resolution = time_resolution
+        self.time_range = time_range
+        self._node_frequencies = np.hstack(
+            (self.frequency_nodes_linear, self.frequency_nodes_quadratic))
+        self._number_of_linear_nodes = len(self.frequency_nodes_linear)
+        self._check_basis_shapes()
+        self._setup_weights()
+        self._noise_log_likelihood = GravitationalWaveTransient.noise_log_likelihood(self)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\t' \
+                                         'number_of_linear_nodes={}, number_of_quadratic_nodes={}, ' \
+                                         'distance_marginalization={}, phase_marginalization={}, priors={})'\
+            .format(self.interferometers, self.waveform_generator, len(self.frequency_nodes_linear),
+                    len(self.frequency_nodes_quadratic), self.distance_marginalization,
+                    self.phase_marginalization, self.priors)
+
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        """ Calculate the log likelihood for many sets of parameters, each
+        set of parameters is evaluated in turn """
+        return likelihood.Likelihood.log_likelihood_batch(
+            self, parameter_array, keys=keys)
+
+    @staticmethod
+    def _load_array(array):
+        if isinstance(array, basestring):
+            return np.load(array, mmap_mode='r')
+        return np.asarray(array)
+
+    def _check_basis_shapes(self):
+        for matrix, nodes, kind in [
+                (self.linear_matrix, self.frequency_nodes_linear, 'linear'),
+                (self.quadratic_matrix, self.frequency_nodes_quadratic, 'quadratic')]:
+            if matrix.shape[0] != len(nodes):
+                raise ValueError(
+                    "The {} basis has {} elements but {} nodes were "
+                    "given".format(kind, matrix.shape[0], len(nodes)))
+            for interferometer in self.interferometers:
+                if matrix.shape[1] != np.sum(interferometer.frequency_mask):
+                    raise ValueError(
+                        "The {} basis has {} frequencies but {} has {} "
+                        "frequencies in band".format(
+                            kind, matrix.shape[1], interferometer.name,
+                            np.sum(interferometer.frequency_mask)))
+
+    def _setup_weights(self):
+        """ Compute the ROQ weights for each interferometer
+
+        The linear weights are tabulated over arrival times in the detector,
+        relative to the start of the segment, using a zero padded inverse FFT
+        for each basis element. The quadratic weights do not depend on time.
+        """
+        duration = self.interferometers.duration
+        start_time = self.interferometers.start_time
+        if self.time_range is not None:
+            minimum_time, maximum_time = self.time_range
+        elif self.priors is not None and 'geocent_time' in self.priors and \
+                isinstance(self.priors['geocent_time'], Prior):
+            minimum_time = self.priors['geocent_time'].minimum
+            maximum_time = self.priors['geocent_time'].maximum
+        else:
+            raise ValueError(
+                "The ROQ likelihood needs a geocent_time prior or a time_range to "
+                "set the range of the weight tables")
+        if not np.isfinite(minimum_time) or not np.isfinite(maximum_time) or minimum_time >= maximum_time:
+            raise ValueError("Invalid time range for the ROQ weights: ({}, {})".format(
+                minimum_time, maximum_time))
+        minimum_time -= start_time + self._time_padding
+        maximum_time += self._time_padding - start_time
+
+        number_of_samples = int(np.ceil(duration / self.time_resolution))
+        self.time_resolution = duration / number_of_samples
+        time_indices = np.arange(
+            int(np.floor(minimum_time / self.time_resolution)),
+            int(np.ceil(maximum_time / self.time_resolution)) + 1)
+        self.weights = dict(time_samples=time_indices * self.time_resolution)
+        logger.info('Computing ROQ weights at {} time samples.'.format(len(time_indices)))
+        size = 16 * len(time_indices) * len(self.frequency_nodes_linear) * len(self.interferometers)
+        if size > self._weights_size_warning:
+            logger.warning(
+                'The ROQ weight tables take {:.1f} GB, narrow the geocent_time prior or '
+                'time_range, or increase the time_resolution to reduce this.'.format(size / 1e9))
+
+        for interferometer in self.interferometers:
+            frequency_slice = interferometer.frequency_slice
+            frequency_indices = np.arange(frequency_slice.start, frequency_slice.stop)
+            weighted_strain = (
+                4 / duration * interferometer.in_band_frequency_domain_strain /
+                interferometer.in_band_power_spectral_density_array)
+
+            linear_weights = np.zeros(
+                (len(time_indices), len(self.frequency_nodes_linear)),
+                dtype=complex)
+            integrand = np.zeros(number_of_samples, dtype=complex)
+            for ii in range(len(self.frequency_nodes_linear)):
+                integrand[frequency_indices % number_of_samples] =\
+                    np.conj(self.linear_matrix[ii]) * weighted_strain
+                linear_weights[:, ii] = number_of_samples * np.fft.ifft(
+                    integrand)[time_indices % number_of_samples]
+            self.weights[interferometer.name + '_linear'] = linear_weights
+
+            self.weights[interferometer.name + '_quadratic'] = np.array([
+                4 / duration * np.sum(
+                    self.quadratic_matrix[ii] /
+                    interferometer.in_band_power_spectral_density_array).real
+                for ii in range(len(self.frequency_nodes_quadratic))])
+
+    def _interpolate_linear_weights(self, interferometer, time):
+        """ Four point Lagrange interpolation of the tabulated weights """
+        time_samples = self.weights['time_samples']
+        position = (time - time_samples[0]) / self.time_resolution
+        index = int(np.floor(position))
+        if index < 1 or index > len(time_samples) - 3:
+            return None
+        u = position - index
+        coefficients = np.array([
+            -u * (u - 1) * (u - 2) / 6, (u + 1) * (u - 1) * (u - 2) / 2,
+            -(u + 1) * u * (u - 2) / 2, (u + 1) * u * (u - 1) / 6])
+        return coefficients.dot(
+            self.weights[interferometer.name + '_linear'][index - 1:index + 3])
+
+    def noise_log_likelihood(self):
+        return self._noise_log_likelihood
+
+    def log_likelihood_ratio(self):
+        waveform_polarizations =\
+            self.waveform_generator.frequency_domain_strain(
+                self.parameters, frequency_array=self._node_frequencies)
+
+        if waveform_polarizations is None:
+            return np.nan_to_num(-np.inf)
+
+        matched_filter_snr_squared = 0
+        optimal_snr_squared = 0
+        for interferometer in self.interferometers:
+            with self.timer('antenna_response'):
+                signal = 0
+                for mode in waveform_polarizations:
+                    signal = signal + waveform_polarizations[mode] * interferometer.antenna_response(
+                        self.parameters['ra'], self.parameters['dec'],
+                        self.parameters['geocent_time'], self.parameters['psi'], mode)
+            with self.timer('calibration'):
+                signal = signal * interferometer.calibration_model.get_calibration_factor(
+                    self._node_frequencies,
+                    prefix='recalib_{}_'.format(interferometer.name), **self.parameters)
+
+            with self.timer('time_shift'):
+                time = (self.parameters['geocent_time'] - interferometer.strain_data.start_time +
+                        interferometer.time_delay_from_geocenter(
+                            self.parameters['ra'], self.parameters['dec'],
+                            interferometer.strain_data.start_time))
+                linear_weights = self._interpolate_linear_weights(interferometer, time)
+            if linear_weights is None:
+                logger.warning('Time {} is outside of the ROQ weight table for '
+                               '{}.'.format(self.parameters['geocent_time'],
+                                            interferometer.name))
+                return np.nan_to_num(-np.inf)
+
+            with self.timer('inner_products'):
+                matched_filter_snr_squared += np.dot(
+                    np.conj(signal[:self._number_of_linear_nodes]), linear_weights)
+                optimal_snr_squared += np.dot(
+                    abs(signal[self._number_of_linear_nodes:]) ** 2,
+                    self.weights[interferometer.name + '_quadratic'])
+
+        return self._log_likelihood_ratio_from_snrs(
+            matched_filter_snr_squared, optimal_snr_squared)
+
+
+class MultibandGravitationalWaveTransient(GravitationalWaveTransient):
+    """ A gravitational-wave transient likelihood using multi-banding
+
+    The frequency range is split into bands with durations T / 2^b. Above the
+    start frequency of band b the signal lies within the last T / 2^b of the
+    segment, so it is evaluated on a grid with spacing 2^b / T rather than
+    1 / T. The start frequencies are set by the Newtonian time to merger of
+    the lowest chirp mass considered. The noise weighted data are projected
+    onto the coarse grid of each band at setup by keeping the corresponding
+    part of the segment in the time domain, and the optimal SNR uses weights
+    for a linear interpolation of |h|^2 between the coarse frequencies, see
+    Morisaki (arXiv:2104.07813). Neighbouring bands are joined with smooth
+    frequency windows.
+
+    The frequency_domain_source_model of the waveform_generator must be able
+    to evaluate the waveform at arbitrary frequencies, e.g.,
+    `bilby.gw.source.lal_binary_neutron_star_frequency_sequence`.
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters
+    reference_chirp_mass: float
+        The lowest detector frame chirp mass, in solar masses, of the signals
+        to be analysed. Lighter systems are longer than the bands allow for.
+    highest_mode: int, optional
+        The largest azimuthal number, m, of the modes in the waveform, higher
+        modes reach a given frequency earlier.
+    time_margin: float, optional
+        The time in seconds between the start of each band's part of the
+        segment and the start of the signal in that band, this absorbs the
+        error of the Newtonian time to merger.
+    distance_marginalization: bool, optional
+        If true, marginalize over distance in the likelihood.
+        This uses a look up table calculated at run time.
+    phase_marginalization: bool, optional
+        If true, marginalize over phase in the likelihood.
+        This is done analytically using a Bessel function.
+    priors: dict, optional
+        If given, used in the distance and phase marginalization. The
+        geocent_time prior, if given, sets the range of merger times the
+        bands allow for, otherwise the whole data segment is used.
+    distance_marginalization_lookup_table: str, optional
+        The file to store the distance marginalization lookup table in, see
+        `GravitationalWaveTransient`.
+
+    Returns
+    -------
+    Likelihood: `bilby.core.likelihood.Likelihood`
+        A likelihood object, able to compute the likelihood of the data given
+        some model parameters
+
+    """
+
+    _post_merger_duration = 0.2
+    _taper_bins = 4
+
+    def __init__(self, interferometers, waveform_generator, reference_chirp_mass,
+                 highest_mode=2, time_margin=1., distance_marginalization=False,
+                 phase_marginalization=False, priors=None,
+                 distance_marginalization_lookup_table=None):
+        GravitationalWaveTransient.__init__(
+            self, interferometers=interferometers,
+            waveform_generator=waveform_generator,
+            distance_marginalization=distance_marginalization,
+            phase_marginalization=phase_marginalization, priors=priors,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table)
+        self.reference_chirp_mass = reference_chirp_mass
+        self.highest_mode = highest_mode
+        self.time_margin = time_margin
+        self._setup_bands()
+        self._setup_summary_data()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\t' \
+                                         'reference_chirp_mass={}, highest_mode={}, time_margin={},\n\t' \
+                                         'distance_marginalization={}, phase_marginalization={}, priors={})'\
+            .format(self.interferometers, self.waveform_generator, self.reference_chirp_mass,
+                    self.highest_mode, self.time_margin, self.distance_marginalization,
+                    self.phase_marginalization, self.priors)
+
+    def log_likelihood_batch(self, parameter_array, keys=None):
+        """ Calculate the log likelihood for many sets of parameters, each
+        set of parameters is evaluated in turn """
+        return likelihood.Likelihood.log_likelihood_batch(
+            self, parameter_array, keys=keys)
+
+    def _frequency_at_chirp_time(self, chirp_time):
+        """ The highest frequency of the signal a time chirp_time before
+        merger, to Newtonian order """
+        chirp_mass = (self.reference_chirp_mass * solar_mass *
+                      gravitational_constant / speed_of_light ** 3)
+        return (self.highest_mode / 2 / np.pi * (256 / 5 * chirp_time) ** (-3 / 8) *
+                chirp_mass ** (-5 / 8))
+
+    def _setup_bands(self):
+        """ Choose the start frequencies and durations of the bands
+
+        Band b keeps the part of the segment of duration T / 2^b ending just
+        after the latest merger time, it starts at the frequency the signal
+        reaches when that part of the segment begins, less the time margin.
+        """
+        duration = self.interferometers.duration
+        start_time = self.interferometers.start_time
+        number_of_times = len(self.waveform_generator.frequency_array) - 1
+        if self.priors is not None and 'geocent_time' in self.priors and \
+                isinstance(self.priors['geocent_time'], Prior):
+            earliest_merger = self.priors['geocent_time'].minimum - start_time
+            latest_merger = self.priors['geocent_time'].maximum - start_time
+        else:
+            earliest_merger = 0
+            latest_merger = duration
+        self._band_end_time = latest_merger + self._post_merger_duration
+        minimum_frequency = min(
+            [ifo.minimum_frequency for ifo in self.interferometers])
+        maximum_frequency = max(
+            [ifo.maximum_frequency for ifo in self.interferometers])
+
+        start_frequencies = [minimum_frequency]
+        durations = [duration]
+        while number_of_times % 2 ** len(durations) == 0:
+            band_duration = durations[-1] / 2
+            chirp_time = (band_duration - self.time_margin -
+                          (self._band_end_time - earliest_merger))
+            if chirp_time <= 0:
+                break
+            frequency = max(self._frequency_at_chirp_time(chirp_time),
+                            start_frequencies[-1] + self._taper_bins / durations[-1])
+            if frequency + self._taper_bins / band_duration >= maximum_frequency:
+                break
+            start_frequencies.append(frequency)
+            durations.append(band_duration)
+        self.band_start_frequencies = np.array(start_frequencies)
+        self.band_durations = np.array(durations)
+        self.number_of_bands = len(durations)
+
+        band_frequencies = []
+        self._band_indices = []
+        self._band_slices = []
+        for band, band_duration in enumerate(self.band_durations):
+            if band < self.number_of_bands - 1:
+                maximum = (self.band_start_frequencies[band + 1] +
+                           self._taper_bins / self.band_durations[band + 1])
+            else:
+                maximum = maximum_frequency
+            indices = np.arange(
+                int(np.floor(self.band_start_frequencies[band] * band_duration)),
+                min(int(np.ceil(maximum * band_duration)),
+                    number_of_times // 2 ** band - 1) + 1)
+            self._band_slices.append(slice(
+                sum(len(ii) for ii in self._band_indices),
+                sum(len(ii) for ii in self._band_indices) + len(indices)))
+            self._band_indices.append(indices)
+            band_frequencies.append(indices / band_duration)
+        self.banded_frequency_array = np.hstack(band_frequencies)
+        logger.info('Using {} bands and {} frequencies for multi-banding.'.format(
+            self.number_of_bands, len(self.banded_frequency_array)))
+
+    def _band_window(self, frequencies, band):
+        """ The smooth window selecting the frequencies of a band, the
+        windows of all bands sum to one """
+        window = np.ones(len(frequencies))
+        if band > 0:
+            window *= self._taper(frequencies, band)
+        if band < self.number_of_bands - 1:
+            window *= 1 - self._taper(frequencies, band + 1)
+        return window
+
+    def _taper(self, frequencies, band):
+        width = self._taper_bins / self.band_durations[band]
+        return np.sin(np.pi / 2 * np.clip(
+            (frequencies - self.band_start_frequencies[band]) / width, 0, 1)) ** 2
+
+    def _setup_summary_data(self):
+        """ Project the noise weighted data onto the coarse frequencies of
+        each band and compute the weights for the optimal SNR """
+        duration = self.interferometers.duration
+        number_of_times = len(self.waveform_generator.frequency_array) - 1
+
+        self._summary_data = []
+        for interferometer in self.interferometers:
+            frequency_slice = interferometer.frequency_slice
+            frequency_indices = np.arange(frequency_slice.start, frequency_slice.stop)
+            frequencies = interferometer.in_band_frequency_array
+            psd = interferometer.in_band_power_spectral_density_array
+            weighted_strain = interferometer.in_band_frequency_domain_strain / psd
+
+            linear = np.zeros(len(self.banded_frequency_array), dtype=complex)
+            quadratic = np.zeros(len(self.banded_frequency_array))
+            for band, band_duration in enumerate(self.band_durations):
+                indices = self._band_indices[band]
+                window = self._band_window(frequencies, band)
+
+                # the signal only occupies the samples [start, start + size)
+                size = number_of_times // 2 ** band
+                start = int(np.round(
+                    (self._band_end_time - band_duration) / duration *
+                    number_of_times)) % number_of_times
+                # the window is applied to the signal, which is then limited
+                # to these samples, so it multiplies the projected data
+                integrand = np.zeros(number_of_times, dtype=complex)
+                integrand[frequency_slice] = weighted_strain
+                time_series = np.fft.ifft(integrand)[
+                    (start + np.arange(size)) % number_of_times]
+                linear[self._band_slices[band]] = (
+                    4 / band_duration * np.fft.fft(time_series)[indices] *
+                    np.exp(-2j * np.pi * indices * start / size) *
+                    self._band_window(indices / band_duration, band))
+
+                # |h|^2 is linearly interpolated between the coarse frequencies
+                supported = window > 0
+                position = frequency_indices[supported] / 2 ** band
+                lower = np.floor(position).astype(int) - indices[0]
+                fraction = position - np.floor(position)
+                weights = 4 / duration * window[supported] / psd[supported]
+                quadratic[self._band_slices[band]] = (
+                    np.bincount(lower, weights=weights * (1 - fraction),
+                                minlength=len(indices) + 1) +
+                    np.bincount(lower + 1, weights=weights * fraction,
+                                minlength=len(indices) + 1))[:len(indices)]
+            self._summary_data.append(dict(linear=linear, quadratic=quadratic))
+
+    def log_likelihood_ratio(self):
+        waveform_polarizations =\
+            self.waveform_generator.frequency_domain_strain(
+                self.parameters, frequency_array=self.banded_frequency_array)
+
+        if waveform_polarizations is None:
+            return np.nan_to_num(-np.inf)
+
+        matched_filter_snr_squared = 0
+        optimal_snr_squared = 0
+        for interferometer, summary in zip(self.interferometers, self._summary_data):
+            signal_ifo = interferometer.get_detector_response(
+                waveform_polarizations, self.parameters,
+                frequencies=self.banded_frequency_array)
+            with self.timer('inner_products'):
+                matched_filter_snr_squared += np.dot(np.conj(signal_ifo), summary['linear'])
+                optimal_snr_squared += np.dot(abs(signal_ifo) ** 2, summary['quadratic'])
+
+        return self._log_likelihood_ratio_from_snrs(
+            matched_filter_snr_squared, optimal_snr_squared)
 
 
 class BasicGravitationalWaveTransient(likelihood.Likelihood):
@@ -331,8 +1724,8 @@ class BasicGravitationalWaveTransient(likelihood.Likelihood):
         log_l = 0
         for interferometer in self.interferometers:
             log_l -= 2. / self.waveform_generator.duration * np.sum(
-                abs(interferometer.frequency_domain_strain) ** 2 /
-                interferometer.power_spectral_density_array)
+                abs(interferometer.in_band_frequency_domain_strain) ** 2 /
+                interferometer.in_band_power_spectral_density_array)
         return log_l.real
 
     def log_likelihood(self):
@@ -371,12 +1764,12 @@ class BasicGravitationalWaveTransient(likelihood.Likelihood):
 
         """
         signal_ifo = interferometer.get_detector_response(
-            waveform_polarizations, self.parameters)
+            waveform_polarizations, self.parameters, in_band=True)
 
         log_l = - 2. / self.waveform_generator.duration * np.vdot(
-            interferometer.frequency_domain_strain - signal_ifo,
-            (interferometer.frequency_domain_strain - signal_ifo) /
-            interferometer.power_spectral_density_array)
+            interferometer.in_band_frequency_domain_strain - signal_ifo,
+            (interferometer.in_band_frequency_domain_strain - signal_ifo) /
+            interferometer.in_band_power_spectral_density_array)
         return log_l.real
 
 
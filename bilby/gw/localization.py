@@ -0,0 +1,149 @@
+"""
+Rapid sky localization from a point estimate of the source parameters.
+
+The coherent network likelihood of a fixed template is evaluated on a grid of
+sky locations, usually HEALPix pixel centres, maximizing or marginalizing over
+the distance, phase and arrival time. The matched filter time series of each
+polarization in each detector are computed once and interpolated to the
+arrival times at every sky location, so a sky map takes seconds rather than
+the hours of `run_sampler` followed by `bilby.gw.utils.plot_skymap`.
+"""
+from __future__ import division
+
+import time
+
+import numpy as np
+
+from ..core.utils import logger
+from .detector import InterferometerList
+from .likelihood import GravitationalWaveTransient
+from .prior import BBHPriorDict
+from .source import lal_binary_black_hole
+from .waveform_generator import WaveformGenerator
+
+
+def healpix_sky_locations(nside):
+    """ The right ascension and declination of the centres of the HEALPix
+    pixels in the RING ordering, this requires healpy
+
+    Parameters
+    ----------
+    nside: int
+        The HEALPix resolution parameter
+
+    Returns
+    -------
+    ra, dec: array_like
+        The sky locations of the 12 nside^2 pixels
+    """
+    import healpy as hp
+    theta, phi = hp.pix2ang(nside, np.arange(hp.nside2npix(nside)))
+    return phi, 0.5 * np.pi - theta
+
+
+def coherent_sky_map(interferometers, parameters, waveform_generator=None,
+                     waveform_polarizations=None, nside=32, ra=None, dec=None,
+                     marginalize=True, priors=None, time_window=0.025,
+                     time_resolution=None):
+    """ The sky map of a signal from the coherent network likelihood of a
+    point estimate of its parameters
+
+    The mass, spin, inclination and polarisation parameters are fixed at the
+    point estimate. The luminosity distance and phase are maximized
+    analytically or marginalized, see `marginalize`. The arrival time is
+    maximized or marginalized over a window around the point estimate, so
+    that sky locations with the same time delays between the detectors are
+    treated alike.
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        The interferometers containing the data
+    parameters: dict
+        The point estimate, including geocent_time, psi and
+        luminosity_distance
+    waveform_generator: bilby.gw.waveform_generator.WaveformGenerator, optional
+        The waveform generator used to generate the template, unless
+        `waveform_polarizations` is given
+    waveform_polarizations: dict, optional
+        The plus and cross polarizations of the template at the point
+        estimate, on the frequencies of the interferometers. These are used
+        rather than calling the waveform generator if given.
+    nside: int, optional
+        The HEALPix resolution of the sky map, requires healpy
+    ra, dec: array_like, optional
+        Sky locations to use instead of the HEALPix pixels, these should
+        cover equal areas of the sky
+    marginalize: bool, optional
+        If true, marginalize over the distance, using the luminosity distance
+        prior, the phase and the arrival time, otherwise maximize over them
+    priors: dict, optional
+        The luminosity distance prior used for marginalization, by default
+        that of `bilby.gw.prior.BBHPriorDict`
+    time_window: float, optional
+        The half width in seconds of the window of geocentric arrival times
+        around the point estimate
+    time_resolution: float, optional
+        The spacing of the arrival times in seconds, by default a quarter of
+        the sampling interval of the data
+
+    Returns
+    -------
+    array_like: The probability of each sky location, summing to one. A
+        HEALPix map can be saved with `bilby.gw.utils.save_to_fits`.
+    """
+    start = time.time()
+    interferometers = InterferometerList(interferometers)
+    if ra is None or dec is None:
+        ra, dec = healpix_sky_locations(nside)
+    ra = np.asarray(ra, dtype=float)
+    dec = np.asarray(dec, dtype=float)
+
+    if waveform_generator is None:
+        if waveform_polarizations is None:
+            raise ValueError(
+                "coherent_sky_map needs one of waveform_generator or "
+                "waveform_polarizations.")
+        waveform_generator = WaveformGenerator(
+            duration=interferometers.duration,
+            sampling_frequency=interferometers.sampling_frequency,
+            start_time=interferometers.start_time,
+            frequency_domain_source_model=lal_binary_black_hole)
+    if priors is None:
+        priors = BBHPriorDict()
+    priors = priors.copy()
+    priors['geocent_time'] = float(parameters['geocent_time'])
+    likelihood = GravitationalWaveTransient(
+        interferometers=interferometers, waveform_generator=waveform_generator,
+        priors=priors, distance_marginalization=marginalize,
+        phase_marginalization=marginalize)
+    likelihood.parameters.update(parameters)
+    if waveform_polarizations is None:
+        waveform_polarizations = waveform_generator.frequency_domain_strain(
+            likelihood.parameters)
+    likelihood._setup_sky_grid(ra, dec, np.full(len(ra), 1. / len(ra)))
+    time_series, inner_products = likelihood._sky_matched_filter_time_series(
+        waveform_polarizations)
+
+    if time_resolution is None:
+        time_resolution = 1 / (4 * interferometers.sampling_frequency)
+    number_of_times = 2 * int(np.ceil(time_window / time_resolution)) + 1
+    times = parameters['geocent_time'] + np.linspace(
+        -time_window, time_window, number_of_times)
+    log_l = np.full(len(ra), -np.inf)
+    for geocent_time in times:
+        matched_filter_snr_squared, optimal_snr_squared = \
+            likelihood._interpolate_sky_grid_snrs(
+                time_series, inner_products, geocent_time, parameters['psi'])
+        if marginalize:
+            log_l = np.logaddexp(log_l, likelihood._log_likelihood_ratio_from_snrs(
+                matched_filter_snr_squared, optimal_snr_squared))
+        else:
+            log_l = np.maximum(log_l, abs(matched_filter_snr_squared) ** 2 /
+                               (2 * optimal_snr_squared))
+
+    sky_map = np.exp(log_l - np.max(log_l))
+    sky_map /= np.sum(sky_map)
+    logger.info('Computed the sky map for {} sky locations and {} arrival '
+                'times in {:.2f}s.'.format(len(ra), len(times), time.time() - start))
+    return sky_map
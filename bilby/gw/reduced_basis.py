@@ -0,0 +1,371 @@
+"""
+Tools to build the reduced bases and empirical interpolants used by
+`bilby.gw.likelihood.ROQGravitationalWaveTransient`.
+
+The training waveforms, the reduced bases and the interpolants are stored as
+`.npy` files which are written row by row and read back as memory mapped
+arrays, so the training set never needs to fit in memory. Generating the
+training set and projecting it onto each new basis element can be spread over
+a pool of processes.
+"""
+from __future__ import division
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from ..core.utils import logger, check_directory_exists_and_if_not_mkdir
+
+
+def get_basis_frequencies(waveform_generator, minimum_frequency=20,
+                          maximum_frequency=None):
+    """ The frequencies on which the bases are defined
+
+    These are the frequencies selected by
+    `bilby.gw.detector.Interferometer.frequency_mask` for an interferometer
+    with the same minimum and maximum frequency.
+
+    Parameters
+    ----------
+    waveform_generator: bilby.gw.waveform_generator.WaveformGenerator
+        The waveform generator used to generate the training set
+    minimum_frequency: float, optional
+        The minimum frequency of the analysis
+    maximum_frequency: float, optional
+        The maximum frequency of the analysis, defaults to the Nyquist
+        frequency
+
+    Returns
+    -------
+    array_like: The basis frequencies
+    """
+    frequency_array = waveform_generator.frequency_array
+    if maximum_frequency is None:
+        maximum_frequency = waveform_generator.sampling_frequency / 2
+    return frequency_array[(frequency_array > minimum_frequency) &
+                           (frequency_array < maximum_frequency)]
+
+
+def generate_training_set(filename, waveform_generator, priors, size,
+                          minimum_frequency=20, maximum_frequency=None,
+                          polarizations=('plus', 'cross'), npool=1,
+                          chunk_size=100):
+    """ Draw training waveforms from the prior and stream them to disk
+
+    Each waveform polarization is stored as a row of a complex `.npy` array
+    of shape (size * len(polarizations), number_of_frequencies). Rows for
+    which the waveform generator returns `None` are left as zeros and ignored
+    when building the basis.
+
+    Parameters
+    ----------
+    filename: str
+        The `.npy` file to write the training set to
+    waveform_generator: bilby.gw.waveform_generator.WaveformGenerator
+        The waveform generator used to generate the training set
+    priors: bilby.core.prior.PriorDict
+        The prior to draw the training parameters from
+    size: int
+        The number of parameter samples to draw
+    minimum_frequency: float, optional
+        The minimum frequency of the analysis
+    maximum_frequency: float, optional
+        The maximum frequency of the analysis, defaults to the Nyquist
+        frequency
+    polarizations: tuple, optional
+        The polarizations to add to the training set
+    npool: int, optional
+        The number of processes to use
+    chunk_size: int, optional
+        The number of parameter samples handled by each task
+
+    Returns
+    -------
+    array_like: The basis frequencies
+    """
+    frequencies = get_basis_frequencies(
+        waveform_generator, minimum_frequency, maximum_frequency)
+    training_set = np.lib.format.open_memmap(
+        filename, mode='w+', dtype=complex,
+        shape=(size * len(polarizations), len(frequencies)))
+    del training_set
+
+    mask = np.in1d(waveform_generator.frequency_array, frequencies)
+    samples = priors.sample(size=size)
+    tasks = []
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        chunk = [{key: samples[key][ii] for key in samples}
+                 for ii in range(start, stop)]
+        tasks.append((waveform_generator, filename, start, chunk, polarizations, mask))
+
+    logger.info('Generating {} training waveforms.'.format(size))
+    pool = _create_pool(npool)
+    try:
+        _map(_generate_training_chunk, tasks, pool)
+    finally:
+        _close_pool(pool)
+    return frequencies
+
+
+def _generate_training_chunk(args):
+    waveform_generator, filename, start, samples, polarizations, mask = args
+    training_set = np.load(filename, mmap_mode='r+')
+    for ii, parameters in enumerate(samples):
+        waveform = waveform_generator.frequency_domain_strain(parameters)
+        if waveform is None:
+            continue
+        for jj, polarization in enumerate(polarizations):
+            row = (start + ii) * len(polarizations) + jj
+            training_set[row] = waveform[polarization][mask]
+    training_set.flush()
+
+
+def greedy_reduced_basis(training_set, basis_filename, tolerance=1e-12,
+                         maximum_basis_size=None, quadratic=False, npool=1,
+                         chunk_size=1000):
+    """ Build an orthonormal reduced basis with a greedy algorithm
+
+    At each step the training waveform with the largest projection error is
+    orthonormalised against the current basis, using iterated modified
+    Gram-Schmidt, and added to the basis. The projection errors are updated
+    with one pass through the training set, split into chunks over the
+    process pool. The training waveforms are normalised before use.
+
+    Parameters
+    ----------
+    training_set: str
+        The `.npy` file containing the training set, see
+        `generate_training_set`
+    basis_filename: str
+        The `.npy` file to write the reduced basis to
+    tolerance: float, optional
+        The maximum allowed projection error of the training set
+    maximum_basis_size: int, optional
+        The maximum number of basis elements
+    quadratic: bool, optional
+        If true, the basis is built for the squared modulus of the training
+        waveforms, as needed for the optimal SNR
+    npool: int, optional
+        The number of processes to use
+    chunk_size: int, optional
+        The number of training waveforms handled by each task
+
+    Returns
+    -------
+    int: The number of basis elements
+    """
+    training = np.load(training_set, mmap_mode='r')
+    number_of_training, number_of_frequencies = training.shape
+    if maximum_basis_size is None:
+        maximum_basis_size = min(number_of_training, number_of_frequencies)
+    chunks = [(training_set, start, min(start + chunk_size, number_of_training),
+               quadratic)
+              for start in range(0, number_of_training, chunk_size)]
+
+    if quadratic:
+        dtype = float
+    else:
+        dtype = complex
+    basis = np.lib.format.open_memmap(
+        basis_filename + '.tmp', mode='w+', dtype=dtype,
+        shape=(maximum_basis_size, number_of_frequencies))
+
+    pool = _create_pool(npool)
+    try:
+        errors = np.hstack(_map(_training_norms, chunks, pool))
+        errors = (errors > 0).astype(float)
+
+        size = 0
+        while size < maximum_basis_size:
+            index = int(np.argmax(errors))
+            if errors[index] <= tolerance:
+                break
+            vector = _normalise(_training_vector(training[index], quadratic))
+            for _ in range(2):
+                for previous in basis[:size]:
+                    vector = vector - np.vdot(previous, vector) * previous
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                errors[index] = 0
+                continue
+            basis[size] = vector / norm
+            basis.flush()
+            projections = np.hstack(_map(
+                _project_chunk, [chunk + (basis[size],) for chunk in chunks], pool))
+            errors -= projections
+            size += 1
+            logger.debug('Reduced basis element {}, maximum projection error '
+                         '{:.3e}'.format(size, np.max(errors)))
+    finally:
+        _close_pool(pool)
+
+    logger.info('Built a reduced basis with {} elements, maximum projection '
+                'error {:.3e}.'.format(size, np.max(errors)))
+    np.save(basis_filename, basis[:size])
+    del basis
+    os.remove(basis_filename + '.tmp')
+    return size
+
+
+def _training_vector(vector, quadratic):
+    if quadratic:
+        return abs(vector) ** 2
+    return np.array(vector)
+
+
+def _normalise(vector):
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return vector
+    return vector / norm
+
+
+def _training_norms(args):
+    filename, start, stop, quadratic = args
+    training = np.load(filename, mmap_mode='r')
+    return np.array([np.linalg.norm(_training_vector(vector, quadratic))
+                     for vector in training[start:stop]])
+
+
+def _project_chunk(args):
+    filename, start, stop, quadratic, basis_vector = args
+    training = np.load(filename, mmap_mode='r')
+    projections = np.zeros(stop - start)
+    for ii, vector in enumerate(training[start:stop]):
+        vector = _normalise(_training_vector(vector, quadratic))
+        projections[ii] = abs(np.vdot(basis_vector, vector)) ** 2
+    return projections
+
+
+def empirical_interpolation(basis_filename, interpolant_filename,
+                            frequencies, chunk_size=10000):
+    """ Select the empirical interpolation nodes and build the interpolant
+
+    A waveform in the span of the basis is reconstructed from its values at
+    the nodes as `interpolant.T.dot(waveform_at_nodes)`.
+
+    Parameters
+    ----------
+    basis_filename: str
+        The `.npy` file containing the reduced basis
+    interpolant_filename: str
+        The `.npy` file to write the interpolant to
+    frequencies: array_like
+        The frequencies on which the basis is defined
+    chunk_size: int, optional
+        The number of frequencies in each block of the interpolant
+
+    Returns
+    -------
+    array_like: The node frequencies
+    """
+    basis = np.load(basis_filename, mmap_mode='r')
+    size = basis.shape[0]
+    nodes = [int(np.argmax(abs(basis[0])))]
+    for ii in range(1, size):
+        vandermonde = basis[:ii, nodes].T
+        coefficients = np.linalg.solve(vandermonde, basis[ii, nodes])
+        residual = basis[ii] - coefficients.dot(basis[:ii])
+        nodes.append(int(np.argmax(abs(residual))))
+
+    inverse = np.linalg.inv(basis[:, nodes].T)
+    interpolant = np.lib.format.open_memmap(
+        interpolant_filename, mode='w+', dtype=basis.dtype, shape=basis.shape)
+    for start in range(0, basis.shape[1], chunk_size):
+        interpolant[:, start:start + chunk_size] = inverse.T.dot(
+            basis[:, start:start + chunk_size])
+    interpolant.flush()
+    return np.asarray(frequencies)[nodes]
+
+
+def build_roq_bases(waveform_generator, priors, size, outdir='outdir',
+                    label='roq', minimum_frequency=20, maximum_frequency=None,
+                    linear_tolerance=1e-12, quadratic_tolerance=1e-12,
+                    maximum_basis_size=None, npool=1, chunk_size=100):
+    """ Build the linear and quadratic ROQ bases
+
+    The following files are written to outdir
+
+    - `{label}_training_set.npy`: the training waveforms
+    - `{label}_linear_basis.npy`, `{label}_quadratic_basis.npy`: the
+      empirical interpolants, the `linear_matrix` and `quadratic_matrix` of
+      `bilby.gw.likelihood.ROQGravitationalWaveTransient`
+    - `{label}_linear_nodes.npy`, `{label}_quadratic_nodes.npy`: the node
+      frequencies
+
+    Parameters
+    ----------
+    waveform_generator: bilby.gw.waveform_generator.WaveformGenerator
+        The waveform generator used to generate the training set
+    priors: bilby.core.prior.PriorDict
+        The prior to draw the training parameters from
+    size: int
+        The number of training parameter samples to draw
+    outdir: str, optional
+        The output directory
+    label: str, optional
+        The label prepended to the output files
+    minimum_frequency: float, optional
+        The minimum frequency of the analysis
+    maximum_frequency: float, optional
+        The maximum frequency of the analysis, defaults to the Nyquist
+        frequency
+    linear_tolerance, quadratic_tolerance: float, optional
+        The maximum projection error of the training set onto the bases
+    maximum_basis_size: int, optional
+        The maximum number of elements of each basis
+    npool: int, optional
+        The number of processes to use
+    chunk_size: int, optional
+        The number of training waveforms handled by each task
+
+    Returns
+    -------
+    dict: The names of the output files
+    """
+    check_directory_exists_and_if_not_mkdir(outdir)
+    filenames = {key: os.path.join(outdir, '{}_{}.npy'.format(label, key))
+                 for key in ['training_set', 'linear_basis', 'linear_nodes',
+                             'quadratic_basis', 'quadratic_nodes']}
+
+    frequencies = generate_training_set(
+        filenames['training_set'], waveform_generator, priors, size,
+        minimum_frequency=minimum_frequency,
+        maximum_frequency=maximum_frequency, npool=npool,
+        chunk_size=chunk_size)
+
+    for kind, tolerance in [('linear', linear_tolerance),
+                            ('quadratic', quadratic_tolerance)]:
+        basis_filename = os.path.join(
+            outdir, '{}_{}_reduced_basis.npy'.format(label, kind))
+        greedy_reduced_basis(
+            filenames['training_set'], basis_filename, tolerance=tolerance,
+            maximum_basis_size=maximum_basis_size,
+            quadratic=kind == 'quadratic', npool=npool,
+            chunk_size=chunk_size * 10)
+        nodes = empirical_interpolation(
+            basis_filename, filenames['{}_basis'.format(kind)], frequencies)
+        np.save(filenames['{}_nodes'.format(kind)], nodes)
+        os.remove(basis_filename)
+    return filenames
+
+
+def _create_pool(npool):
+    """ A pool of npool processes, None to run in this process """
+    if npool is None or npool <= 1:
+        return None
+    return multiprocessing.Pool(npool)
+
+
+def _close_pool(pool):
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+def _map(function, tasks, pool):
+    if pool is None:
+        return list(map(function, tasks))
+    return pool.map(function, tasks)
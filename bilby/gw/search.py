@@ -0,0 +1,282 @@
+"""
+A matched filter search of the data in a network of interferometers with a
+bank of templates.
+
+Each template is generated once with a `WaveformGenerator` and correlated
+against the noise weighted data of every interferometer with inverse FFTs,
+giving the complex matched filter SNR as a function of the arrival time. The
+normalisation follows `bilby.gw.utils.noise_weighted_inner_product`, so the
+SNR of a template at zero time shift is
+
+    <template, data> / <template, template>^(1/2).
+
+Peaks above a threshold are clustered in time, combined into triggers seen in
+coincidence by several interferometers and clustered again over the bank.
+The triggers contain the template parameters and an estimate of the
+geocentric arrival time, so they can seed parameter estimation with
+`bilby.run_sampler`.
+
+Templates are filtered in batches, optionally spread over a pool of
+processes. The noise weighted data are computed once and a copy of the
+search is sent to each process when the pool is started.
+"""
+from __future__ import division
+
+import multiprocessing
+
+import numpy as np
+from pandas import DataFrame
+
+from ..core.utils import logger, speed_of_light
+from .detector import InterferometerList
+from .utils import noise_weighted_inner_product
+
+
+class TemplateBankSearch(object):
+    """ A matched filter search with a template bank
+
+    Parameters
+    ----------
+    interferometers: list, bilby.gw.detector.InterferometerList
+        The interferometers containing the data and power spectral densities
+    waveform_generator: bilby.gw.waveform_generator.WaveformGenerator
+        The waveform generator used to generate the templates
+    snr_threshold: float, optional
+        The threshold on the matched filter SNR in each interferometer
+    cluster_window: float, optional
+        Peaks closer than this, in seconds, are clustered into one, keeping
+        the loudest, in each interferometer and for the network triggers
+    coincidence_window: float, optional
+        The allowed difference in seconds between the arrival times in two
+        interferometers in addition to the light travel time between them
+    minimum_interferometers: int, optional
+        The number of interferometers a trigger has to be seen in, by default
+        two, or one if there is a single interferometer
+    template_defaults: dict, optional
+        Parameters added to each template if they are missing, by default a
+        face-on source with zero phase at 100 Mpc; these do not change the SNR
+        of non-precessing dominant mode templates
+    batch_size: int, optional
+        The number of templates filtered together
+    npool: int, optional
+        The number of processes to use
+
+    Attributes
+    ----------
+    times: array_like
+        The arrival times of the SNR time series
+    """
+
+    _default_template_parameters = dict(luminosity_distance=100., iota=0., phase=0.)
+
+    def __init__(self, interferometers, waveform_generator, snr_threshold=5.5,
+                 cluster_window=0.1, coincidence_window=0.005,
+                 minimum_interferometers=None, template_defaults=None,
+                 batch_size=20, npool=1):
+        self.interferometers = InterferometerList(interferometers)
+        self.waveform_generator = waveform_generator
+        self.snr_threshold = snr_threshold
+        self.cluster_window = cluster_window
+        self.coincidence_window = coincidence_window
+        if minimum_interferometers is None:
+            minimum_interferometers = min(2, len(self.interferometers))
+        self.minimum_interferometers = minimum_interferometers
+        if template_defaults is None:
+            template_defaults = self._default_template_parameters.copy()
+        self.template_defaults = template_defaults
+        self.batch_size = batch_size
+        self.npool = npool
+
+        for attribute in ['duration', 'sampling_frequency', 'start_time']:
+            setattr(self.waveform_generator, attribute, getattr(self.interferometers, attribute))
+        self._number_of_times = int(round(
+            self.interferometers.duration * self.interferometers.sampling_frequency))
+        self.times = self.interferometers.start_time + np.arange(
+            self._number_of_times) / self.interferometers.sampling_frequency
+        self._weighted_data = [
+            interferometer.in_band_frequency_domain_strain /
+            interferometer.in_band_power_spectral_density_array
+            for interferometer in self.interferometers]
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\tsnr_threshold={}, ' \
+                                         'cluster_window={}, coincidence_window={}, minimum_interferometers={})'\
+            .format(self.interferometers, self.waveform_generator, self.snr_threshold,
+                    self.cluster_window, self.coincidence_window, self.minimum_interferometers)
+
+    def _template(self, parameters):
+        """ The template parameters with the defaults filled in """
+        template = self.template_defaults.copy()
+        template.update(parameters)
+        return template
+
+    def matched_filter_snr_time_series(self, templates):
+        """ The complex matched filter SNR of a batch of templates as a
+        function of the arrival time `times` in each interferometer
+
+        Parameters
+        ----------
+        templates: list
+            The template parameters
+
+        Returns
+        -------
+        list: For each template, the complex SNR time series in each
+            interferometer, or None if the waveform generator could not
+            generate the template
+        """
+        polarizations = []
+        for parameters in templates:
+            waveform = self.waveform_generator.frequency_domain_strain(self._template(parameters))
+            polarizations.append(None if waveform is None else waveform['plus'])
+        valid = [ii for ii, waveform in enumerate(polarizations) if waveform is not None]
+
+        duration = self.interferometers.duration
+        snr_time_series = []
+        for interferometer, weighted_data in zip(self.interferometers, self._weighted_data):
+            frequency_slice = interferometer.frequency_slice
+            psd = interferometer.in_band_power_spectral_density_array
+            integrand = np.zeros((len(valid), self._number_of_times), dtype=complex)
+            normalisation = np.zeros(len(valid))
+            for jj, ii in enumerate(valid):
+                template = polarizations[ii][frequency_slice]
+                integrand[jj, frequency_slice] = template.conjugate() * weighted_data
+                normalisation[jj] = noise_weighted_inner_product(
+                    template, template, psd, duration).real ** 0.5
+            series = 4 / duration * self._number_of_times * np.fft.ifft(integrand, axis=-1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                series /= normalisation[:, np.newaxis]
+            snr_time_series.append(series)
+
+        output = [None] * len(templates)
+        for jj, ii in enumerate(valid):
+            output[ii] = [series[jj] for series in snr_time_series]
+        return output
+
+    def _peaks(self, snr):
+        """ The indices of the peaks of an SNR time series above the threshold
+        after clustering over `cluster_window` """
+        window = int(self.cluster_window * self.interferometers.sampling_frequency)
+        candidates = np.where(abs(snr) > self.snr_threshold)[0]
+        candidates = candidates[np.argsort(abs(snr[candidates]))[::-1]]
+        peaks = []
+        while len(candidates) > 0:
+            peaks.append(candidates[0])
+            candidates = candidates[abs(candidates - candidates[0]) > window]
+        return peaks
+
+    def _filter_batch(self, args):
+        """ The single interferometer triggers of a batch of templates """
+        start, templates = args
+        triggers = []
+        for ii, snr_time_series in enumerate(self.matched_filter_snr_time_series(templates)):
+            if snr_time_series is None:
+                continue
+            for jj, snr in enumerate(snr_time_series):
+                for peak in self._peaks(snr):
+                    triggers.append(dict(
+                        template_index=start + ii, interferometer=jj,
+                        time=self.times[peak], snr=snr[peak]))
+        return triggers
+
+    def _light_travel_time(self, ii, jj):
+        return np.linalg.norm(
+            self.interferometers[ii].vertex - self.interferometers[jj].vertex) / speed_of_light
+
+    def _coincidences(self, triggers):
+        """ Combine the single interferometer triggers of one template into
+        network triggers seen by at least `minimum_interferometers` """
+        number = len(self.interferometers)
+        by_interferometer = [[trigger for trigger in triggers if trigger['interferometer'] == ii]
+                             for ii in range(number)]
+        coincidences = []
+        for trigger in sorted(triggers, key=lambda trigger: -abs(trigger['snr'])):
+            reference = trigger['interferometer']
+            coincidence = {reference: trigger}
+            for ii in range(number):
+                if ii == reference:
+                    continue
+                window = self._light_travel_time(reference, ii) + self.coincidence_window
+                matches = [other for other in by_interferometer[ii]
+                           if abs(other['time'] - trigger['time']) <= window]
+                if len(matches) > 0:
+                    coincidence[ii] = max(matches, key=lambda other: abs(other['snr']))
+            if len(coincidence) >= self.minimum_interferometers:
+                coincidences.append(coincidence)
+        return coincidences
+
+    def _network_trigger(self, template, template_index, coincidence):
+        snrs = np.array([abs(trigger['snr']) for trigger in coincidence.values()])
+        times = np.array([trigger['time'] for trigger in coincidence.values()])
+        network_trigger = dict(template)
+        network_trigger['template_index'] = template_index
+        network_trigger['network_snr'] = np.sum(snrs ** 2) ** 0.5
+        network_trigger['geocent_time'] = np.sum(snrs ** 2 * times) / np.sum(snrs ** 2)
+        for ii, interferometer in enumerate(self.interferometers):
+            trigger = coincidence.get(ii, dict(snr=np.nan, time=np.nan))
+            network_trigger['{}_snr'.format(interferometer.name)] = abs(trigger['snr'])
+            network_trigger['{}_phase'.format(interferometer.name)] = np.angle(trigger['snr'])
+            network_trigger['{}_time'.format(interferometer.name)] = trigger['time']
+        return network_trigger
+
+    def search(self, template_bank):
+        """ Search the data with a template bank
+
+        Parameters
+        ----------
+        template_bank: list, pandas.DataFrame
+            The intrinsic parameters of each template, as a list of
+            dictionaries or a DataFrame
+
+        Returns
+        -------
+        pandas.DataFrame: The triggers sorted by network SNR, with the
+            template parameters and index, the network SNR, the SNR weighted
+            mean of the arrival times as geocent_time, and the SNR, phase and
+            arrival time in each interferometer
+        """
+        if isinstance(template_bank, DataFrame):
+            template_bank = template_bank.to_dict('records')
+        tasks = [(start, template_bank[start:start + self.batch_size])
+                 for start in range(0, len(template_bank), self.batch_size)]
+        logger.info('Filtering {} templates in {} batches.'.format(len(template_bank), len(tasks)))
+        if self.npool is None or self.npool <= 1:
+            results = list(map(self._filter_batch, tasks))
+        else:
+            pool = multiprocessing.Pool(
+                self.npool, initializer=_initialize_worker, initargs=(self,))
+            try:
+                results = pool.map(_filter_batch, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        triggers = [trigger for batch in results for trigger in batch]
+
+        network_triggers = []
+        for template_index in sorted(set(trigger['template_index'] for trigger in triggers)):
+            template = self._template(template_bank[template_index])
+            for coincidence in self._coincidences(
+                    [trigger for trigger in triggers if trigger['template_index'] == template_index]):
+                network_triggers.append(self._network_trigger(template, template_index, coincidence))
+
+        network_triggers = sorted(network_triggers, key=lambda trigger: -trigger['network_snr'])
+        clustered = []
+        for trigger in network_triggers:
+            if all(abs(trigger['geocent_time'] - kept['geocent_time']) > self.cluster_window
+                   for kept in clustered):
+                clustered.append(trigger)
+        logger.info('Found {} triggers.'.format(len(clustered)))
+        return DataFrame(clustered)
+
+
+_search = None
+
+
+def _initialize_worker(search):
+    """ Install the search in a worker process of the pool """
+    global _search
+    _search = search
+
+
+def _filter_batch(args):
+    return _search._filter_batch(args)
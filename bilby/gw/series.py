@@ -40,6 +40,7 @@ class CoupledTimeAndFrequencySeries(object):
                 self._frequency_array = utils.create_frequency_series(
                     sampling_frequency=self.sampling_frequency,
                     duration=self.duration)
+                self._frequency_array_updated = True
             else:
                 raise ValueError('Can not calculate a frequency series without a '
                                  'legitimate sampling_frequency ({}) or duration ({})'
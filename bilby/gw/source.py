@@ -1,5 +1,9 @@
 from __future__ import division, print_function
 
+import hashlib
+import os
+from collections import OrderedDict
+
 import numpy as np
 
 from ..core import utils
@@ -7,6 +11,7 @@ from ..core.utils import logger
 from .utils import (lalsim_SimInspiralTransformPrecessingNewInitialConditions,
                     lalsim_GetApproximantFromString,
                     lalsim_SimInspiralChooseFDWaveform,
+                    lalsim_SimInspiralChooseFDWaveformSequence,
                     lalsim_SimInspiralWaveformParamsInsertTidalLambda1,
                     lalsim_SimInspiralWaveformParamsInsertTidalLambda2)
 
@@ -110,6 +115,88 @@ def lal_binary_black_hole(
     return {'plus': h_plus, 'cross': h_cross}
 
 
+def lal_binary_black_hole_frequency_sequence(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, iota, phase, **kwargs):
+    """ A Binary Black Hole waveform model evaluated on an arbitrary
+    frequency array using lalsimulation
+
+    Unlike `lal_binary_black_hole` the frequency array does not need to be
+    regularly spaced, this allows the waveform to be evaluated on, e.g., the
+    coarse frequency bins used by `RelativeBinningGravitationalWaveTransient`.
+    Frequencies below the minimum frequency are set to zero.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    a_1: float
+        Dimensionless primary spin magnitude
+    tilt_1: float
+        Primary tilt angle
+    phi_12: float
+
+    a_2: float
+        Dimensionless secondary spin magnitude
+    tilt_2: float
+        Secondary tilt angle
+    phi_jl: float
+
+    iota: float
+        Orbital inclination
+    phase: float
+        The phase at coalescence
+    kwargs: dict
+        Optional keyword arguments
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+
+    waveform_kwargs = dict(waveform_approximant='IMRPhenomPv2', reference_frequency=50.0,
+                           minimum_frequency=20.0)
+    waveform_kwargs.update(kwargs)
+    waveform_approximant = waveform_kwargs['waveform_approximant']
+    reference_frequency = waveform_kwargs['reference_frequency']
+    minimum_frequency = waveform_kwargs['minimum_frequency']
+
+    if mass_2 > mass_1:
+        return None
+
+    luminosity_distance = luminosity_distance * 1e6 * utils.parsec
+    mass_1 = mass_1 * utils.solar_mass
+    mass_2 = mass_2 * utils.solar_mass
+
+    if tilt_1 == 0 and tilt_2 == 0:
+        spin_1x = 0
+        spin_1y = 0
+        spin_1z = a_1
+        spin_2x = 0
+        spin_2y = 0
+        spin_2z = a_2
+    else:
+        iota, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y, spin_2z = (
+            lalsim_SimInspiralTransformPrecessingNewInitialConditions(
+                iota, phi_jl, tilt_1, tilt_2, phi_12, a_1, a_2, mass_1,
+                mass_2, reference_frequency, phase))
+
+    waveform_dictionary = None
+
+    approximant = lalsim_GetApproximantFromString(waveform_approximant)
+
+    return _lal_frequency_sequence_strain(
+        frequency_array, phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z,
+        spin_2x, spin_2y, spin_2z, reference_frequency, luminosity_distance,
+        iota, waveform_dictionary, approximant, minimum_frequency)
+
+
 def lal_eccentric_binary_black_hole_no_spins(
         frequency_array, mass_1, mass_2, eccentricity, luminosity_distance, iota, phase, **kwargs):
     """ Eccentric binary black hole waveform model using lalsimulation (EccentricFD)
@@ -201,44 +288,157 @@ def sinegaussian(frequency_array, hrss, Q, frequency, **kwargs):
     return{'plus': h_plus, 'cross': h_cross}
 
 
-def supernova(
-        frequency_array, realPCs, imagPCs, file_path, luminosity_distance, **kwargs):
-    """ A supernova NR simulation for injections """
+def supernova(frequency_array, realPCs=None, imagPCs=None, file_path=None,
+              luminosity_distance=None, **kwargs):
+    """ A supernova NR simulation for injections
 
-    realhplus, imaghplus, realhcross, imaghcross = np.loadtxt(
-        file_path, usecols=(0, 1, 2, 3), unpack=True)
+    The waveform is read from `file_path` the first time it is used, see
+    `clear_supernova_cache`.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain, the
+        waveform in the file must be at these frequencies
+    realPCs, imagPCs: array_like, optional
+        Deprecated, these are not used
+    file_path: str
+        A text file with columns of the real and imaginary parts of the plus
+        and cross polarizations at 10 kpc
+    luminosity_distance: float
+        The distance in kpc
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    if realPCs is not None or imagPCs is not None:
+        logger.warning("The realPCs and imagPCs arguments of supernova are deprecated and not used")
+    if file_path is None or luminosity_distance is None:
+        raise TypeError("supernova requires file_path and luminosity_distance")
+    polarizations = _cached_supernova_data(
+        ('supernova', _file_key(file_path)),
+        lambda: _load_supernova_waveform(file_path))
 
     # waveform in file at 10kpc
     scaling = 1e-3 * (10.0 / luminosity_distance)
 
-    h_plus = scaling * (realhplus + 1.0j * imaghplus)
-    h_cross = scaling * (realhcross + 1.0j * imaghcross)
-    return {'plus': h_plus, 'cross': h_cross}
+    return {'plus': scaling * polarizations[0],
+            'cross': scaling * polarizations[1]}
 
 
 def supernova_pca_model(
         frequency_array, pc_coeff1, pc_coeff2, pc_coeff3, pc_coeff4, pc_coeff5,
         luminosity_distance, **kwargs):
-    """ Supernova signal model """
+    """ Supernova signal model
+
+    The signal is a linear combination of the first five principal
+    components. They are converted to a single complex matrix the first time
+    `realPCs` and `imagPCs` with the same contents are used, see
+    `clear_supernova_cache`.
 
-    realPCs = kwargs['realPCs']
-    imagPCs = kwargs['imagPCs']
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain, the
+        principal components must be at these frequencies
+    pc_coeff1, pc_coeff2, pc_coeff3, pc_coeff4, pc_coeff5: float
+        The coefficients of the principal components
+    luminosity_distance: float
+        The distance in kpc
+    realPCs: array_like, str
+        The real parts of the principal components, in columns, or a text
+        file containing them. Arrays must not be changed after they are used.
+    imagPCs: array_like, str
+        The imaginary parts of the principal components
 
-    pc1 = realPCs[:, 0] + 1.0j * imagPCs[:, 0]
-    pc2 = realPCs[:, 1] + 1.0j * imagPCs[:, 1]
-    pc3 = realPCs[:, 2] + 1.0j * imagPCs[:, 2]
-    pc4 = realPCs[:, 3] + 1.0j * imagPCs[:, 3]
-    pc5 = realPCs[:, 4] + 1.0j * imagPCs[:, 5]
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    basis = _supernova_pca_basis(kwargs['realPCs'], kwargs['imagPCs'])
+    coefficients = np.concatenate(np.broadcast_arrays(
+        *[np.atleast_1d(coefficient) for coefficient in
+          [pc_coeff1, pc_coeff2, pc_coeff3, pc_coeff4, pc_coeff5]]), axis=-1)
 
     # file at 10kpc
     scaling = 1e-23 * (10.0 / luminosity_distance)
 
-    h_plus = scaling * (pc_coeff1 * pc1 + pc_coeff2 * pc2 + pc_coeff3 * pc3 +
-                        pc_coeff4 * pc4 + pc_coeff5 * pc5)
-    h_cross = scaling * (pc_coeff1 * pc1 + pc_coeff2 * pc2 + pc_coeff3 * pc3 +
-                         pc_coeff4 * pc4 + pc_coeff5 * pc5)
+    h_plus = scaling * np.dot(coefficients, basis)
+
+    return {'plus': h_plus, 'cross': h_plus.copy()}
+
+
+def clear_supernova_cache():
+    """ Remove the supernova waveforms and principal components which have
+    been read from files or converted from the stored arrays """
+    _supernova_cache.clear()
+    _array_hashes.clear()
 
-    return {'plus': h_plus, 'cross': h_cross}
+
+def _supernova_pca_basis(realPCs, imagPCs, number_of_pcs=5):
+    """ The first principal components as a contiguous complex
+    (number_of_pcs, n_frequencies) array """
+
+    def build():
+        real = _load_text(realPCs)[:, :number_of_pcs]
+        imaginary = _load_text(imagPCs)[:, :number_of_pcs]
+        return np.ascontiguousarray((real + 1j * imaginary).T)
+
+    key = ('pca', _file_key(realPCs), _file_key(imagPCs), number_of_pcs)
+    return _cached_supernova_data(key, build)
+
+
+def _load_supernova_waveform(file_path):
+    realhplus, imaghplus, realhcross, imaghcross = np.loadtxt(
+        file_path, usecols=(0, 1, 2, 3), unpack=True)
+    return np.array([realhplus + 1j * imaghplus, realhcross + 1j * imaghcross])
+
+
+def _load_text(data):
+    if isinstance(data, str):
+        return np.loadtxt(data)
+    return np.asarray(data)
+
+
+def _file_key(data):
+    """ Files are identified by their path and modification time, arrays by
+    a hash of their contents """
+    if isinstance(data, str):
+        return os.path.abspath(data), os.path.getmtime(data)
+    return _array_hash(data)
+
+
+def _array_hash(data):
+    """ Hash of the contents of an array, stored for each array so that
+    large arrays are only hashed once """
+    cached = _array_hashes.get(id(data))
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    if len(_array_hashes) >= _SUPERNOVA_CACHE_SIZE:
+        _array_hashes.clear()
+    array = np.ascontiguousarray(data)
+    array_hash = (array.shape, array.dtype.str, hashlib.sha1(array.tobytes()).hexdigest())
+    _array_hashes[id(data)] = (data, array_hash)
+    return array_hash
+
+
+def _cached_supernova_data(key, build):
+    """ Look up data read from files or arrays """
+    if key in _supernova_cache:
+        _supernova_cache[key] = _supernova_cache.pop(key)
+        return _supernova_cache[key]
+    data = build()
+    data.flags.writeable = False
+    _supernova_cache[key] = data
+    while len(_supernova_cache) > _SUPERNOVA_CACHE_SIZE:
+        _supernova_cache.popitem(last=False)
+    return data
+
+
+_SUPERNOVA_CACHE_SIZE = 16
+_supernova_cache = OrderedDict()
+_array_hashes = dict()
 
 
 def lal_binary_neutron_star(
@@ -333,3 +533,411 @@ def lal_binary_neutron_star(
     h_cross = h_cross[:len(frequency_array)]
 
     return {'plus': h_plus, 'cross': h_cross}
+
+
+def lal_binary_neutron_star_frequency_sequence(
+        frequency_array, mass_1, mass_2, luminosity_distance, chi_1, chi_2,
+        iota, phase, lambda_1, lambda_2, **kwargs):
+    """ A Binary Neutron Star waveform model evaluated on an arbitrary
+    frequency array using lalsimulation
+
+    See `lal_binary_neutron_star` for a description of the parameters.
+    Frequencies below the minimum frequency are set to zero.
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+
+    waveform_kwargs = dict(waveform_approximant='TaylorF2', reference_frequency=50.0,
+                           minimum_frequency=20.0)
+    waveform_kwargs.update(kwargs)
+    waveform_approximant = waveform_kwargs['waveform_approximant']
+    reference_frequency = waveform_kwargs['reference_frequency']
+    minimum_frequency = waveform_kwargs['minimum_frequency']
+
+    if mass_2 > mass_1:
+        return None
+
+    luminosity_distance = luminosity_distance * 1e6 * utils.parsec
+    mass_1 = mass_1 * utils.solar_mass
+    mass_2 = mass_2 * utils.solar_mass
+
+    waveform_dictionary = lal.CreateDict()
+    lalsim_SimInspiralWaveformParamsInsertTidalLambda1(waveform_dictionary, lambda_1)
+    lalsim_SimInspiralWaveformParamsInsertTidalLambda2(waveform_dictionary, lambda_2)
+
+    approximant = lalsim_GetApproximantFromString(waveform_approximant)
+
+    return _lal_frequency_sequence_strain(
+        frequency_array, phase, mass_1, mass_2, 0, 0, chi_1, 0, 0, chi_2,
+        reference_frequency, luminosity_distance, iota, waveform_dictionary,
+        approximant, minimum_frequency)
+
+
+def _lal_frequency_sequence_strain(
+        frequency_array, phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z,
+        spin_2x, spin_2y, spin_2z, reference_frequency, luminosity_distance,
+        iota, waveform_dictionary, approximant, minimum_frequency):
+    """ Evaluate a lalsimulation waveform at the frequencies above the minimum
+    frequency, zero padding the remaining frequencies
+
+    lalsimulation requires a strictly increasing frequency sequence, so the
+    waveform is evaluated at the sorted unique frequencies and mapped back
+    onto the input frequencies.
+    """
+    frequency_array = np.asarray(frequency_array)
+    unique_frequencies, inverse = np.unique(frequency_array, return_inverse=True)
+    in_band = unique_frequencies >= minimum_frequency
+
+    h_plus = np.zeros(len(unique_frequencies), dtype=complex)
+    h_cross = np.zeros(len(unique_frequencies), dtype=complex)
+    if np.any(in_band):
+        hplus, hcross = lalsim_SimInspiralChooseFDWaveformSequence(
+            phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z, spin_2x,
+            spin_2y, spin_2z, reference_frequency, luminosity_distance, iota,
+            waveform_dictionary, approximant, unique_frequencies[in_band])
+        h_plus[in_band] = hplus.data.data
+        h_cross[in_band] = hcross.data.data
+
+    return {'plus': h_plus[inverse], 'cross': h_cross[inverse]}
+
+
+def binary_black_hole_taylor_f2(
+        frequency_array, mass_1, mass_2, luminosity_distance, chi_1, chi_2,
+        iota, phase, **kwargs):
+    """ A non-precessing Binary Black Hole TaylorF2 waveform model
+    implemented in numpy
+
+    This reproduces the lalsimulation TaylorF2 approximant, 3.5PN phase with
+    aligned spins and Newtonian amplitude, without calling lalsimulation.
+    As in lalsimulation, the waveform is zero below the minimum frequency and
+    is not truncated at high frequencies.
+
+    The model is vectorized, the parameters can be arrays of shape (N, 1), in
+    which case the polarizations have shape (N, len(frequency_array)), see
+    `bilby.gw.waveform_generator.WaveformGenerator.frequency_domain_strain_batch`.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    chi_1: float
+        Dimensionless aligned spin
+    chi_2: float
+        Dimensionless aligned spin
+    iota: float
+        Orbital inclination
+    phase: float
+        The phase at the reference frequency
+    kwargs: dict
+        Optional keyword arguments, the reference_frequency and
+        minimum_frequency
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    return _taylor_f2(frequency_array, mass_1, mass_2, luminosity_distance,
+                      chi_1, chi_2, iota, phase, 0., 0., **kwargs)
+
+
+def binary_neutron_star_taylor_f2(
+        frequency_array, mass_1, mass_2, luminosity_distance, chi_1, chi_2,
+        iota, phase, lambda_1, lambda_2, **kwargs):
+    """ A Binary Neutron Star TaylorF2 waveform model implemented in numpy
+
+    As `binary_black_hole_taylor_f2`, with the 5PN to 7PN tidal phase of the
+    lalsimulation TaylorF2 approximant used by `lal_binary_neutron_star`.
+
+    Parameters
+    ----------
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    chi_1: float
+        Dimensionless aligned spin
+    chi_2: float
+        Dimensionless aligned spin
+    iota: float
+        Orbital inclination
+    phase: float
+        The phase at the reference frequency
+    lambda_1: float
+        Dimensionless tidal deformability of mass_1
+    lambda_2: float
+        Dimensionless tidal deformability of mass_2
+    kwargs: dict
+        Optional keyword arguments, the reference_frequency and
+        minimum_frequency
+
+    Returns
+    -------
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    return _taylor_f2(frequency_array, mass_1, mass_2, luminosity_distance,
+                      chi_1, chi_2, iota, phase, lambda_1, lambda_2, **kwargs)
+
+
+def _taylor_f2(frequency_array, mass_1, mass_2, luminosity_distance, chi_1,
+               chi_2, iota, phase, lambda_1, lambda_2, **kwargs):
+    waveform_kwargs = dict(reference_frequency=50.0, minimum_frequency=20.0)
+    waveform_kwargs.update(kwargs)
+    reference_frequency = waveform_kwargs['reference_frequency']
+    minimum_frequency = waveform_kwargs['minimum_frequency']
+
+    invalid = np.asarray(mass_2 > mass_1)
+    if invalid.ndim == 0 and invalid:
+        return None
+
+    frequency_array = np.asarray(frequency_array)
+    in_band = np.nonzero(frequency_array >= max(minimum_frequency, 0))[0]
+    if len(in_band) > 0 and in_band[-1] - in_band[0] + 1 == len(in_band):
+        in_band = slice(in_band[0], in_band[-1] + 1)
+    frequencies = frequency_array[in_band]
+    if np.any(frequencies <= 0):
+        raise ValueError("The minimum frequency of TaylorF2 must be positive")
+
+    total_mass = mass_1 + mass_2
+    eta = mass_1 * mass_2 / total_mass ** 2
+    total_mass_in_seconds = total_mass * _solar_mass_in_seconds
+    coefficients, log_coefficients = _taylor_f2_phase_coefficients(
+        mass_1 / total_mass, mass_2 / total_mass, chi_1, chi_2, lambda_1, lambda_2)
+
+    v = np.cbrt(np.pi * total_mass_in_seconds * frequencies)
+    phasing = _taylor_f2_phase(v, eta, coefficients, log_coefficients)
+    offset = 2 * phase + np.pi / 4
+    if reference_frequency > 0:
+        reference_v = np.cbrt(np.pi * total_mass_in_seconds * reference_frequency)
+        offset = offset + _taylor_f2_phase(
+            reference_v, eta, coefficients, log_coefficients)
+    phasing = phasing - offset
+
+    luminosity_distance = luminosity_distance * 1e6 * utils.parsec
+    amplitude = (-4 * eta * total_mass ** 2 * _solar_mass_in_metres * _solar_mass_in_seconds /
+                 luminosity_distance * (np.pi / 12) ** 0.5 * (5 / (32 * eta)) ** 0.5 /
+                 (v ** 3 * np.sqrt(v)))
+    real = amplitude * np.cos(phasing)
+    imaginary = -amplitude * np.sin(phasing)
+
+    # h_plus = plus * h and h_cross = -i cross * h, written into the real and
+    # imaginary parts to avoid complex temporaries
+    plus = 0.5 * (1 + np.cos(iota) ** 2)
+    cross = np.cos(iota)
+    shape = np.broadcast(real, plus, cross).shape[:-1] + frequency_array.shape
+    h_plus = np.zeros(shape, dtype=complex)
+    h_cross = np.zeros(shape, dtype=complex)
+    h_plus.real[..., in_band] = plus * real
+    h_plus.imag[..., in_band] = plus * imaginary
+    h_cross.real[..., in_band] = cross * imaginary
+    h_cross.imag[..., in_band] = -cross * real
+    if invalid.ndim > 0 and np.any(invalid):
+        h_plus = np.where(invalid, np.nan, h_plus)
+        h_cross = np.where(invalid, np.nan, h_cross)
+    return {'plus': h_plus, 'cross': h_cross}
+
+
+def _taylor_f2_phase(v, eta, coefficients, log_coefficients):
+    """ The TaylorF2 phase at v = (pi M f)^(1/3), from the coefficients of
+    v^k and v^k log(v) relative to the Newtonian order """
+    phasing = np.empty(np.broadcast(v, *coefficients).shape)
+    phasing[...] = coefficients[-1]
+    for coefficient in coefficients[-2::-1]:
+        phasing *= v
+        phasing += coefficient
+    phasing /= v ** 5
+    log_v = np.log(v)
+    for power in log_coefficients:
+        phasing += log_coefficients[power] * v ** (power - 5) * log_v
+    phasing *= 3 / (128 * eta)
+    return phasing
+
+
+def _taylor_f2_phase_coefficients(mass_fraction_1, mass_fraction_2, chi_1, chi_2,
+                                  lambda_1, lambda_2):
+    """ The coefficients of the phase of the lalsimulation TaylorF2
+    approximant, see XLALSimInspiralPNPhasing_F2, for aligned spins
+
+    Returns
+    -------
+    coefficients: list
+        The coefficients of v^0 to v^14
+    log_coefficients: dict
+        The coefficients of v^k log(v), keyed by k
+    """
+    eta = mass_fraction_1 * mass_fraction_2
+    delta = mass_fraction_1 - mass_fraction_2
+    chi_s = (chi_1 + chi_2) / 2
+    chi_a = (chi_1 - chi_2) / 2
+    components = [(mass_fraction_1, chi_1, lambda_1), (mass_fraction_2, chi_2, lambda_2)]
+
+    coefficients = [0.] * 15
+    coefficients[0] = 1.
+    coefficients[2] = 3715. / 756 + 55. / 9 * eta
+    coefficients[3] = -16 * np.pi
+    coefficients[4] = (15293365. / 508032 + 27145. / 504 * eta + 3085. / 72 * eta ** 2 -
+                       395. / 4 * eta * chi_1 * chi_2)
+    coefficients[5] = 5. / 9 * (7729. / 84 - 13 * eta) * np.pi
+    coefficients[6] = (
+        11583231236531. / 4694215680 - 640. / 3 * np.pi ** 2 - 6848. / 21 * np.euler_gamma +
+        eta * (-15737765635. / 3048192 + 2255. / 12 * np.pi ** 2) +
+        76055. / 1728 * eta ** 2 - 127825. / 1296 * eta ** 3 - 6848. / 21 * np.log(4) +
+        (326.75 / 1.12 + 557.5 / 1.8 * eta) * eta * chi_1 * chi_2)
+    coefficients[7] = (
+        np.pi * (77096675. / 254016 + 378515. / 1512 * eta - 74045. / 756 * eta ** 2) +
+        chi_s * (-25150083775. / 3048192 + 10566655595. / 762048 * eta -
+                 1042165. / 3024 * eta ** 2 + 5345. / 36 * eta ** 3) +
+        delta * chi_a * (-25150083775. / 3048192 + 26804935. / 6048 * eta -
+                         1985. / 48 * eta ** 2))
+    for mass_fraction, chi, tidal_deformability in components:
+        coefficients[3] = coefficients[3] + mass_fraction * (25 + 38. / 3 * mass_fraction) * chi
+        quadrupole = _quadrupole_parameter(tidal_deformability)
+        coefficients[4] = coefficients[4] - (50 * quadrupole + 5. / 8) * mass_fraction ** 2 * chi ** 2
+        coefficients[5] = coefficients[5] - mass_fraction * (
+            1391.5 / 8.4 - mass_fraction * (1 - mass_fraction) * 10. / 3 +
+            mass_fraction * (1276. / 8.1 + mass_fraction * (1 - mass_fraction) * 170. / 9)) * chi
+        coefficients[6] = (
+            coefficients[6] + np.pi * mass_fraction * (1490. / 3 + 260 * mass_fraction) * chi +
+            mass_fraction ** 2 * chi ** 2 * (
+                quadrupole * (4703.5 / 8.4 + 2935. / 6 * mass_fraction - 120 * mass_fraction ** 2) -
+                4108.25 / 6.72 - 108.5 / 1.2 * mass_fraction + 125.5 / 3.6 * mass_fraction ** 2))
+        coefficients[10] = (coefficients[10] + tidal_deformability * mass_fraction ** 4 *
+                            (-288 + 264 * mass_fraction))
+        coefficients[12] = coefficients[12] + tidal_deformability * mass_fraction ** 4 * (
+            -15895. / 28 + 4595. / 28 * mass_fraction + 5715. / 14 * mass_fraction ** 2 -
+            325. / 7 * mass_fraction ** 3)
+        coefficients[13] = (coefficients[13] + tidal_deformability * mass_fraction ** 4 *
+                            24 * (12 - 11 * mass_fraction) * np.pi)
+        coefficients[14] = coefficients[14] - tidal_deformability * mass_fraction ** 4 * 5 * (
+            193986935. / 571536 - 14415613. / 381024 * mass_fraction -
+            57859. / 378 * mass_fraction ** 2 - 209495. / 1512 * mass_fraction ** 3 +
+            965. / 54 * mass_fraction ** 4 - 4 * mass_fraction ** 5)
+    log_coefficients = {5: 3 * coefficients[5], 6: -6848. / 21}
+    return coefficients, log_coefficients
+
+
+def _quadrupole_parameter(tidal_deformability):
+    """ The spin-induced quadrupole moment parameter, one for black holes,
+    from the quasi-universal relation with the tidal deformability used by
+    lalsimulation, see XLALSimUniversalRelationQuadMonVSlambda2Tidal """
+    log_lambda = np.log(np.maximum(tidal_deformability, 1))
+    high = np.exp(0.1940 + log_lambda * (0.09163 + log_lambda * (
+        0.04812 + log_lambda * (-4.283e-3 + log_lambda * 1.245e-4))))
+    low = 1 + tidal_deformability * (0.427688866723244 + tidal_deformability * (
+        -0.324336526985068 + tidal_deformability * 0.1107439432180572))
+    return np.where(tidal_deformability < 1, low, high)
+
+
+# lalsimulation's G M_sun / c^3 and G M_sun / c^2, the masses are rescaled from
+# the solar mass of bilby to that of lal, as when calling lalsimulation
+_solar_mass_in_seconds = 4.925490947641267e-06 * utils.solar_mass / 1.9884098706980507e+30
+_solar_mass_in_metres = 1476.6250380501247 * utils.solar_mass / 1.9884098706980507e+30
+
+
+class AnalyticParameter(object):
+    """ A parameter of a source model whose effect on the polarizations is
+    known analytically
+
+    Source models list these in an `analytic_parameters` attribute, a
+    dictionary keyed by the name of the parameter. A `WaveformGenerator` with
+    `analytic_rescaling=True` evaluates the source model with the parameter
+    at the reference value and rescales the polarizations to other values.
+
+    Parameters
+    ----------
+    reference: float
+        The value the source model is evaluated at
+    rescale: callable
+        Function of the polarizations at the reference value, the value and
+        the reference value, returning the polarizations at the value
+    condition: callable, optional
+        Function of the parameters of the source model returning whether the
+        rescaling is exact, by default it always is
+    """
+
+    def __init__(self, reference, rescale, condition=None):
+        self.reference = reference
+        self.rescale = rescale
+        self.condition = condition
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(reference={}, rescale={}, condition={})'.format(
+            self.reference, self.rescale.__name__,
+            None if self.condition is None else self.condition.__name__)
+
+    def applies(self, parameters):
+        """ Whether the rescaling is exact for these source model parameters """
+        return self.condition is None or bool(self.condition(parameters))
+
+
+def _scale_inversely(polarizations, value, reference):
+    """ Polarizations proportional to 1 / value, e.g., luminosity_distance """
+    return {mode: polarizations[mode] * (reference / value) for mode in polarizations}
+
+
+def _scale_linearly(polarizations, value, reference):
+    """ Polarizations proportional to value, e.g., hrss """
+    return {mode: polarizations[mode] * (value / reference) for mode in polarizations}
+
+
+def _rotate_dominant_mode(polarizations, value, reference):
+    """ Polarizations of a waveform containing only the (2, 2) mode, which
+    pick up a factor exp(2 i phase) at positive frequencies """
+    rotation = np.exp(2j * (value - reference))
+    return {mode: polarizations[mode] * rotation for mode in polarizations}
+
+
+# approximants with only the (2, 2) mode for non-precessing systems
+_DOMINANT_MODE_APPROXIMANTS = {
+    'IMRPhenomD', 'IMRPhenomPv2', 'SEOBNRv4_ROM', 'TaylorF2',
+    'IMRPhenomD_NRTidal', 'IMRPhenomPv2_NRTidal', 'SEOBNRv4_ROM_NRTidal'}
+
+
+def _is_non_precessing_binary_black_hole(parameters):
+    return (parameters.get('waveform_approximant', 'IMRPhenomPv2') in _DOMINANT_MODE_APPROXIMANTS and
+            parameters['tilt_1'] == 0 and parameters['tilt_2'] == 0)
+
+
+def _is_dominant_mode_binary_neutron_star(parameters):
+    return parameters.get('waveform_approximant', 'TaylorF2') in _DOMINANT_MODE_APPROXIMANTS
+
+
+_luminosity_distance = AnalyticParameter(reference=100., rescale=_scale_inversely)
+
+for _model in [lal_binary_black_hole, lal_binary_black_hole_frequency_sequence]:
+    _model.analytic_parameters = dict(
+        luminosity_distance=_luminosity_distance,
+        phase=AnalyticParameter(reference=0., rescale=_rotate_dominant_mode,
+                                condition=_is_non_precessing_binary_black_hole))
+for _model in [lal_binary_neutron_star, lal_binary_neutron_star_frequency_sequence]:
+    _model.analytic_parameters = dict(
+        luminosity_distance=_luminosity_distance,
+        phase=AnalyticParameter(reference=0., rescale=_rotate_dominant_mode,
+                                condition=_is_dominant_mode_binary_neutron_star))
+for _model in [binary_black_hole_taylor_f2, binary_neutron_star_taylor_f2]:
+    _model.analytic_parameters = dict(
+        luminosity_distance=_luminosity_distance,
+        phase=AnalyticParameter(reference=0., rescale=_rotate_dominant_mode))
+for _model in [lal_eccentric_binary_black_hole_no_spins, supernova, supernova_pca_model]:
+    _model.analytic_parameters = dict(luminosity_distance=_luminosity_distance)
+sinegaussian.analytic_parameters = dict(
+    hrss=AnalyticParameter(reference=1., rescale=_scale_linearly))
+
+# These models broadcast arrays of parameters of shape (N, 1) against the
+# frequencies, see WaveformGenerator.frequency_domain_strain_batch
+for _model in [sinegaussian, supernova_pca_model, binary_black_hole_taylor_f2,
+               binary_neutron_star_taylor_f2]:
+    _model.vectorized = True
+
+del _model
@@ -15,6 +15,7 @@ except ImportError:
                    " not be able to use some of the prebuilt functions.")
 
 try:
+    import lal
     import lalsimulation as lalsim
 except ImportError:
     logger.warning("You do not have lalsuite installed currently. You will"
@@ -67,27 +68,31 @@ def time_delay_geocentric(detector1, detector2, ra, dec, time):
     -------
     detector1: array_like
         Cartesian coordinate vector for the first detector in the geocentric frame
-        generated by the Interferometer class as self.vertex.
+        generated by the Interferometer class as self.vertex. An (n_detectors, 3)
+        array gives the time delay of each detector.
     detector2: array_like
         Cartesian coordinate vector for the second detector in the geocentric frame.
         To get time delay from Earth center, use detector2 = np.array([0,0,0])
-    ra: float
+    ra: float, array_like
         Right ascension of the source in radians
-    dec: float
+    dec: float, array_like
         Declination of the source in radians
-    time: float
+    time: float, array_like
         GPS time in the geocentric frame
 
     Returns
     -------
-    float: Time delay between the two detectors in the geocentric frame
+    float, array_like: Time delay between the two detectors in the geocentric frame,
+        with shape (n_detectors,) + the shape of the sky locations for arrays
 
     """
     gmst = gps_time_to_gmst(time)
-    theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
+    theta, phi = _broadcast(*ra_dec_to_theta_phi(ra, dec, gmst))
     omega = np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)])
     delta_d = detector2 - detector1
-    return np.dot(omega, delta_d) / speed_of_light
+    if omega.ndim == 1:
+        return np.dot(omega, delta_d) / speed_of_light
+    return np.tensordot(delta_d, omega, axes=1) / speed_of_light
 
 
 def get_polarization_tensor(ra, dec, time, psi, mode):
@@ -100,48 +105,142 @@ def get_polarization_tensor(ra, dec, time, psi, mode):
     Note: there is a typo in the definition of the wave-frame in Nishizawa et al.
     Parameters
     -------
-    ra: float
+    ra: float, array_like
         right ascension in radians
-    dec: float
+    dec: float, array_like
         declination in radians
-    time: float
+    time: float, array_like
         geocentric GPS time
-    psi: float
+    psi: float, array_like
         binary polarisation angle counter-clockwise about the direction of propagation
     mode: str
         polarisation mode
 
     Returns
     -------
-    array_like: A 3x3 representation of the polarization_tensor for the specified mode.
+    array_like: A 3x3 representation of the polarization_tensor for the specified mode,
+        with shape (..., 3, 3) for arrays of sky locations.
 
     """
-    greenwich_mean_sidereal_time = gps_time_to_gmst(time)
-    theta, phi = ra_dec_to_theta_phi(ra, dec, greenwich_mean_sidereal_time)
-    u = np.array([np.cos(phi) * np.cos(theta), np.cos(theta) * np.sin(phi), -np.sin(theta)])
-    v = np.array([-np.sin(phi), np.cos(phi), 0])
-    m = -u * np.sin(psi) - v * np.cos(psi)
-    n = -u * np.cos(psi) + v * np.sin(psi)
+    m, n = _wave_frame(ra, dec, time, psi)
 
     if mode.lower() == 'plus':
-        return np.einsum('i,j->ij', m, m) - np.einsum('i,j->ij', n, n)
+        return _outer(m, m) - _outer(n, n)
     elif mode.lower() == 'cross':
-        return np.einsum('i,j->ij', m, n) + np.einsum('i,j->ij', n, m)
+        return _outer(m, n) + _outer(n, m)
     elif mode.lower() == 'breathing':
-        return np.einsum('i,j->ij', m, m) + np.einsum('i,j->ij', n, n)
+        return _outer(m, m) + _outer(n, n)
 
-    omega = np.cross(m, n)
+    omega = np.cross(m, n, axis=0)
     if mode.lower() == 'longitudinal':
-        return np.sqrt(2) * np.einsum('i,j->ij', omega, omega)
+        return np.sqrt(2) * _outer(omega, omega)
     elif mode.lower() == 'x':
-        return np.einsum('i,j->ij', m, omega) + np.einsum('i,j->ij', omega, m)
+        return _outer(m, omega) + _outer(omega, m)
     elif mode.lower() == 'y':
-        return np.einsum('i,j->ij', n, omega) + np.einsum('i,j->ij', omega, n)
+        return _outer(n, omega) + _outer(omega, n)
     else:
         logger.warning("{} not a polarization mode!".format(mode))
         return None
 
 
+def get_antenna_response(detector_tensor, ra, dec, time, psi, modes=None):
+    """
+    Calculate the antenna response of one or more detectors for arrays of sky
+    locations and times.
+
+    The detector tensors are contracted with the wave-frame vectors rather
+    than building the polarization tensors, see `get_polarization_tensor`.
+
+    Parameters
+    -------
+    detector_tensor: array_like
+        A 3x3 detector tensor, or an (n_detectors, 3, 3) array of them
+    ra: float, array_like
+        right ascension in radians
+    dec: float, array_like
+        declination in radians
+    time: float, array_like
+        geocentric GPS time
+    psi: float, array_like
+        binary polarisation angle counter-clockwise about the direction of propagation
+    modes: list, optional
+        The polarisation modes, by default all of `POLARIZATION_MODES`
+
+    Returns
+    -------
+    dict: The antenna response for each mode, with shape (n_detectors,) + the
+        broadcast shape of ra, dec, time and psi
+
+    """
+    if modes is None:
+        modes = POLARIZATION_MODES
+    detector_tensor = np.asarray(detector_tensor)
+    single_detector = detector_tensor.ndim == 2
+    if single_detector:
+        detector_tensor = detector_tensor[np.newaxis]
+    m, n = _wave_frame(ra, dec, time, psi)
+    vectors = dict(m=m, n=n)
+    projections = dict()
+
+    def contract(aa, bb):
+        """ aa_i D_ij bb_j for each detector tensor D """
+        if bb not in projections:
+            if bb not in vectors:
+                vectors[bb] = np.cross(m, n, axis=0)
+            projections[bb] = np.einsum('dij,j...->di...', detector_tensor, vectors[bb])
+        if aa not in vectors:
+            vectors[aa] = np.cross(m, n, axis=0)
+        return np.einsum('i...,di...->d...', vectors[aa], projections[bb])
+
+    responses = dict()
+    for mode in modes:
+        if mode.lower() == 'plus':
+            response = contract('m', 'm') - contract('n', 'n')
+        elif mode.lower() == 'cross':
+            response = contract('m', 'n') + contract('n', 'm')
+        elif mode.lower() == 'breathing':
+            response = contract('m', 'm') + contract('n', 'n')
+        elif mode.lower() == 'longitudinal':
+            response = np.sqrt(2) * contract('omega', 'omega')
+        elif mode.lower() == 'x':
+            response = contract('m', 'omega') + contract('omega', 'm')
+        elif mode.lower() == 'y':
+            response = contract('n', 'omega') + contract('omega', 'n')
+        else:
+            raise ValueError("{} not a polarization mode!".format(mode))
+        responses[mode] = response[0] if single_detector else response
+    return responses
+
+
+POLARIZATION_MODES = ['plus', 'cross', 'breathing', 'longitudinal', 'x', 'y']
+
+
+def _wave_frame(ra, dec, time, psi):
+    """ The wave-frame vectors m and n, with shape (3,) + the broadcast shape
+    of the sky locations """
+    greenwich_mean_sidereal_time = gps_time_to_gmst(time)
+    theta, phi = ra_dec_to_theta_phi(ra, dec, greenwich_mean_sidereal_time)
+    theta, phi, psi = _broadcast(theta, phi, psi)
+    u = np.array([np.cos(phi) * np.cos(theta), np.cos(theta) * np.sin(phi), -np.sin(theta)])
+    v = np.array([-np.sin(phi), np.cos(phi), 0 * phi])
+    m = -u * np.sin(psi) - v * np.cos(psi)
+    n = -u * np.cos(psi) + v * np.sin(psi)
+    return m, n
+
+
+def _outer(aa, bb):
+    """ The outer product of (3, ...) arrays of vectors, with shape (..., 3, 3) """
+    return np.einsum('i...,j...->...ij', aa, bb)
+
+
+def _broadcast(*values):
+    """ Broadcast arrays against each other, single values are returned
+    unchanged """
+    if all(isinstance(value, (int, float)) for value in values):
+        return values
+    return np.broadcast_arrays(*values)
+
+
 def get_vertex_position_geocentric(latitude, longitude, elevation):
     """
     Calculate the position of the IFO vertex in geocentric coordinates in meters.
@@ -648,6 +747,32 @@ def lalsim_SimInspiralChooseFDWaveform(
         waveform_dictionary, approximant)
 
 
+def lalsim_SimInspiralChooseFDWaveformSequence(
+        phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y,
+        spin_2z, reference_frequency, luminosity_distance, iota,
+        waveform_dictionary, approximant, frequency_array):
+
+    for arg in (phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z, spin_2x,
+                spin_2y, spin_2z, reference_frequency, luminosity_distance,
+                iota):
+            try:
+                arg = float(arg)
+            except ValueError:
+                raise ValueError("Unable to convert inputs to floats")
+
+    # Note, this is the approximant number returns by GetApproximantFromString
+    if isinstance(approximant, int) is False:
+        raise ValueError("approximant not an int")
+
+    frequencies = lal.CreateREAL8Vector(len(frequency_array))
+    frequencies.data = np.asarray(frequency_array, dtype=float)
+
+    return lalsim.SimInspiralChooseFDWaveformSequence(
+        phase, mass_1, mass_2, spin_1x, spin_1y, spin_1z, spin_2x, spin_2y,
+        spin_2z, reference_frequency, luminosity_distance, iota,
+        waveform_dictionary, approximant, frequencies)
+
+
 def lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
         waveform_dictionary, lambda_1):
     try:
@@ -662,9 +787,9 @@ def lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
 def lalsim_SimInspiralWaveformParamsInsertTidalLambda2(
         waveform_dictionary, lambda_2):
     try:
-        lambda_1 = float(lambda_2)
+        lambda_2 = float(lambda_2)
     except ValueError:
         raise ValueError("Unable to convert lambda_2 to float")
 
-    return lalsim.SimInspiralWaveformParamsInsertTidalLambda1(
-        waveform_dictionary, lambda_1)
+    return lalsim.SimInspiralWaveformParamsInsertTidalLambda2(
+        waveform_dictionary, lambda_2)
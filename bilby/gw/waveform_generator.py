@@ -1,7 +1,12 @@
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+
 import numpy as np
 
 from ..core import utils
 from ..gw.series import CoupledTimeAndFrequencySeries
+from .conversion import compile_parameter_conversion
 
 
 class WaveformGenerator(object):
@@ -9,7 +14,8 @@ class WaveformGenerator(object):
     def __init__(self, duration=None, sampling_frequency=None, start_time=0, frequency_domain_source_model=None,
                  time_domain_source_model=None, parameters=None,
                  parameter_conversion=None,
-                 waveform_arguments=None):
+                 waveform_arguments=None, cache_size=None, cache_memory_limit=None,
+                 analytic_rescaling=False, fft_workers=None):
         """ A waveform generator
 
     Parameters
@@ -41,8 +47,49 @@ class WaveformGenerator(object):
         Note: the arguments of frequency_domain_source_model (except the first,
         which is the frequencies at which to compute the strain) will be added to
         the WaveformGenerator object and initialised to `None`.
+    cache_size: int, optional
+        The number of waveforms to keep in memory. Waveforms are looked up by
+        the parameters passed to the source model, after the parameter
+        conversion, so changing only the extrinsic parameters reuses the
+        cached waveform. Cached arrays are read only, so the polarizations
+        returned can not be modified in place. By default there is no cache,
+        unless `analytic_rescaling` is used, which caches one waveform.
+    cache_memory_limit: int, optional
+        The maximum number of bytes used by the cached waveforms, by default
+        only the number of waveforms is limited.
+    analytic_rescaling: bool, optional
+        If true, parameters which the source model lists as analytic, e.g.,
+        the luminosity distance of `bilby.gw.source.lal_binary_black_hole`,
+        see `bilby.gw.source.AnalyticParameter`, are fixed to a reference
+        value when calling the source model. The cached waveform is rescaled
+        to the requested values, so changing only these parameters does not
+        call the source model. The rescaling is checked against the source
+        model the first time it is used, and not used if they disagree. This
+        requires the cache, see `cache_size`.
+    fft_workers: int, optional
+        The number of threads used for the Fourier transform of the
+        polarizations of `time_domain_source_model`, if `scipy.fft` is
+        available, see `bilby.core.utils.rfft`.
+
+        Attributes
+        ----------
+        timer: bilby.core.utils.StageTimer
+            Records the time spent in the parameter conversion, the source
+            model and the Fourier transform, if enabled. This is disabled by
+            default.
 
         """
+        self.timer = utils.StageTimer()
+        if cache_size is None:
+            cache_size = 1 if analytic_rescaling else 0
+        self._cache = WaveformCache(
+            maximum_size=cache_size, maximum_memory=cache_memory_limit)
+        self._data_point_hashes = dict()
+        self.analytic_rescaling = analytic_rescaling
+        self._valid_rescalings = dict()
+        self._compiled_conversions = dict()
+        self.fft_workers = fft_workers
+        self._fft_buffer = None
         self._times_and_frequencies = CoupledTimeAndFrequencySeries(duration=duration,
                                                                     sampling_frequency=sampling_frequency,
                                                                     start_time=start_time)
@@ -53,7 +100,7 @@ class WaveformGenerator(object):
         self.time_domain_source_model = time_domain_source_model
         self.source_parameter_keys = self.__parameters_from_source_model()
         if parameter_conversion is None:
-            self.parameter_conversion = lambda params: (params, [])
+            self.parameter_conversion = _default_parameter_conversion
         else:
             self.parameter_conversion = parameter_conversion
         if waveform_arguments is not None:
@@ -72,7 +119,7 @@ class WaveformGenerator(object):
             tdsm_name = self.time_domain_source_model.__name__
         else:
             tdsm_name = None
-        if self.parameter_conversion.__name__ == '<lambda>':
+        if self.parameter_conversion is _default_parameter_conversion:
             param_conv_name = None
         else:
             param_conv_name = self.parameter_conversion.__name__
@@ -84,7 +131,7 @@ class WaveformGenerator(object):
             .format(self.duration, self.sampling_frequency, self.start_time, fdsm_name, tdsm_name,
                     param_conv_name, self.waveform_arguments)
 
-    def frequency_domain_strain(self, parameters=None):
+    def frequency_domain_strain(self, parameters=None, frequency_array=None):
         """ Wrapper to source_model.
 
         Converts self.parameters with self.parameter_conversion before handing it off to the source model.
@@ -96,6 +143,11 @@ class WaveformGenerator(object):
             Parameters to evaluate the waveform for, this overwrites
             `self.parameters`.
             If not provided will fall back to `self.parameters`.
+        frequency_array: array_like, optional
+            Frequencies at which to evaluate the frequency_domain_source_model,
+            if not provided `self.frequency_array` is used. The source model
+            must support arbitrary frequencies, e.g.,
+            `bilby.gw.source.lal_binary_black_hole_frequency_sequence`.
 
         Returns
         -------
@@ -104,10 +156,17 @@ class WaveformGenerator(object):
         Raises
         -------
         RuntimeError: If no source model is given
+        ValueError: If a frequency_array is given without a frequency domain
+            source model
 
         """
+        if frequency_array is None:
+            frequency_array = self.frequency_array
+        elif self.frequency_domain_source_model is None:
+            raise ValueError("A frequency_array can only be used with a "
+                             "frequency_domain_source_model")
         return self._calculate_strain(model=self.frequency_domain_source_model,
-                                      model_data_points=self.frequency_array,
+                                      model_data_points=frequency_array,
                                       parameters=parameters,
                                       transformation_function=utils.nfft,
                                       transformed_model=self.time_domain_source_model,
@@ -148,31 +207,309 @@ class WaveformGenerator(object):
         if parameters is not None:
             self.parameters = parameters
         if model is not None:
-            model_strain = self._strain_from_model(model_data_points, model)
+            model_parameters, rescalings = self._analytic_reference_parameters(
+                model, model_data_points)
+            key = self._cache_key(model, model_data_points, parameters=model_parameters)
+            model_strain = self._cache.get(
+                key, lambda: self._strain_from_model(model_data_points, model, model_parameters))
+            model_strain = self._rescale(model_strain, rescalings)
         elif transformed_model is not None:
-            model_strain = self._strain_from_transformed_model(transformed_model_data_points, transformed_model,
-                                                               transformation_function)
+            key = self._cache_key(transformed_model, transformed_model_data_points,
+                                  transformation_function)
+            model_strain = self._cache.get(
+                key, lambda: self._strain_from_transformed_model(
+                    transformed_model_data_points, transformed_model, transformation_function))
         else:
             raise RuntimeError("No source model given")
         return model_strain
 
-    def _strain_from_model(self, model_data_points, model):
-        return model(model_data_points, **self.parameters)
+    def frequency_domain_strain_batch(self, parameters, keys=None, frequency_array=None,
+                                      npool=None):
+        """ Evaluate the frequency domain polarizations for many sets of
+        parameters at once.
+
+        If the frequency domain source model has the attribute
+        `vectorized = True`, e.g., `bilby.gw.source.sinegaussian`, it is
+        called once with each parameter as an array of shape (N, 1), which
+        broadcasts against the frequencies. Otherwise the source model is
+        called for each set of parameters, in `npool` processes if given.
+        Time domain source models are always evaluated one at a time.
+
+        Parameters
+        ----------
+        parameters: pandas.DataFrame, dict, array_like
+            The N sets of parameters, as a data frame, a dictionary of arrays
+            or an (N, len(keys)) array. These are passed to the parameter
+            conversion, the waveform arguments are added.
+        keys: list, optional
+            The names of the columns of an array of parameters
+        frequency_array: array_like, optional
+            Frequencies at which to evaluate the frequency_domain_source_model,
+            if not provided `self.frequency_array` is used.
+        npool: int, optional
+            The number of processes used for source models which are not
+            vectorized. The source model and its arguments must be picklable.
+
+        Returns
+        -------
+        dict: The (N, len(frequency_array)) array of each polarization. The
+            rows of sets of parameters for which the source model returns
+            None are NaN, None is returned if this is the case for all of them.
+
+        Raises
+        -------
+        ValueError: If a frequency_array is given without a frequency domain
+            source model
+        """
+        samples, number_of_samples = _parameter_batch(parameters, keys)
+        if frequency_array is None:
+            frequency_array = self.frequency_array
+        elif self.frequency_domain_source_model is None:
+            raise ValueError("A frequency_array can only be used with a "
+                             "frequency_domain_source_model")
+        model = self.frequency_domain_source_model
+        if model is not None and getattr(model, 'vectorized', False):
+            model_parameters = self._convert_batch(samples, number_of_samples)
+            if model_parameters is not None:
+                for key in model_parameters:
+                    if key not in self.waveform_arguments:
+                        model_parameters[key] = model_parameters[key][:, np.newaxis]
+                with self.timer('source_model'):
+                    polarizations = model(frequency_array, **model_parameters)
+                return _stack_polarizations(
+                    [polarizations], number_of_samples, len(frequency_array))
+
+        samples = [{key: samples[key][ii] for key in samples}
+                   for ii in range(number_of_samples)]
+        if model is None:
+            polarizations = [self.frequency_domain_strain(sample) for sample in samples]
+            return _stack_polarizations(polarizations, number_of_samples, len(frequency_array))
+        model_parameters = [self._converted_parameters(sample) for sample in samples]
+        if npool is not None and npool > 1:
+            chunks = np.array_split(np.arange(number_of_samples), npool)
+            tasks = [(model, frequency_array, [model_parameters[ii] for ii in chunk])
+                     for chunk in chunks if len(chunk) > 0]
+            pool = multiprocessing.Pool(npool)
+            try:
+                with self.timer('source_model'):
+                    polarizations = sum(pool.map(_evaluate_source_model, tasks), [])
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            polarizations = [
+                self._cache.get(
+                    self._cache_key(model, frequency_array, parameters=sample),
+                    lambda: self._strain_from_model(frequency_array, model, sample))
+                for sample in model_parameters]
+        return _stack_polarizations(polarizations, number_of_samples, len(frequency_array))
+
+    def _convert_batch(self, samples, number_of_samples):
+        """ Apply the parameter conversion to arrays of parameters, returns
+        None if the conversion does not support arrays """
+        try:
+            with self.timer('parameter_conversion'):
+                converted, _ = self._convert(samples)
+            converted = {key: np.broadcast_to(converted[key], (number_of_samples,))
+                         for key in self.source_parameter_keys.intersection(converted)}
+        except (TypeError, ValueError):
+            return None
+        converted.update(self.waveform_arguments)
+        return converted
+
+    def _converted_parameters(self, parameters):
+        """ The parameters passed to the source model, without changing
+        `self.parameters` """
+        with self.timer('parameter_conversion'):
+            converted, _ = self._convert(parameters)
+        converted = {key: converted[key]
+                     for key in self.source_parameter_keys.intersection(converted)}
+        converted.update(self.waveform_arguments)
+        return converted
+
+    def _convert(self, parameters):
+        """ Apply the parameter conversion to a copy of the parameters, using
+        the conversion compiled for their keys if there is one """
+        keys = frozenset(parameters)
+        try:
+            compiled = self._compiled_conversions[keys]
+        except KeyError:
+            compiled = compile_parameter_conversion(
+                self.parameter_conversion, keys,
+                required_keys=self.source_parameter_keys)
+            self._compiled_conversions[keys] = compiled
+        if compiled is None:
+            return self.parameter_conversion(dict(parameters))
+        return compiled(parameters)
+
+    def _cache_key(self, model, model_data_points, transformation_function=None,
+                   parameters=None):
+        """ The key of the waveform cache, None if the parameters can not be
+        hashed """
+        if self._cache.maximum_size == 0:
+            return None
+        if parameters is None:
+            parameters = self.parameters
+        try:
+            return (model, transformation_function, self.sampling_frequency,
+                    self._data_points_hash(model_data_points),
+                    _freeze(parameters))
+        except TypeError:
+            return None
+
+    def _analytic_reference_parameters(self, model, model_data_points):
+        """ The parameters to call the source model with, with the analytic
+        parameters at their reference values, and the rescalings to apply """
+        parameters = self.parameters
+        rescalings = []
+        if not self.analytic_rescaling or self._cache.maximum_size == 0:
+            return parameters, rescalings
+        analytic_parameters = getattr(model, 'analytic_parameters', dict())
+        for name in sorted(analytic_parameters):
+            analytic = analytic_parameters[name]
+            if name not in parameters or not analytic.applies(parameters):
+                continue
+            if not self._rescaling_is_valid(model, model_data_points, name, analytic):
+                continue
+            if len(rescalings) == 0:
+                parameters = parameters.copy()
+            rescalings.append((analytic, parameters[name]))
+            parameters[name] = analytic.reference
+        return parameters, rescalings
+
+    def _rescaling_is_valid(self, model, model_data_points, name, analytic):
+        """ Compare the rescaled waveform to the source model, once for each
+        source model, parameter and set of waveform arguments """
+        try:
+            key = (model, name, _freeze(self.waveform_arguments))
+        except TypeError:
+            return False
+        if key not in self._valid_rescalings:
+            value = self.parameters[name]
+            if value == analytic.reference:
+                value = analytic.reference + 1
+            parameters = self.parameters.copy()
+            parameters[name] = value
+            expected = self._strain_from_model(model_data_points, model, parameters)
+            parameters[name] = analytic.reference
+            reference = self._strain_from_model(model_data_points, model, parameters)
+            if expected is None or reference is None:
+                return False
+            valid = _polarizations_close(
+                analytic.rescale(reference, value, analytic.reference), expected)
+            if not valid:
+                utils.logger.warning(
+                    'The analytic rescaling of {} does not reproduce {}, the source '
+                    'model will be called for every value.'.format(
+                        name, getattr(model, '__name__', model)))
+            self._valid_rescalings[key] = valid
+        return self._valid_rescalings[key]
+
+    def _rescale(self, model_strain, rescalings):
+        if model_strain is None or len(rescalings) == 0:
+            return model_strain
+        with self.timer('analytic_rescaling'):
+            for analytic, value in rescalings:
+                model_strain = analytic.rescale(model_strain, value, analytic.reference)
+        return model_strain
+
+    def _data_points_hash(self, data_points):
+        """ Hash of the frequencies or times, stored for each array so that
+        large arrays are only hashed once """
+        data_points = np.asarray(data_points)
+        cached = self._data_point_hashes.get(id(data_points))
+        if cached is not None and cached[0] is data_points:
+            return cached[1]
+        if len(self._data_point_hashes) >= 8:
+            self._data_point_hashes.clear()
+        data_points_hash = (data_points.shape, hashlib.sha1(
+            np.ascontiguousarray(data_points).tobytes()).hexdigest())
+        self._data_point_hashes[id(data_points)] = (data_points, data_points_hash)
+        return data_points_hash
+
+    @property
+    def cache_statistics(self):
+        """ The number of cache hits and misses, the number of cached
+        waveforms and the memory they use in bytes """
+        return self._cache.statistics
+
+    def invalidate_cache(self):
+        """ Remove all waveforms from the cache
+
+        This is needed if the source model depends on state other than its
+        arguments, e.g., a global variable, which has changed.
+        """
+        self._cache.invalidate()
+        self._data_point_hashes.clear()
+
+    def _strain_from_model(self, model_data_points, model, parameters=None):
+        if parameters is None:
+            parameters = self.parameters
+        with self.timer('source_model'):
+            return model(model_data_points, **parameters)
 
     def _strain_from_transformed_model(self, transformed_model_data_points, transformed_model, transformation_function):
         transformed_model_strain = self._strain_from_model(transformed_model_data_points, transformed_model)
 
-        if isinstance(transformed_model_strain, np.ndarray):
-            return transformation_function(transformed_model_strain, self.sampling_frequency)
-
-        model_strain = dict()
-        for key in transformed_model_strain:
+        with self.timer('fourier_transform'):
             if transformation_function == utils.nfft:
-                model_strain[key], _ = \
-                    transformation_function(transformed_model_strain[key], self.sampling_frequency)
-            else:
-                model_strain[key] = transformation_function(transformed_model_strain[key], self.sampling_frequency)
-        return model_strain
+                model_strain = self._nfft_polarizations(transformed_model_strain)
+                if model_strain is not None:
+                    return model_strain
+
+            if isinstance(transformed_model_strain, np.ndarray):
+                return transformation_function(transformed_model_strain, self.sampling_frequency)
+
+            model_strain = dict()
+            for key in transformed_model_strain:
+                if transformation_function == utils.nfft:
+                    model_strain[key], _ = \
+                        transformation_function(transformed_model_strain[key], self.sampling_frequency)
+                else:
+                    model_strain[key] = transformation_function(transformed_model_strain[key], self.sampling_frequency)
+            return model_strain
+
+    def _nfft_polarizations(self, time_domain_strain):
+        """ The nfft of all the polarizations with a single FFT of a reused
+        (n_polarizations, n_times) buffer, None if the polarizations are not
+        real arrays of the same length """
+        if isinstance(time_domain_strain, np.ndarray):
+            polarizations = [time_domain_strain]
+        elif isinstance(time_domain_strain, dict):
+            polarizations = [time_domain_strain[key] for key in time_domain_strain]
+        else:
+            return None
+        if len(polarizations) == 0:
+            return None
+        polarizations = [np.asarray(polarization) for polarization in polarizations]
+        length = len(polarizations[0]) if polarizations[0].ndim == 1 else None
+        if length is None or any(polarization.shape != (length,) or
+                                 np.iscomplexobj(polarization)
+                                 for polarization in polarizations):
+            return None
+
+        shape = (len(polarizations), length + length % 2)
+        if self._fft_buffer is None or self._fft_buffer.shape != shape:
+            self._fft_buffer = np.zeros(shape)
+        for row, polarization in zip(self._fft_buffer, polarizations):
+            row[:length] = polarization
+        frequency_domain_strain = utils.rfft(self._fft_buffer, workers=self.fft_workers)
+        frequency_domain_strain /= self.sampling_frequency
+
+        if isinstance(time_domain_strain, np.ndarray):
+            return frequency_domain_strain[0]
+        return {key: frequency_domain_strain[ii] for ii, key in enumerate(time_domain_strain)}
+
+    @property
+    def parameter_conversion(self):
+        """ The function converting the sampled parameters to the parameters
+        of the source model """
+        return self._parameter_conversion
+
+    @parameter_conversion.setter
+    def parameter_conversion(self, parameter_conversion):
+        self._parameter_conversion = parameter_conversion
+        self._compiled_conversions = dict()
 
     @property
     def parameters(self):
@@ -191,7 +528,9 @@ class WaveformGenerator(object):
         Set parameters, this applies the conversion function and then removes
         any parameters which aren't required by the source function.
 
-        (set.symmetric_difference is the opposite of set.intersection)
+        The conversion is compiled for each set of keys, see
+        `bilby.gw.conversion.compile_parameter_conversion`, if it is
+        supported.
 
         Parameters
         ----------
@@ -201,13 +540,11 @@ class WaveformGenerator(object):
         """
         if not isinstance(parameters, dict):
             raise TypeError('"parameters" must be a dictionary.')
-        new_parameters = parameters.copy()
-        new_parameters, _ = self.parameter_conversion(new_parameters)
-        for key in self.source_parameter_keys.symmetric_difference(
-                new_parameters):
-            new_parameters.pop(key)
+        with self.timer('parameter_conversion'):
+            converted, _ = self._convert(parameters)
+        new_parameters = {key: converted[key] for key in self.source_parameter_keys}
+        new_parameters.update(self.waveform_arguments)
         self.__parameters = new_parameters
-        self.__parameters.update(self.waveform_arguments)
 
     def __parameters_from_source_model(self):
         """
@@ -291,3 +628,184 @@ class WaveformGenerator(object):
     @start_time.setter
     def start_time(self, start_time):
         self._times_and_frequencies.start_time = start_time
+
+
+class WaveformCache(object):
+    """ Least recently used cache of waveform polarizations
+
+    The arrays of cached waveforms are made read only, so that they can not
+    be modified in place by accident. A new dictionary is returned on every
+    call, so the polarizations can be replaced but not changed.
+
+    Parameters
+    ----------
+    maximum_size: int, optional
+        The maximum number of waveforms, zero disables the cache
+    maximum_memory: int, optional
+        The maximum number of bytes of the cached arrays
+
+    Attributes
+    ----------
+    hits, misses: int
+        The number of waveforms returned from, or added to, the cache
+    nbytes: int
+        The number of bytes of the cached arrays
+    """
+
+    def __init__(self, maximum_size=1, maximum_memory=None):
+        self.maximum_size = maximum_size
+        self.maximum_memory = maximum_memory
+        self._waveforms = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(maximum_size={}, maximum_memory={})'.format(
+            self.maximum_size, self.maximum_memory)
+
+    def get(self, key, function):
+        """ Return the cached waveform, computing it if needed
+
+        Parameters
+        ----------
+        key: hashable
+            The key of the waveform, if None the waveform is not cached
+        function: callable
+            Function without arguments returning the waveform
+
+        Returns
+        -------
+        dict, array_like: The waveform
+        """
+        if key is None or self.maximum_size == 0:
+            return function()
+        if key in self._waveforms:
+            self.hits += 1
+            waveform, nbytes = self._waveforms.pop(key)
+            self._waveforms[key] = (waveform, nbytes)
+            return _shallow_copy(waveform)
+        self.misses += 1
+        waveform = function()
+        nbytes = _nbytes(waveform)
+        if self.maximum_memory is None or nbytes <= self.maximum_memory:
+            _read_only(waveform)
+            self._waveforms[key] = (waveform, nbytes)
+            self.nbytes += nbytes
+            while len(self._waveforms) > self.maximum_size or (
+                    self.maximum_memory is not None and self.nbytes > self.maximum_memory):
+                _, (_, removed) = self._waveforms.popitem(last=False)
+                self.nbytes -= removed
+        return _shallow_copy(waveform)
+
+    def invalidate(self):
+        """ Remove all waveforms from the cache """
+        self._waveforms.clear()
+        self.nbytes = 0
+
+    @property
+    def statistics(self):
+        """ The number of cache hits and misses, the number of cached
+        waveforms and the memory they use in bytes """
+        return dict(hits=self.hits, misses=self.misses,
+                    size=len(self._waveforms), nbytes=self.nbytes)
+
+
+def _parameter_batch(parameters, keys=None):
+    """ Convert a batch of parameters to a dictionary of arrays and the number
+    of sets of parameters """
+    if isinstance(parameters, dict):
+        samples = {key: np.atleast_1d(parameters[key]) for key in parameters}
+    elif hasattr(parameters, 'columns'):
+        samples = {key: np.asarray(parameters[key]) for key in parameters.columns}
+    else:
+        parameters = np.atleast_2d(parameters)
+        if keys is None or parameters.shape[1] != len(keys):
+            raise ValueError("The names of the {} columns of parameters must be "
+                             "given".format(parameters.shape[1]))
+        samples = {key: parameters[:, ii] for ii, key in enumerate(keys)}
+    lengths = set(len(samples[key]) for key in samples)
+    if len(lengths) != 1:
+        raise ValueError("All parameters must have the same length")
+    return samples, lengths.pop()
+
+
+def _default_parameter_conversion(parameters):
+    """ The parameter conversion used if none is given, this is a module
+    level function so that waveform generators can be pickled """
+    return parameters, []
+
+
+def _evaluate_source_model(args):
+    model, frequency_array, samples = args
+    return [model(frequency_array, **parameters) for parameters in samples]
+
+
+def _stack_polarizations(polarizations, number_of_samples, number_of_frequencies):
+    """ Combine the polarizations of each set of parameters, or of all sets
+    of parameters if a single element is given, into (N, n_frequencies)
+    arrays """
+    modes = None
+    for waveform in polarizations:
+        if waveform is not None:
+            modes = list(waveform.keys())
+            break
+    if modes is None:
+        return None
+    shape = (number_of_samples, number_of_frequencies)
+    if len(polarizations) == 1:
+        return {mode: np.array(np.broadcast_to(polarizations[0][mode], shape), dtype=complex)
+                for mode in modes}
+    stacked = {mode: np.full(shape, np.nan, dtype=complex) for mode in modes}
+    for ii, waveform in enumerate(polarizations):
+        if waveform is None:
+            continue
+        for mode in modes:
+            stacked[mode][ii] = waveform[mode]
+    return stacked
+
+
+def _freeze(value):
+    """ Convert a parameter value to a hashable object, raises a TypeError if
+    this is not possible """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(value[key])) for key in value))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(element) for element in value)
+    elif isinstance(value, np.ndarray):
+        return value.shape, value.dtype.str, value.tobytes()
+    hash(value)
+    return value
+
+
+def _polarizations_close(polarizations, expected):
+    if isinstance(expected, dict):
+        return (isinstance(polarizations, dict) and set(polarizations) == set(expected) and
+                all(_polarizations_close(polarizations[mode], expected[mode]) for mode in expected))
+    expected = np.asarray(expected)
+    scale = np.max(np.abs(expected)) if expected.size > 0 else 0
+    return bool(np.allclose(polarizations, expected, rtol=1e-6, atol=1e-6 * scale))
+
+
+def _nbytes(waveform):
+    """ The size of the arrays of a waveform in bytes """
+    if isinstance(waveform, dict):
+        return sum(_nbytes(waveform[key]) for key in waveform)
+    elif isinstance(waveform, np.ndarray):
+        return waveform.nbytes
+    return 0
+
+
+def _read_only(waveform):
+    """ Make the arrays of a waveform read only """
+    if isinstance(waveform, dict):
+        for key in waveform:
+            _read_only(waveform[key])
+    elif isinstance(waveform, np.ndarray):
+        waveform.flags.writeable = False
+
+
+def _shallow_copy(waveform):
+    if isinstance(waveform, dict):
+        return dict(waveform)
+    return waveform
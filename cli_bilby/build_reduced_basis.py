@@ -0,0 +1,73 @@
+import argparse
+
+
+def setup_command_line_args():
+    parser = argparse.ArgumentParser(
+        description="Build reduced order quadrature bases for "
+                    "bilby.gw.likelihood.ROQGravitationalWaveTransient")
+    parser.add_argument("-p", "--prior-file", required=True,
+                        help="Prior file to draw the training set from.")
+    parser.add_argument("-n", "--size", type=int, default=1000,
+                        help="Number of training waveforms.")
+    parser.add_argument("-d", "--duration", type=float, default=4,
+                        help="Duration of the data in seconds.")
+    parser.add_argument("-s", "--sampling-frequency", type=float, default=4096,
+                        help="Sampling frequency of the data in Hz.")
+    parser.add_argument("--minimum-frequency", type=float, default=20,
+                        help="Minimum frequency of the analysis in Hz.")
+    parser.add_argument("--maximum-frequency", type=float, default=None,
+                        help="Maximum frequency of the analysis in Hz.")
+    parser.add_argument("--source-model",
+                        default="lal_binary_black_hole_frequency_sequence",
+                        help="Name of the source model in bilby.gw.source.")
+    parser.add_argument("--parameter-conversion",
+                        default="convert_to_lal_binary_black_hole_parameters",
+                        help="Name of the parameter conversion in "
+                             "bilby.gw.conversion.")
+    parser.add_argument("--waveform-approximant", default="IMRPhenomPv2",
+                        help="The waveform approximant.")
+    parser.add_argument("--reference-frequency", type=float, default=50,
+                        help="The reference frequency in Hz.")
+    parser.add_argument("--linear-tolerance", type=float, default=1e-12,
+                        help="Projection error tolerance of the linear basis.")
+    parser.add_argument("--quadratic-tolerance", type=float, default=1e-12,
+                        help="Projection error tolerance of the quadratic "
+                             "basis.")
+    parser.add_argument("--maximum-basis-size", type=int, default=None,
+                        help="Maximum number of elements of each basis.")
+    parser.add_argument("--npool", type=int, default=1,
+                        help="Number of processes to use.")
+    parser.add_argument("--chunk-size", type=int, default=100,
+                        help="Number of training waveforms in each task.")
+    parser.add_argument("-o", "--outdir", default="outdir",
+                        help="Output directory.")
+    parser.add_argument("-l", "--label", default="roq",
+                        help="Label for the output files.")
+    args, _ = parser.parse_known_args()
+
+    return args
+
+
+def main():
+    args = setup_command_line_args()
+    import bilby
+    priors = bilby.core.prior.PriorDict(filename=args.prior_file)
+    waveform_generator = bilby.gw.WaveformGenerator(
+        duration=args.duration, sampling_frequency=args.sampling_frequency,
+        frequency_domain_source_model=getattr(
+            bilby.gw.source, args.source_model),
+        parameter_conversion=getattr(
+            bilby.gw.conversion, args.parameter_conversion),
+        waveform_arguments=dict(
+            waveform_approximant=args.waveform_approximant,
+            reference_frequency=args.reference_frequency,
+            minimum_frequency=args.minimum_frequency))
+    bilby.gw.reduced_basis.build_roq_bases(
+        waveform_generator=waveform_generator, priors=priors, size=args.size,
+        outdir=args.outdir, label=args.label,
+        minimum_frequency=args.minimum_frequency,
+        maximum_frequency=args.maximum_frequency,
+        linear_tolerance=args.linear_tolerance,
+        quadratic_tolerance=args.quadratic_tolerance,
+        maximum_basis_size=args.maximum_basis_size, npool=args.npool,
+        chunk_size=args.chunk_size)
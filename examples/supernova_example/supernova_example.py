@@ -49,14 +49,11 @@ ifos.set_strain_data_from_power_spectral_densities(
 ifos.inject_signal(waveform_generator=waveform_generator,
                    parameters=injection_parameters)
 
-# read in from a file the PCs used to create the signal model.
-realPCs = np.loadtxt('SupernovaRealPCs.txt')
-imagPCs = np.loadtxt('SupernovaImagPCs.txt')
-
 # Now we make another waveform_generator because the signal model is
-# not the same as the injection in this case.
+# not the same as the injection in this case. The signal model is made from
+# the PCs in these files, which are read the first time it is used.
 simulation_parameters = dict(
-    realPCs=realPCs, imagPCs=imagPCs)
+    realPCs='SupernovaRealPCs.txt', imagPCs='SupernovaImagPCs.txt')
 
 search_waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
     duration=duration, sampling_frequency=sampling_frequency,
@@ -85,7 +85,8 @@ setup(name='bilby',
           'pandas',
           'scipy'],
       entry_points={'console_scripts':
-                    ['bilby_plot=cli_bilby.plot_multiple_posteriors:main']
+                    ['bilby_plot=cli_bilby.plot_multiple_posteriors:main',
+                     'bilby_reduced_basis=cli_bilby.build_reduced_basis:main']
                     },
       classifiers=[
           "Programming Language :: Python :: 2.7",
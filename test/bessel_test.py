@@ -0,0 +1,40 @@
+from __future__ import absolute_import, division
+import unittest
+import bilby
+import numpy as np
+
+
+class TestLnI0(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.array([0, 1e-2, 0.5, 3, 50, 600])
+
+    def tearDown(self):
+        del self.values
+
+    def test_matches_numpy_bessel_function(self):
+        self.assertTrue(np.allclose(bilby.gw.bessel.ln_i0(self.values),
+                                    np.log(np.i0(self.values)), rtol=1e-10, atol=1e-16))
+
+    def test_small_values(self):
+        self.assertEqual(bilby.gw.bessel.ln_i0(0), 0)
+        self.assertAlmostEqual(bilby.gw.bessel.ln_i0(1e-6) / 2.5e-13, 1, places=12)
+
+    def test_scalar_matches_array(self):
+        array = bilby.gw.bessel.ln_i0(self.values)
+        for value, expected in zip(self.values, array):
+            self.assertAlmostEqual(bilby.gw.bessel.ln_i0(value), expected, places=12)
+
+    def test_negative_values(self):
+        self.assertTrue(np.array_equal(bilby.gw.bessel.ln_i0(-self.values),
+                                       bilby.gw.bessel.ln_i0(self.values)))
+
+    def test_large_values_do_not_overflow(self):
+        values = np.array([1e4, 1e10, 1e20])
+        expected = values - np.log(2 * np.pi * values) / 2
+        self.assertTrue(np.allclose(bilby.gw.bessel.ln_i0(values), expected))
+        self.assertEqual(bilby.gw.bessel.ln_i0(np.inf), np.inf)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 from bilby.gw import calibration
 import unittest
 import numpy as np
+from scipy.interpolate import UnivariateSpline
 
 
 class TestBaseClass(unittest.TestCase):
@@ -21,6 +22,12 @@ class TestBaseClass(unittest.TestCase):
         cal_factor = self.model.get_calibration_factor(frequency_array)
         assert np.alltrue(cal_factor.real == np.ones_like(frequency_array))
 
+    def test_calibration_factor_batch(self):
+        frequency_array = np.linspace(20, 1024, 1000)
+        cal_factor = self.model.get_calibration_factor_batch(frequency_array, [dict(), dict()])
+        self.assertEqual((2, 1000), cal_factor.shape)
+        assert np.alltrue(cal_factor == 1)
+
 
 class TestCubicSpline(unittest.TestCase):
 
@@ -50,6 +57,38 @@ class TestCubicSpline(unittest.TestCase):
                                                        **self.parameters)
         assert np.alltrue(cal_factor.real == np.ones_like(frequency_array))
 
+    def _univariate_spline_factor(self, frequency_array, parameters):
+        amplitude = UnivariateSpline(self.model.spline_points, [
+            parameters['recalib_amplitude_{}'.format(ii)] for ii in range(self.n_points)])(frequency_array)
+        phase = UnivariateSpline(self.model.spline_points, [
+            parameters['recalib_phase_{}'.format(ii)] for ii in range(self.n_points)])(frequency_array)
+        return (1 + amplitude) * (2 + 1j * phase) / (2 - 1j * phase)
+
+    def test_calibration_factor_matches_univariate_spline(self):
+        np.random.seed(10)
+        frequency_array = np.linspace(20, 1024, 1000)
+        for scale in [0.1, 5]:
+            parameters = {key: np.random.normal(0, scale) for key in self.parameters}
+            self.assertTrue(np.allclose(
+                self._univariate_spline_factor(frequency_array, parameters),
+                self.model.get_calibration_factor(frequency_array, **parameters)))
+
+    def test_calibration_factor_batch(self):
+        np.random.seed(10)
+        frequency_array = np.linspace(20, 1024, 1000)
+        samples = [{key: np.random.normal(0, 0.1) for key in self.parameters} for _ in range(4)]
+        cal_factor = self.model.get_calibration_factor_batch(frequency_array, samples)
+        self.assertEqual((4, 1000), cal_factor.shape)
+        for sample, factor in zip(samples, cal_factor):
+            self.assertTrue(np.allclose(self._univariate_spline_factor(frequency_array, sample), factor))
+
+    def test_spline_basis_cached(self):
+        frequency_array = np.linspace(20, 1024, 1000)
+        basis = self.model.spline_basis(frequency_array)
+        self.assertEqual((1000, self.n_points), basis.shape)
+        self.assertIs(basis, self.model.spline_basis(frequency_array.copy()))
+        self.assertIsNot(basis, self.model.spline_basis(frequency_array[:500]))
+
     def test_repr(self):
         expected = 'CubicSpline(prefix=\'{}\', minimum_frequency={}, maximum_frequency={}, n_points={})'\
             .format(self.prefix, self.minimum_frequency, self.maximum_frequency, self.n_points)
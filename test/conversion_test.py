@@ -3,6 +3,8 @@ import unittest
 import mock
 from bilby.gw import conversion
 import numpy as np
+import pandas as pd
+import bilby
 
 
 class TestBasicConversions(unittest.TestCase):
@@ -142,5 +144,126 @@ class TestConvertToLALParams(unittest.TestCase):
                 tilt_1=42, cos_tilt_1=1, lambda_1=0, lambda_2=0))
 
 
+class TestCompiledParameterConversion(unittest.TestCase):
+
+    def setUp(self):
+        self.parameters = dict(
+            mass_ratio=0.8, cos_tilt_1=0.3, tilt_2=0.2, a_1=0.1, a_2=0.2,
+            phi_12=0.3, phi_jl=0.4, iota=0.5, phase=0.6,
+            luminosity_distance=400.)
+        self.mass_keys = [
+            dict(chirp_mass=1.2), dict(chirp_mass=1.2, total_mass=3.),
+            dict(chirp_mass=1.2, symmetric_mass_ratio=0.24),
+            dict(total_mass=3.), dict(mass_1=1.5), dict(mass_2=1.2)]
+        self.tidal_keys = [
+            dict(), dict(lambda_1=400.), dict(lambda_1=400., lambda_2=None),
+            dict(lambda_tilde=300.), dict(lambda_tilde=300., delta_lambda=20.)]
+
+    def tearDown(self):
+        del self.parameters
+        del self.mass_keys
+        del self.tidal_keys
+
+    def _assert_matches(self, conversion_function, parameters):
+        expected, expected_added_keys = conversion_function(parameters.copy())
+        compiled = conversion.compile_parameter_conversion(
+            conversion_function, parameters)
+        converted, added_keys = compiled(parameters)
+        self.assertDictEqual(expected, converted)
+        self.assertEqual(set(expected_added_keys), set(added_keys))
+
+    def test_bbh_matches_conversion(self):
+        for masses in self.mass_keys:
+            self.parameters.update(masses)
+            self._assert_matches(
+                conversion.convert_to_lal_binary_black_hole_parameters,
+                self.parameters)
+
+    def test_bns_matches_conversion(self):
+        self.parameters['mass_1'] = 1.5
+        for tides in self.tidal_keys:
+            parameters = self.parameters.copy()
+            parameters.update(tides)
+            self._assert_matches(
+                conversion.convert_to_lal_binary_neutron_star_parameters,
+                parameters)
+
+    def test_does_not_modify_parameters(self):
+        self.parameters['chirp_mass'] = 1.2
+        parameters = self.parameters.copy()
+        compiled = conversion.compile_parameter_conversion(
+            conversion.convert_to_lal_binary_black_hole_parameters, parameters)
+        compiled(parameters)
+        self.assertDictEqual(self.parameters, parameters)
+
+    def test_arrays(self):
+        self.parameters['chirp_mass'] = np.array([1.2, 1.3])
+        self.parameters['mass_ratio'] = np.array([0.8, 0.5])
+        compiled = conversion.compile_parameter_conversion(
+            conversion.convert_to_lal_binary_black_hole_parameters,
+            self.parameters)
+        converted, _ = compiled(self.parameters)
+        expected, _ = conversion.convert_to_lal_binary_black_hole_parameters(
+            self.parameters.copy())
+        for key in ['mass_1', 'mass_2', 'tilt_1']:
+            self.assertTrue(np.array_equal(expected[key], converted[key]))
+
+    def test_pruned_conversion(self):
+        self.parameters['chirp_mass'] = 1.2
+        compiled = conversion.compile_parameter_conversion(
+            conversion.convert_to_lal_binary_black_hole_parameters,
+            self.parameters, required_keys=['mass_1', 'mass_2'])
+        converted, _ = compiled(self.parameters)
+        self.assertNotIn('tilt_1', converted)
+        self.assertIn('mass_1', converted)
+
+    def test_unsupported_conversion(self):
+        self.assertIsNone(conversion.compile_parameter_conversion(
+            lambda parameters: (parameters, []), self.parameters))
+
+
+
+class TestComputeSNRs(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=512, duration=4,
+            start_time=self.parameters['geocent_time'] - 2)
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=4, sampling_frequency=512,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=interferometers, waveform_generator=waveform_generator)
+        self.samples = pd.DataFrame({key: [self.parameters[key]] * 5 for key in self.parameters})
+        self.samples['luminosity_distance'] = np.linspace(500, 1500, 5)
+
+    def tearDown(self):
+        del self.parameters
+        del self.likelihood
+        del self.samples
+
+    def test_samples_computed_in_blocks(self):
+        expected = [dict(self.samples.iloc[ii]) for ii in range(len(self.samples))]
+        self.likelihood._batch_block_size = 2
+        with mock.patch.object(
+                self.likelihood.waveform_generator, 'frequency_domain_strain_batch',
+                wraps=self.likelihood.waveform_generator.frequency_domain_strain_batch) as batch:
+            conversion.compute_snrs(self.samples, self.likelihood)
+        self.assertEqual([2, 2, 1], [len(call[0][0]) for call in batch.call_args_list])
+        for ii, sample in enumerate(expected):
+            conversion.compute_snrs(sample, self.likelihood)
+            for interferometer in self.likelihood.interferometers:
+                for key in ['{}_matched_filter_snr', '{}_optimal_snr']:
+                    key = key.format(interferometer.name)
+                    self.assertAlmostEqual(sample[key], self.samples[key][ii])
+
+
 if __name__ == '__main__':
     unittest.main()
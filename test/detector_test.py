@@ -284,6 +284,116 @@ class TestInterferometer(unittest.TestCase):
             parameters=dict(ra=0, dec=0, geocent_time=0, psi=0))
         self.assertTrue(np.array_equal(response, (plus + cross) * self.ifo.frequency_mask * np.exp(-0j)))
 
+    def test_get_detector_response_with_frequencies(self):
+        self.ifo.antenna_response = MagicMock(return_value=1)
+        self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
+        self.ifo.epoch = 1
+        frequencies = np.array([5., 15., 250.])
+        plus = np.ones(3)
+        response = self.ifo.get_detector_response(
+            waveform_polarizations=dict(plus=plus),
+            parameters=dict(ra=0, dec=0, geocent_time=0, psi=0),
+            frequencies=frequencies)
+        expected_response = plus * np.exp(
+            -1j * 2 * np.pi * (0 - self.ifo.strain_data.start_time) * frequencies)
+        self.assertTrue(np.allclose(response, expected_response))
+
+    def test_power_spectral_density_array_is_cached(self):
+        first = self.ifo.power_spectral_density_array
+        second = self.ifo.power_spectral_density_array
+        self.assertIs(first, second)
+        self.assertTrue(first.flags.writeable)
+        statistics = self.ifo.cache_statistics['power_spectral_density_array']
+        self.assertEqual(statistics, dict(hits=1, misses=1))
+
+    def test_invalidate_cache_after_modifying_in_place(self):
+        expected = np.array(self.ifo.power_spectral_density_array)
+        self.ifo.power_spectral_density_array[1] = 0
+        self.assertEqual(0, self.ifo.power_spectral_density_array[1])
+        self.ifo.invalidate_cache()
+        self.assertTrue(np.array_equal(expected, self.ifo.power_spectral_density_array))
+
+    def test_power_spectral_density_array_updates_with_psd(self):
+        first = np.array(self.ifo.power_spectral_density_array)
+        self.ifo.power_spectral_density.psd_array = \
+            2 * self.ifo.power_spectral_density.psd_array
+        self.assertTrue(np.array_equal(
+            self.ifo.power_spectral_density_array[1:], 2 * first[1:]))
+        self.ifo.power_spectral_density = \
+            bilby.gw.detector.PowerSpectralDensity.from_aligo()
+        self.assertTrue(np.array_equal(
+            self.ifo.power_spectral_density_array[1:], first[1:]))
+
+    def test_power_spectral_density_array_updates_with_window_factor(self):
+        first = np.array(self.ifo.power_spectral_density_array)
+        self.ifo.strain_data.window_factor = 0.5
+        self.assertTrue(np.array_equal(
+            self.ifo.power_spectral_density_array[1:], 0.5 * first[1:]))
+
+    def test_cached_arrays_update_with_strain_data(self):
+        mask = self.ifo.frequency_mask
+        psd = self.ifo.power_spectral_density_array
+        self.ifo.set_strain_data_from_frequency_domain_strain(
+            np.ones(2049), sampling_frequency=4096, duration=1)
+        self.assertEqual(len(self.ifo.frequency_mask), 2049)
+        self.assertEqual(len(self.ifo.power_spectral_density_array), 2049)
+        self.assertTrue(np.array_equal(
+            self.ifo.frequency_domain_strain, self.ifo.frequency_mask))
+        self.assertIsNot(mask, self.ifo.frequency_mask)
+        self.assertIsNot(psd, self.ifo.power_spectral_density_array)
+
+    def test_frequency_mask_updates_with_frequency_bounds(self):
+        self.assertEqual(np.sum(self.ifo.frequency_mask), 19)
+        self.ifo.maximum_frequency = 30
+        self.assertEqual(np.sum(self.ifo.frequency_mask), 39)
+        self.assertEqual(np.count_nonzero(self.ifo.frequency_domain_strain), 39)
+
+    def test_invalidate_cache(self):
+        first = self.ifo.power_spectral_density_array
+        self.ifo.invalidate_cache()
+        self.assertIsNot(first, self.ifo.power_spectral_density_array)
+        self.assertTrue(np.array_equal(
+            first, self.ifo.power_spectral_density_array))
+
+    def test_in_band_arrays(self):
+        mask = self.ifo.frequency_mask
+        self.assertEqual(self.ifo.frequency_slice, slice(21, 40))
+        self.assertTrue(np.array_equal(self.ifo.in_band_frequency_array,
+                                       self.ifo.frequency_array[mask]))
+        self.assertTrue(np.array_equal(self.ifo.in_band_frequency_domain_strain,
+                                       self.ifo.frequency_domain_strain[mask]))
+        self.assertTrue(np.array_equal(self.ifo.in_band_power_spectral_density_array,
+                                       self.ifo.power_spectral_density_array[mask]))
+
+    def test_in_band_arrays_empty_band(self):
+        self.ifo.minimum_frequency = 30
+        self.ifo.maximum_frequency = 20
+        self.assertEqual(len(self.ifo.in_band_frequency_array), 0)
+
+    def test_get_detector_response_in_band(self):
+        self.ifo.antenna_response = MagicMock(return_value=1)
+        self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
+        plus = np.linspace(0, 1, len(self.ifo.frequency_array)) * (1 + 1j)
+        parameters = dict(ra=0, dec=0, geocent_time=1, psi=0)
+        response = self.ifo.get_detector_response(
+            waveform_polarizations=dict(plus=plus), parameters=parameters)
+        in_band_response = self.ifo.get_detector_response(
+            waveform_polarizations=dict(plus=plus), parameters=parameters,
+            in_band=True)
+        self.assertTrue(np.allclose(in_band_response,
+                                    response[self.ifo.frequency_mask]))
+
+    def test_snr_squared_in_band(self):
+        signal = np.linspace(0, 1, len(self.ifo.frequency_array)) * (1 + 1j)
+        signal = signal * self.ifo.frequency_mask
+        in_band_signal = signal[self.ifo.frequency_slice]
+        self.assertAlmostEqual(
+            self.ifo.optimal_snr_squared(signal),
+            self.ifo.optimal_snr_squared(in_band_signal, in_band=True))
+        self.assertAlmostEqual(
+            self.ifo.matched_filter_snr_squared(signal),
+            self.ifo.matched_filter_snr_squared(in_band_signal, in_band=True))
+
     def test_inject_signal_no_waveform_polarizations(self):
         with self.assertRaises(ValueError):
             self.ifo.inject_signal(injection_polarizations=None, parameters=None)
@@ -999,6 +1109,171 @@ class TestInterferometerList(unittest.TestCase):
                 bilby.gw.detector.InterferometerList.from_hdf5(filename)
 
 
+class TestNetworkAntennaResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.ifos = bilby.gw.detector.InterferometerList(['H1', 'L1', 'V1'])
+        self.ra = np.array([0.1, 1.3, 4.5, 6.])
+        self.dec = np.array([-1.2, -0.4, 0.3, 1.1])
+        self.time = 1126259642.413 + np.array([0, 100., 1e4, 1e5])
+        self.psi = np.array([0.1, 0.5, 1.5, 3.])
+
+    def tearDown(self):
+        del self.ifos
+        del self.ra
+        del self.dec
+        del self.time
+        del self.psi
+
+    def test_antenna_response(self):
+        responses = self.ifos.antenna_response(self.ra, self.dec, self.time, self.psi)
+        self.assertEqual(set(bilby.gw.utils.POLARIZATION_MODES), set(responses))
+        for mode in responses:
+            self.assertEqual((3, 4), responses[mode].shape)
+            for ii, ifo in enumerate(self.ifos):
+                for jj in range(4):
+                    self.assertAlmostEqual(
+                        ifo.antenna_response(self.ra[jj], self.dec[jj], self.time[jj],
+                                             self.psi[jj], mode),
+                        responses[mode][ii, jj])
+
+    def test_interferometer_antenna_response_arrays(self):
+        responses = self.ifos[0].antenna_response(self.ra, self.dec, self.time, 0.2, 'cross')
+        for jj in range(4):
+            self.assertAlmostEqual(
+                self.ifos[0].antenna_response(self.ra[jj], self.dec[jj], self.time[jj], 0.2, 'cross'),
+                responses[jj])
+
+    def test_time_delay_from_geocenter(self):
+        delays = self.ifos.time_delay_from_geocenter(self.ra, self.dec, self.time)
+        self.assertEqual((3, 4), delays.shape)
+        for ii, ifo in enumerate(self.ifos):
+            for jj in range(4):
+                self.assertAlmostEqual(
+                    ifo.time_delay_from_geocenter(self.ra[jj], self.dec[jj], self.time[jj]),
+                    delays[ii, jj])
+
+    def test_single_detector(self):
+        responses = bilby.gw.utils.get_antenna_response(
+            self.ifos[0].detector_tensor, self.ra, self.dec, self.time, self.psi, ['plus'])
+        self.assertEqual((4,), responses['plus'].shape)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.ifos.antenna_response(self.ra, self.dec, self.time, self.psi, ['circular'])
+
+
+class TestAntennaResponseTable(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = 'outdir'
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(self.outdir)
+        self.filename = os.path.join(self.outdir, 'table.npy')
+        self.ifos = bilby.gw.detector.InterferometerList(['H1', 'L1', 'V1'])
+        self.table = self.ifos.enable_antenna_response_table(resolution=1., filename=self.filename)
+        self.exact_ifos = bilby.gw.detector.InterferometerList(['H1', 'L1', 'V1'])
+        self.ra = np.array([0.1, 1.3, 4.5, 6.])
+        self.dec = np.array([-1.2, -0.4, 0.3, 1.1])
+        self.time = 1126259642.413 + np.array([0, 100., 1e4, 1e5])
+        self.psi = np.array([0.1, 0.5, 1.5, 3.])
+        # h^2 / 8 for the 1 degree grid
+        self.response_tolerance = 2e-4
+        self.time_delay_tolerance = 2e-6
+
+    def tearDown(self):
+        rmtree(self.outdir)
+        del self.ifos
+        del self.table
+        del self.exact_ifos
+
+    def test_maximum_errors_within_bounds(self):
+        for (name, key), error in self.table.maximum_errors.items():
+            if key == 'time_delay':
+                self.assertLess(error, self.time_delay_tolerance)
+            else:
+                self.assertLess(error, self.response_tolerance)
+
+    def test_antenna_response(self):
+        responses = self.ifos.antenna_response(self.ra, self.dec, self.time, self.psi, ['plus', 'cross'])
+        expected = self.exact_ifos.antenna_response(self.ra, self.dec, self.time, self.psi, ['plus', 'cross'])
+        for mode in ['plus', 'cross']:
+            self.assertEqual((3, 4), responses[mode].shape)
+            self.assertLess(np.max(abs(responses[mode] - expected[mode])), self.response_tolerance)
+            for ii, ifo in enumerate(self.ifos):
+                for jj in range(4):
+                    self.assertAlmostEqual(
+                        ifo.antenna_response(self.ra[jj], self.dec[jj], self.time[jj], self.psi[jj], mode),
+                        responses[mode][ii, jj])
+
+    def test_time_delay_from_geocenter(self):
+        delays = self.ifos.time_delay_from_geocenter(self.ra, self.dec, self.time)
+        expected = self.exact_ifos.time_delay_from_geocenter(self.ra, self.dec, self.time)
+        self.assertLess(np.max(abs(delays - expected)), self.time_delay_tolerance)
+        for ii, ifo in enumerate(self.ifos):
+            self.assertAlmostEqual(
+                expected[ii, 1], ifo.time_delay_from_geocenter(self.ra[1], self.dec[1], self.time[1]), 5)
+
+    def test_other_modes_are_exact(self):
+        self.assertEqual(
+            self.exact_ifos[0].antenna_response(1., 0.2, 1e9, 0.3, 'breathing'),
+            self.ifos[0].antenna_response(1., 0.2, 1e9, 0.3, 'breathing'))
+
+    def test_table_loaded_from_file(self):
+        with mock.patch('bilby.gw.detector.AntennaResponseTable._create_table') as m:
+            table = bilby.gw.detector.AntennaResponseTable(self.ifos, resolution=1., filename=self.filename)
+            self.assertFalse(m.called)
+        self.assertIsInstance(table.table, np.memmap)
+        self.assertTrue(np.array_equal(self.table.table, table.table))
+
+    def test_table_rebuilt_for_other_resolution(self):
+        table = bilby.gw.detector.AntennaResponseTable(self.ifos, resolution=2., filename=self.filename)
+        self.assertEqual((91, 181, 3, 3), table.table.shape)
+
+    def test_table_rebuilt_for_other_detectors(self):
+        ifos = bilby.gw.detector.InterferometerList(['H1', 'L1', 'K1'])
+        table = bilby.gw.detector.AntennaResponseTable(ifos, resolution=1., filename=self.filename)
+        self.assertIsNotNone(table.maximum_errors)
+        self.assertFalse(np.array_equal(self.table.table[..., 2], table.table[..., 2]))
+
+    def test_table_not_saved_by_default(self):
+        directory = os.path.join(self.outdir, 'default')
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(directory)
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            table = bilby.gw.detector.AntennaResponseTable(self.ifos, resolution=2.)
+            self.assertEqual([], os.listdir('.'))
+        finally:
+            os.chdir(cwd)
+        self.assertIsNone(table.filename)
+        self.assertNotIsInstance(table.table, np.memmap)
+
+    def test_global_random_state_not_used(self):
+        np.random.seed(10)
+        expected = np.random.uniform()
+        np.random.seed(10)
+        bilby.gw.detector.AntennaResponseTable(self.ifos, resolution=2.)
+        self.assertEqual(expected, np.random.uniform())
+
+    def test_pickle_maps_file(self):
+        import pickle
+        table = pickle.loads(pickle.dumps(self.table))
+        self.assertIsInstance(table.table, np.memmap)
+        self.assertEqual(self.table.network_response(1., 0.2, 1e9, 0.3)['plus'].tolist(),
+                         table.network_response(1., 0.2, 1e9, 0.3)['plus'].tolist())
+
+    def test_disable(self):
+        self.ifos.disable_antenna_response_table()
+        self.assertIsNone(self.ifos.response_table)
+        self.assertEqual(
+            self.exact_ifos[0].antenna_response(1., 0.2, 1e9, 0.3, 'plus'),
+            self.ifos[0].antenna_response(1., 0.2, 1e9, 0.3, 'plus'))
+
+    def test_wrong_interferometer(self):
+        with self.assertRaises(ValueError):
+            self.exact_ifos[0].set_antenna_response_table(self.table, 1)
+
+
 class TestPowerSpectralDensityWithoutFiles(unittest.TestCase):
 
     def setUp(self):
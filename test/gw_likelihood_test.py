@@ -1,7 +1,11 @@
 from __future__ import division, absolute_import
 import unittest
+import os
+import mock
+from shutil import rmtree
 import bilby
 import numpy as np
+import pandas as pd
 
 
 class TestBasicGWTransient(unittest.TestCase):
@@ -130,6 +134,47 @@ class TestGWTransient(unittest.TestCase):
                          np.nan_to_num(-np.inf))
         self.likelihood.parameters['mass_2'] = 29
 
+    def test_log_likelihood_batch(self):
+        """Test the batched log likelihood matches evaluating each sample"""
+        samples = pd.DataFrame(dict(
+            mass_1=[30., 31., 32., 20.], ra=[0.5, 1.375, 2., 3.],
+            geocent_time=self.parameters['geocent_time'] + np.array([0, 0.01, -0.01, 0])))
+        expected = []
+        for ii in range(len(samples)):
+            self.likelihood.parameters.update(samples.iloc[ii].to_dict())
+            expected.append(self.likelihood.log_likelihood())
+        self.likelihood.parameters = self.parameters.copy()
+        actual = self.likelihood.log_likelihood_batch(samples)
+        self.assertTrue(np.allclose(actual, expected))
+        self.assertEqual(self.likelihood.parameters, self.parameters)
+
+    def test_log_likelihood_batch_array(self):
+        """Test the batched log likelihood with an array and keys"""
+        samples = np.array([[30., 0.5], [31., 1.375]])
+        expected = []
+        for mass_1, ra in samples:
+            self.likelihood.parameters.update(dict(mass_1=mass_1, ra=ra))
+            expected.append(self.likelihood.log_likelihood())
+        actual = self.likelihood.log_likelihood_batch(samples, keys=['mass_1', 'ra'])
+        self.assertTrue(np.allclose(actual, expected))
+
+    def test_timing_report_disabled_by_default(self):
+        self.likelihood.log_likelihood_ratio()
+        self.assertIsNone(self.likelihood.timing_report)
+
+    def test_timing_report(self):
+        self.likelihood.enable_timing()
+        self.likelihood.log_likelihood_ratio()
+        self.likelihood.parameters['mass_1'] = 32.
+        self.likelihood.log_likelihood_ratio()
+        report = self.likelihood.timing_report
+        for stage in ['parameter_conversion', 'source_model', 'antenna_response',
+                      'time_shift', 'calibration', 'inner_products', 'marginalization']:
+            self.assertIn(stage, report)
+        self.assertEqual(report['source_model']['calls'], 2)
+        self.assertEqual(report['inner_products']['calls'],
+                         2 * len(self.interferometers))
+
     def test_repr(self):
         expected = 'GravitationalWaveTransient(interferometers={},\n\twaveform_generator={},\n\t' \
                    'time_marginalization={}, distance_marginalization={}, phase_marginalization={}, ' \
@@ -235,6 +280,145 @@ class TestTimeMarginalization(unittest.TestCase):
         self.assertAlmostEqual(marg_like, self.time.log_likelihood_ratio(),
                                delta=0.5)
 
+    def test_time_marginalisation_restricted_to_prior(self):
+        """
+        Test only the times supported by the prior are evaluated and that
+        the work buffer is reused between calls.
+        """
+        self.prior['geocent_time'] = bilby.prior.Uniform(
+            minimum=self.parameters['geocent_time'] + 1 - 0.1,
+            maximum=self.parameters['geocent_time'] + 1 + 0.1)
+        self.time = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            time_marginalization=True, priors=self.prior.copy()
+        )
+        self.assertTrue(np.all(self.time.time_prior_array[self.time._time_indices] > 0))
+        self.assertEqual(np.count_nonzero(self.time.time_prior_array),
+                         len(self.time._time_indices))
+        self.assertLess(len(self.time._time_indices),
+                        len(self.time.time_prior_array) / 10)
+        self.time.parameters = self.parameters.copy()
+        self.time.parameters['geocent_time'] = self.waveform_generator.start_time
+        buffer = self.time._time_marginalization_integrand
+        first = self.time.log_likelihood_ratio()
+        self.assertIs(buffer, self.time._time_marginalization_integrand)
+        self.assertEqual(first, self.time.log_likelihood_ratio())
+
+
+
+class TestDistanceMarginalization(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 512
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - self.duration / 2)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator)
+
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['luminosity_distance'] = bilby.prior.PowerLaw(
+            alpha=2, minimum=100, maximum=5000)
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.prior.copy())
+        self.likelihood.parameters = self.parameters.copy()
+        self.outdir = 'outdir'
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(self.outdir)
+        self.lookup_table = os.path.join(self.outdir, 'lookup_table.npz')
+        self.distance = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            distance_marginalization=True, priors=self.prior.copy(),
+            distance_marginalization_lookup_table=self.lookup_table)
+
+    def tearDown(self):
+        rmtree(self.outdir)
+        del self.duration
+        del self.sampling_frequency
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+        del self.likelihood
+        del self.distance
+
+    def test_distance_marginalisation(self):
+        """
+        Test distance marginalised likelihood matches brute force version.
+        """
+        distances = np.linspace(100, 5000, 2000)
+        lls = []
+        for distance in distances:
+            self.likelihood.parameters['luminosity_distance'] = distance
+            lls.append(self.likelihood.log_likelihood_ratio())
+        marg_like = np.log(np.trapz(
+            np.exp(lls) * self.prior['luminosity_distance'].prob(distances),
+            distances))
+        self.distance.parameters = self.parameters.copy()
+        self.assertAlmostEqual(marg_like, self.distance.log_likelihood_ratio(),
+                               delta=0.5)
+
+    def test_lookup_table_is_reused(self):
+        with mock.patch.object(bilby.gw.likelihood.GravitationalWaveTransient,
+                               '_create_lookup_table') as m:
+            new = bilby.gw.likelihood.GravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator,
+                distance_marginalization=True, priors=self.prior.copy(),
+                distance_marginalization_lookup_table=self.lookup_table)
+            self.assertFalse(m.called)
+        self.assertTrue(np.array_equal(new._dist_margd_loglikelihood_array,
+                                       self.distance._dist_margd_loglikelihood_array))
+
+    def test_lookup_table_not_saved_by_default(self):
+        directory = os.path.join(self.outdir, 'default')
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(directory)
+        original = os.getcwd()
+        os.chdir(directory)
+        try:
+            new = bilby.gw.likelihood.GravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator,
+                distance_marginalization=True, priors=self.prior.copy())
+        finally:
+            os.chdir(original)
+        self.assertEqual([], os.listdir(directory))
+        self.assertTrue(np.array_equal(new._dist_margd_loglikelihood_array,
+                                       self.distance._dist_margd_loglikelihood_array))
+
+    def test_lookup_table_rebuilt_for_different_prior(self):
+        self.prior['luminosity_distance'] = bilby.prior.PowerLaw(
+            alpha=2, minimum=100, maximum=4000)
+        new = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            distance_marginalization=True, priors=self.prior.copy(),
+            distance_marginalization_lookup_table=self.lookup_table)
+        self.assertFalse(np.array_equal(new._dist_margd_loglikelihood_array,
+                                        self.distance._dist_margd_loglikelihood_array))
+        self.assertEqual(str(np.load(self.lookup_table)['hash']), new._lookup_table_hash)
+
+    def test_interpolant_evaluates_arrays(self):
+        rho_mf = np.array([30., 10., 20.])
+        values = self.distance._interp_dist_margd_loglikelihood(rho_mf, 40.)
+        for value, single in zip(values, rho_mf):
+            self.assertEqual(
+                value, self.distance._interp_dist_margd_loglikelihood(single, 40.)[0])
+
 
 class TestMarginalizedLikelihood(unittest.TestCase):
 
@@ -457,6 +641,569 @@ class TestTimePhaseMarginalization(unittest.TestCase):
                                delta=0.5)
 
 
+class TestSkyMarginalization(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 512
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - self.duration / 2)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator)
+
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = self.parameters['geocent_time']
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.prior.copy())
+        self.likelihood.parameters = self.parameters.copy()
+        self.sky_prior = self.prior.copy()
+        self.sky = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.sky_prior,
+            sky_marginalization=True, sky_marginalization_resolution=5.)
+        self.sky.parameters = self.parameters.copy()
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+        del self.likelihood
+        del self.sky_prior
+        del self.sky
+
+    def test_sky_prior_fixed(self):
+        self.assertEqual(float(0), self.sky_prior['ra'])
+        self.assertEqual(float(0), self.sky_prior['dec'])
+
+    def test_prior_weights_normalised(self):
+        self.assertAlmostEqual(1, np.sum(self.sky._sky_prior_weights))
+
+    def test_grid_matches_log_likelihood_ratio(self):
+        polarizations = self.waveform_generator.frequency_domain_strain(self.parameters)
+        log_l = self.sky._sky_grid_log_likelihood_ratio(polarizations)
+        self.assertEqual(len(self.sky._sky_ra), len(log_l))
+        for index in [0, 500, np.argmax(log_l)]:
+            self.likelihood.parameters['ra'] = self.sky._sky_ra[index]
+            self.likelihood.parameters['dec'] = self.sky._sky_dec[index]
+            expected = self.likelihood.log_likelihood_ratio()
+            self.assertAlmostEqual(expected, log_l[index], delta=1e-3 * max(1, abs(expected)))
+
+    def test_sky_marginalisation(self):
+        polarizations = self.waveform_generator.frequency_domain_strain(self.parameters)
+        log_l = self.sky._sky_grid_log_likelihood_ratio(polarizations)
+        self.assertAlmostEqual(
+            np.log(np.sum(np.exp(log_l) * self.sky._sky_prior_weights)),
+            self.sky.log_likelihood_ratio())
+
+    def test_phase_marginalisation(self):
+        sky_phase = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.prior.copy(),
+            sky_marginalization=True, phase_marginalization=True,
+            sky_marginalization_resolution=5.)
+        sky_phase.parameters = self.parameters.copy()
+        like = []
+        phases = np.linspace(0, 2 * np.pi, 1000)
+        for phase in phases:
+            self.sky.parameters['phase'] = phase
+            like.append(np.exp(self.sky.log_likelihood_ratio()))
+        marg_like = np.log(np.trapz(like, phases) / (2 * np.pi))
+        self.assertAlmostEqual(marg_like, sky_phase.log_likelihood_ratio(), delta=0.5)
+
+    def test_time_marginalization_raises_error(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.likelihood.GravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator, priors=self.prior.copy(),
+                sky_marginalization=True, time_marginalization=True)
+
+    def test_generate_sky_samples(self):
+        samples = pd.DataFrame({key: [self.parameters[key]] * 3 for key in self.parameters})
+        samples['ra'] = 0.
+        samples['dec'] = 0.
+        samples = bilby.gw.conversion.generate_sky_samples_from_marginalized_likelihood(
+            samples, self.sky)
+        self.assertEqual(3, len(samples))
+        self.assertTrue(all(samples['ra'] != 0))
+        self.assertTrue(np.all((samples['ra'] >= 0) & (samples['ra'] <= 2 * np.pi)))
+        self.assertTrue(np.all(abs(samples['dec']) <= np.pi / 2))
+
+    def test_generate_sky_samples_without_sky_marginalization(self):
+        sample = self.parameters.copy()
+        self.assertEqual(
+            sample, bilby.gw.conversion.generate_sky_samples_from_marginalized_likelihood(
+                sample.copy(), self.likelihood))
+
+
+class TestCalibrationMarginalization(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 512
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - self.duration / 2)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator)
+
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = self.parameters['geocent_time']
+        for interferometer in self.interferometers:
+            interferometer.calibration_model = bilby.gw.calibration.CubicSpline(
+                prefix='recalib_{}_'.format(interferometer.name), minimum_frequency=20,
+                maximum_frequency=256, n_points=5)
+            calibration_prior = bilby.gw.prior.CalibrationPriorDict.constant_uncertainty_spline(
+                amplitude_sigma=0.1, phase_sigma=0.1, minimum_frequency=20,
+                maximum_frequency=256, n_nodes=5, label=interferometer.name)
+            self.prior.update(calibration_prior)
+            self.parameters.update({key: prior.peak if 'frequency' in key else 0.
+                                    for key, prior in calibration_prior.items()})
+
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.prior.copy())
+        self.likelihood.parameters = self.parameters.copy()
+        self.calibration_prior = self.prior.copy()
+        self.calibration = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, priors=self.calibration_prior,
+            calibration_marginalization=True, number_of_response_curves=20)
+        self.calibration.parameters = self.parameters.copy()
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+        del self.likelihood
+        del self.calibration_prior
+        del self.calibration
+
+    def _draw(self, index):
+        return {key: draws[key][index] for draws in self.calibration._calibration_draws.values()
+                for key in draws}
+
+    def test_calibration_prior_fixed(self):
+        self.assertEqual(float(0), self.calibration_prior['recalib_H1_amplitude_0'])
+        self.assertEqual(float(0), self.calibration_prior['recalib_L1_phase_4'])
+        self.assertIsInstance(self.calibration_prior['recalib_L1_frequency_4'],
+                              bilby.core.prior.DeltaFunction)
+
+    def test_response_curves_shape(self):
+        for interferometer in self.interferometers:
+            shape = (20, len(interferometer.in_band_frequency_array))
+            self.assertEqual(
+                shape, self.calibration._calibration_conjugate_response_curves[interferometer.name].shape)
+            self.assertEqual(
+                shape, self.calibration._calibration_response_curves_squared[interferometer.name].shape)
+
+    def test_draws_match_log_likelihood_ratio(self):
+        polarizations = self.waveform_generator.frequency_domain_strain(self.parameters)
+        log_l = self.calibration._calibration_log_likelihood_ratio(polarizations)
+        self.assertEqual(20, len(log_l))
+        for index in [0, 7, 19]:
+            self.likelihood.parameters.update(self._draw(index))
+            self.assertAlmostEqual(self.likelihood.log_likelihood_ratio(), log_l[index])
+
+    def test_calibration_marginalisation(self):
+        expected = []
+        for index in range(20):
+            self.likelihood.parameters.update(self._draw(index))
+            expected.append(self.likelihood.log_likelihood_ratio())
+        self.assertAlmostEqual(
+            np.log(np.mean(np.exp(expected))), self.calibration.log_likelihood_ratio())
+
+    def test_time_marginalization_raises_error(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.likelihood.GravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator, priors=self.prior.copy(),
+                calibration_marginalization=True, time_marginalization=True)
+
+    def test_no_calibration_prior_raises_error(self):
+        prior = bilby.gw.prior.BBHPriorDict()
+        prior['geocent_time'] = self.parameters['geocent_time']
+        with self.assertRaises(ValueError):
+            bilby.gw.likelihood.GravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator, priors=prior,
+                calibration_marginalization=True)
+
+    def test_generate_calibration_samples(self):
+        samples = pd.DataFrame({key: [self.parameters[key]] * 3 for key in self.parameters})
+        samples = bilby.gw.conversion.generate_calibration_samples_from_marginalized_likelihood(
+            samples, self.calibration)
+        self.assertEqual(3, len(samples))
+        draws = self.calibration._calibration_draws['H1']['recalib_H1_amplitude_2']
+        self.assertTrue(all(value in draws for value in samples['recalib_H1_amplitude_2']))
+
+
+class TestRelativeBinningGWTransient(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 2048
+        self.start_time = 1126259640
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.start_time)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            start_time=self.start_time,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_frequency_sequence)
+        self.interferometers.inject_signal(
+            parameters=self.parameters,
+            waveform_generator=self.waveform_generator)
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = bilby.prior.Uniform(
+            minimum=self.parameters['geocent_time'] - 0.1,
+            maximum=self.parameters['geocent_time'] + 0.1)
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.start_time
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+
+    def _compare_to_gravitational_wave_transient(self, parameters, **kwargs):
+        full = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.prior.copy(), **kwargs)
+        binned = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            fiducial_parameters=self.parameters, priors=self.prior.copy(),
+            **kwargs)
+        full.parameters = parameters.copy()
+        binned.parameters = parameters.copy()
+        self.assertAlmostEqual(full.log_likelihood_ratio(),
+                               binned.log_likelihood_ratio(), delta=0.5)
+
+    def test_bins_cover_band(self):
+        binned = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            fiducial_parameters=self.parameters)
+        self.assertEqual(binned.bin_frequencies[0],
+                         self.interferometers[0].minimum_frequency)
+        self.assertEqual(binned.bin_frequencies[-1],
+                         self.interferometers[0].maximum_frequency)
+        self.assertEqual(len(binned.bin_frequencies), binned.number_of_bins + 1)
+        self.assertLess(binned.number_of_bins,
+                        len(self.waveform_generator.frequency_array) / 10)
+
+    def test_log_likelihood_ratio(self):
+        parameters = self.parameters.copy()
+        parameters['mass_1'] += 0.3
+        self._compare_to_gravitational_wave_transient(parameters)
+
+    def test_log_likelihood_ratio_at_fiducial_parameters(self):
+        full = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator)
+        binned = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            fiducial_parameters=self.parameters)
+        full.parameters = self.parameters.copy()
+        binned.parameters = self.parameters.copy()
+        self.assertAlmostEqual(full.log_likelihood_ratio(),
+                               binned.log_likelihood_ratio(), places=3)
+
+    def test_phase_marginalization(self):
+        parameters = self.parameters.copy()
+        parameters['mass_1'] += 0.3
+        parameters['phase'] = 0.
+        self._compare_to_gravitational_wave_transient(
+            parameters, phase_marginalization=True)
+
+    def test_time_marginalization(self):
+        parameters = self.parameters.copy()
+        parameters['mass_1'] += 0.3
+        parameters['geocent_time'] = self.start_time
+        self._compare_to_gravitational_wave_transient(
+            parameters, time_marginalization=True)
+
+    def test_likelihood_zero_when_waveform_is_none(self):
+        binned = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            fiducial_parameters=self.parameters)
+        binned.parameters = self.parameters.copy()
+        binned.parameters['mass_2'] = 32
+        self.assertEqual(binned.log_likelihood_ratio(), np.nan_to_num(-np.inf))
+
+
+class TestMultibandGWTransient(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 8
+        self.sampling_frequency = 1024
+        self.start_time = 1126259640
+        self.parameters = dict(
+            mass_1=10., mass_2=10., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=400., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259646.413, ra=1.375,
+            dec=-1.2108)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.start_time)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            start_time=self.start_time,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_frequency_sequence)
+        self.interferometers.inject_signal(
+            parameters=self.parameters,
+            waveform_generator=self.waveform_generator)
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = bilby.prior.Uniform(
+            minimum=self.parameters['geocent_time'] - 0.1,
+            maximum=self.parameters['geocent_time'] + 0.1)
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.start_time
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+
+    def _compare_to_gravitational_wave_transient(self, parameters, **kwargs):
+        full = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.prior.copy(), **kwargs)
+        banded = bilby.gw.likelihood.MultibandGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            reference_chirp_mass=8.5, priors=self.prior.copy(), **kwargs)
+        full.parameters = parameters.copy()
+        banded.parameters = parameters.copy()
+        self.assertAlmostEqual(full.log_likelihood_ratio(),
+                               banded.log_likelihood_ratio(), delta=0.5)
+
+    def test_bands(self):
+        banded = bilby.gw.likelihood.MultibandGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            reference_chirp_mass=8.5, priors=self.prior.copy())
+        self.assertGreater(banded.number_of_bands, 1)
+        self.assertEqual(banded.band_start_frequencies[0],
+                         self.interferometers[0].minimum_frequency)
+        self.assertTrue(np.all(np.diff(banded.band_start_frequencies) > 0))
+        self.assertTrue(np.array_equal(
+            banded.band_durations,
+            self.duration / 2 ** np.arange(banded.number_of_bands)))
+        self.assertLess(len(banded.banded_frequency_array),
+                        len(self.waveform_generator.frequency_array) / 2)
+
+    def test_band_windows_sum_to_one(self):
+        banded = bilby.gw.likelihood.MultibandGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            reference_chirp_mass=8.5, priors=self.prior.copy())
+        frequencies = self.interferometers[0].in_band_frequency_array
+        total = sum(banded._band_window(frequencies, band)
+                    for band in range(banded.number_of_bands))
+        self.assertTrue(np.allclose(total, 1))
+
+    def test_single_band_without_time_prior(self):
+        banded = bilby.gw.likelihood.MultibandGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            reference_chirp_mass=8.5)
+        self.assertEqual(banded.number_of_bands, 1)
+
+    def test_log_likelihood_ratio(self):
+        self._compare_to_gravitational_wave_transient(self.parameters)
+
+    def test_log_likelihood_ratio_away_from_injection(self):
+        parameters = self.parameters.copy()
+        parameters['mass_1'] += 0.1
+        parameters['geocent_time'] += 0.05
+        self._compare_to_gravitational_wave_transient(parameters)
+
+    def test_phase_marginalization(self):
+        parameters = self.parameters.copy()
+        parameters['phase'] = 0.
+        self._compare_to_gravitational_wave_transient(
+            parameters, phase_marginalization=True)
+
+    def test_likelihood_zero_when_waveform_is_none(self):
+        banded = bilby.gw.likelihood.MultibandGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            reference_chirp_mass=8.5, priors=self.prior.copy())
+        banded.parameters = self.parameters.copy()
+        banded.parameters['mass_2'] = 12
+        self.assertEqual(banded.log_likelihood_ratio(), np.nan_to_num(-np.inf))
+
+
+class TestROQGWTransient(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 2048
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        for interferometer in self.interferometers:
+            interferometer.maximum_frequency = 128
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=1126259640)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            start_time=1126259640,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_frequency_sequence)
+        self.interferometers.inject_signal(
+            parameters=self.parameters,
+            waveform_generator=self.waveform_generator)
+        self.prior = bilby.gw.prior.BBHPriorDict()
+        self.prior['geocent_time'] = bilby.prior.Uniform(
+            minimum=self.parameters['geocent_time'] - 0.1,
+            maximum=self.parameters['geocent_time'] + 0.1)
+
+        # the identity is a (trivial) reduced basis with every frequency as a node
+        self.nodes = self.interferometers[0].frequency_array[
+            self.interferometers[0].frequency_mask]
+        self.basis = np.eye(len(self.nodes))
+        self.likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator)
+        self.roq = bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            linear_matrix=self.basis, quadratic_matrix=self.basis,
+            frequency_nodes_linear=self.nodes,
+            frequency_nodes_quadratic=self.nodes, priors=self.prior)
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.prior
+        del self.nodes
+        del self.basis
+        del self.likelihood
+        del self.roq
+
+    def test_matches_gravitational_wave_transient(self):
+        for time_offset in [0, 0.0123, -0.0871]:
+            parameters = self.parameters.copy()
+            parameters['geocent_time'] += time_offset
+            self.likelihood.parameters = parameters.copy()
+            self.roq.parameters = parameters.copy()
+            self.assertAlmostEqual(self.likelihood.log_likelihood_ratio(),
+                                   self.roq.log_likelihood_ratio(), 2)
+
+    def test_noise_log_likelihood(self):
+        self.assertAlmostEqual(self.likelihood.noise_log_likelihood(),
+                               self.roq.noise_log_likelihood(), 5)
+
+    def test_time_outside_weight_table(self):
+        self.roq.parameters = self.parameters.copy()
+        self.roq.parameters['geocent_time'] += 1
+        self.assertEqual(self.roq.log_likelihood_ratio(), np.nan_to_num(-np.inf))
+
+    def test_bases_loaded_from_file(self):
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir('outdir')
+        np.save('outdir/linear_basis.npy', self.basis)
+        np.save('outdir/linear_nodes.npy', self.nodes)
+        roq = bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            linear_matrix=u'outdir/linear_basis.npy',
+            quadratic_matrix=self.basis,
+            frequency_nodes_linear=u'outdir/linear_nodes.npy',
+            frequency_nodes_quadratic=self.nodes, priors=self.prior)
+        self.assertIsInstance(roq.linear_matrix, np.memmap)
+        roq.parameters = self.parameters.copy()
+        self.roq.parameters = self.parameters.copy()
+        self.assertAlmostEqual(roq.log_likelihood_ratio(),
+                               self.roq.log_likelihood_ratio(), 5)
+        rmtree('outdir')
+
+    def test_no_time_range_raises_error(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.likelihood.ROQGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator,
+                linear_matrix=self.basis, quadratic_matrix=self.basis,
+                frequency_nodes_linear=self.nodes,
+                frequency_nodes_quadratic=self.nodes)
+
+    def test_time_range(self):
+        roq = bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            linear_matrix=self.basis, quadratic_matrix=self.basis,
+            frequency_nodes_linear=self.nodes,
+            frequency_nodes_quadratic=self.nodes,
+            time_range=(self.parameters['geocent_time'] - 0.1,
+                        self.parameters['geocent_time'] + 0.1))
+        self.assertTrue(np.array_equal(self.roq.weights['time_samples'],
+                                       roq.weights['time_samples']))
+
+    def test_inconsistent_basis_raises_error(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.likelihood.ROQGravitationalWaveTransient(
+                interferometers=self.interferometers,
+                waveform_generator=self.waveform_generator,
+                linear_matrix=self.basis[:, 1:], quadratic_matrix=self.basis,
+                frequency_nodes_linear=self.nodes,
+                frequency_nodes_quadratic=self.nodes, priors=self.prior)
+
+
 class TestBBHLikelihoodSetUp(unittest.TestCase):
 
     def setUp(self):
@@ -3,7 +3,9 @@ from __future__ import absolute_import
 import unittest
 from mock import MagicMock
 import mock
+import math
 import numpy as np
+import pandas as pd
 from bilby.core.likelihood import (
     Likelihood, GaussianLikelihood, PoissonLikelihood, StudentTLikelihood,
     Analytical1DLikelihood, ExponentialLikelihood, JointLikelihood)
@@ -17,6 +19,17 @@ class TestLikelihoodBase(unittest.TestCase):
     def tearDown(self):
         del self.likelihood
 
+    def test_base_log_likelihood_batch(self):
+        self.likelihood.parameters = dict(a=1)
+        self.assertTrue(np.all(np.isnan(
+            self.likelihood.log_likelihood_batch(np.array([[1], [2]])))))
+        self.assertEqual(self.likelihood.parameters, dict(a=1))
+
+    def test_base_log_likelihood_batch_wrong_shape(self):
+        self.likelihood.parameters = dict(a=1)
+        with self.assertRaises(ValueError):
+            self.likelihood.log_likelihood_batch(np.ones((2, 2)))
+
     def test_repr(self):
         self.likelihood = Likelihood(parameters=['a', 'b'])
         expected = 'Likelihood(parameters=[\'a\', \'b\'])'
@@ -195,6 +208,54 @@ class TestGaussianLikelihood(unittest.TestCase):
         with self.assertRaises(ValueError):
             likelihood.sigma = 'test'
 
+    def test_log_likelihood_batch_known_sigma(self):
+        likelihood = GaussianLikelihood(
+            self.x, self.y, self.function, self.sigma)
+        samples = np.random.uniform(0, 3, (10, 2))
+        expected = []
+        for m, c in samples:
+            likelihood.parameters.update(dict(m=m, c=c))
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(samples, keys=['m', 'c']), expected))
+
+    def test_log_likelihood_batch_unknown_sigma_dataframe(self):
+        likelihood = GaussianLikelihood(self.x, self.y, self.function)
+        samples = pd.DataFrame(dict(m=np.random.uniform(0, 3, 10),
+                                    c=np.random.uniform(0, 3, 10),
+                                    sigma=np.random.uniform(0.05, 1, 10)))
+        expected = []
+        for ii in range(len(samples)):
+            likelihood.parameters.update(samples.iloc[ii].to_dict())
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(samples), expected))
+
+    def test_log_likelihood_batch_fixed_parameter(self):
+        likelihood = GaussianLikelihood(
+            self.x, self.y, self.function, self.sigma)
+        likelihood.parameters['c'] = 1
+        expected = []
+        for m in [1, 2, 3]:
+            likelihood.parameters['m'] = m
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(dict(m=[1, 2, 3])), expected))
+
+    def test_log_likelihood_batch_non_broadcasting_function(self):
+        def scalar_function(x, m, c):
+            return np.array([m * math.sin(xx) + c for xx in x])
+
+        likelihood = GaussianLikelihood(
+            self.x, self.y, scalar_function, self.sigma)
+        samples = np.random.uniform(0, 3, (5, 2))
+        expected = []
+        for m, c in samples:
+            likelihood.parameters.update(dict(m=m, c=c))
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(samples, keys=['m', 'c']), expected))
+
     def test_repr(self):
         likelihood = GaussianLikelihood(
             self.x, self.y, self.function, sigma=self.sigma)
@@ -278,6 +339,25 @@ class TestStudentTLikelihood(unittest.TestCase):
 
         self.assertAlmostEqual(4.0, likelihood.lam)
 
+    def test_log_likelihood_batch_nu_none(self):
+        likelihood = StudentTLikelihood(self.x, self.y, self.function,
+                                        sigma=self.sigma)
+        samples = pd.DataFrame(dict(m=np.random.uniform(0, 3, 10),
+                                    c=np.random.uniform(0, 3, 10),
+                                    nu=np.random.uniform(1, 100, 10)))
+        expected = []
+        for ii in range(len(samples)):
+            likelihood.parameters.update(samples.iloc[ii].to_dict())
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(samples), expected))
+
+    def test_log_likelihood_batch_nu_negative(self):
+        likelihood = StudentTLikelihood(self.x, self.y, self.function,
+                                        sigma=self.sigma)
+        with self.assertRaises(ValueError):
+            likelihood.log_likelihood_batch(dict(m=[1, 2], c=[1, 2], nu=[1, -1]))
+
     def test_repr(self):
         nu = 0
         sigma = 0.5
@@ -383,6 +463,25 @@ class TestPoissonLikelihood(unittest.TestCase):
             m.return_value = 1
             self.assertEqual(1, poisson_likelihood.log_likelihood())
 
+    def test_log_likelihood_batch(self):
+        likelihood = PoissonLikelihood(self.x, self.y, self.function_array)
+        rates = np.array([0, 1, 4.5, 7])
+        expected = []
+        for rate in rates:
+            likelihood.parameters['c'] = rate
+            expected.append(likelihood.log_likelihood())
+        self.assertTrue(np.array_equal(
+            np.isinf(likelihood.log_likelihood_batch(dict(c=rates))),
+            np.isinf(expected)))
+        self.assertTrue(np.allclose(
+            likelihood.log_likelihood_batch(dict(c=rates))[1:], expected[1:]))
+
+    def test_log_likelihood_batch_negative_rate(self):
+        likelihood = PoissonLikelihood(self.x, self.y, self.function_array)
+        with self.assertRaises(ValueError) as context:
+            likelihood.log_likelihood_batch(dict(c=[1, -1]))
+        self.assertEqual(("Poisson rate function returns a negative value!",), context.exception.args)
+
     def test_repr(self):
         likelihood = PoissonLikelihood(
             self.x, self.y, self.function)
@@ -473,6 +572,17 @@ class TestExponentialLikelihood(unittest.TestCase):
             m.return_value = 3
             self.assertEqual(-3, exponential_likelihood.log_likelihood())
 
+    def test_log_likelihood_batch(self):
+        likelihood = ExponentialLikelihood(self.x, self.y, self.function_array)
+        means = np.array([-1, 1, 4.5, 7])
+        expected = []
+        for mean in means:
+            likelihood.parameters['c'] = mean
+            expected.append(likelihood.log_likelihood())
+        actual = likelihood.log_likelihood_batch(dict(c=means))
+        self.assertEqual(actual[0], -np.inf)
+        self.assertTrue(np.allclose(actual[1:], expected[1:]))
+
     def test_repr(self):
         expected = 'ExponentialLikelihood(x={}, y={}, func={})'.format(self.x, self.y, self.function.__name__)
         self.assertEqual(expected, repr(self.exponential_likelihood))
@@ -0,0 +1,95 @@
+from __future__ import absolute_import, division
+import os
+import unittest
+from shutil import rmtree
+import bilby
+import numpy as np
+
+
+class TestCoherentSkyMap(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 512
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1500., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1', 'V1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - self.duration / 2)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator)
+
+        ra = (np.arange(72) + 0.5) * 2 * np.pi / 72
+        sin_dec = -1 + (np.arange(23) + 0.5) * 2 / 23
+        ra, sin_dec = [array.flatten() for array in np.meshgrid(ra, sin_dec)]
+        self.ra = ra
+        self.dec = np.arcsin(sin_dec)
+
+        self.outdir = 'outdir'
+        bilby.core.utils.check_directory_exists_and_if_not_mkdir(self.outdir)
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors['luminosity_distance'] = bilby.prior.PowerLaw(
+            alpha=2, minimum=50, maximum=5000)
+
+    def tearDown(self):
+        rmtree(self.outdir)
+        del self.interferometers
+        del self.waveform_generator
+        del self.parameters
+        del self.ra
+        del self.dec
+        del self.priors
+
+    def _sky_map(self, **kwargs):
+        original = os.getcwd()
+        os.chdir(self.outdir)
+        try:
+            return bilby.gw.localization.coherent_sky_map(
+                self.interferometers, self.parameters, ra=self.ra, dec=self.dec,
+                priors=self.priors, time_window=0.005, **kwargs)
+        finally:
+            os.chdir(original)
+
+    def _peak_offset(self, sky_map):
+        """ The angle in degrees between the most probable sky location and
+        the injection """
+        peak = np.argmax(sky_map)
+        cos_angle = (np.sin(self.dec[peak]) * np.sin(self.parameters['dec']) +
+                     np.cos(self.dec[peak]) * np.cos(self.parameters['dec']) *
+                     np.cos(self.ra[peak] - self.parameters['ra']))
+        return np.degrees(np.arccos(min(cos_angle, 1)))
+
+    def test_marginalized_sky_map(self):
+        sky_map = self._sky_map(waveform_generator=self.waveform_generator)
+        self.assertEqual(len(self.ra), len(sky_map))
+        self.assertAlmostEqual(1, np.sum(sky_map))
+        self.assertLess(self._peak_offset(sky_map), 10)
+
+    def test_maximized_sky_map(self):
+        sky_map = self._sky_map(waveform_generator=self.waveform_generator,
+                                marginalize=False)
+        self.assertAlmostEqual(1, np.sum(sky_map))
+        self.assertLess(self._peak_offset(sky_map), 10)
+
+    def test_waveform_polarizations(self):
+        polarizations = self.waveform_generator.frequency_domain_strain(self.parameters)
+        expected = self._sky_map(waveform_generator=self.waveform_generator,
+                                 marginalize=False)
+        sky_map = self._sky_map(waveform_polarizations=polarizations, marginalize=False)
+        self.assertTrue(np.allclose(expected, sky_map))
+
+    def test_no_waveform_raises_error(self):
+        with self.assertRaises(ValueError):
+            self._sky_map()
+
+
+if __name__ == '__main__':
+    unittest.main()
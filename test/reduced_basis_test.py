@@ -0,0 +1,104 @@
+from __future__ import absolute_import, division
+import multiprocessing
+import unittest
+from shutil import rmtree
+import bilby
+import numpy as np
+import mock
+
+
+class TestReducedBasis(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(10)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=512,
+            frequency_domain_source_model=bilby.gw.source.sinegaussian)
+        self.priors = bilby.core.prior.PriorDict(dict(
+            hrss=1e-22, Q=bilby.core.prior.Uniform(8, 10),
+            frequency=bilby.core.prior.Uniform(95, 105)))
+        self.outdir = 'outdir'
+        self.filenames = bilby.gw.reduced_basis.build_roq_bases(
+            self.waveform_generator, self.priors, size=50, outdir=self.outdir,
+            label='test', linear_tolerance=1e-10, quadratic_tolerance=1e-10)
+        self.frequencies = bilby.gw.reduced_basis.get_basis_frequencies(
+            self.waveform_generator)
+
+    def tearDown(self):
+        rmtree(self.outdir)
+        del self.waveform_generator
+        del self.priors
+        del self.filenames
+        del self.frequencies
+
+    def test_output_shapes(self):
+        training_set = np.load(self.filenames['training_set'])
+        self.assertEqual(training_set.shape, (100, len(self.frequencies)))
+        for kind in ['linear', 'quadratic']:
+            basis = np.load(self.filenames['{}_basis'.format(kind)])
+            nodes = np.load(self.filenames['{}_nodes'.format(kind)])
+            self.assertEqual(basis.shape, (len(nodes), len(self.frequencies)))
+            self.assertLess(len(nodes), 100)
+            self.assertTrue(np.all(np.in1d(nodes, self.frequencies)))
+
+    def test_interpolant_reconstructs_training_set(self):
+        training_set = np.load(self.filenames['training_set'])
+        basis = np.load(self.filenames['linear_basis'])
+        nodes = np.load(self.filenames['linear_nodes'])
+        indices = np.searchsorted(self.frequencies, nodes)
+        for waveform in training_set[::7]:
+            reconstructed = basis.T.dot(waveform[indices])
+            self.assertLess(np.linalg.norm(reconstructed - waveform),
+                            1e-4 * np.linalg.norm(waveform))
+
+    def test_quadratic_interpolant_reconstructs_training_set(self):
+        training_set = abs(np.load(self.filenames['training_set'])) ** 2
+        basis = np.load(self.filenames['quadratic_basis'])
+        nodes = np.load(self.filenames['quadratic_nodes'])
+        indices = np.searchsorted(self.frequencies, nodes)
+        for waveform in training_set[::7]:
+            reconstructed = basis.T.dot(waveform[indices])
+            self.assertLess(np.linalg.norm(reconstructed - waveform),
+                            1e-4 * np.linalg.norm(waveform))
+
+    def test_greedy_basis_is_orthonormal(self):
+        filename = 'outdir/basis.npy'
+        size = bilby.gw.reduced_basis.greedy_reduced_basis(
+            self.filenames['training_set'], filename, tolerance=1e-10)
+        basis = np.load(filename)
+        self.assertEqual(basis.shape[0], size)
+        self.assertTrue(np.allclose(basis.conj().dot(basis.T), np.eye(size)))
+
+    def test_maximum_basis_size(self):
+        filename = 'outdir/basis.npy'
+        size = bilby.gw.reduced_basis.greedy_reduced_basis(
+            self.filenames['training_set'], filename, tolerance=1e-10,
+            maximum_basis_size=3)
+        self.assertEqual(size, 3)
+        self.assertEqual(np.load(filename).shape[0], 3)
+
+    def test_process_pool_matches_serial(self):
+        filename = 'outdir/training_set.npy'
+        np.random.seed(10)
+        bilby.gw.reduced_basis.generate_training_set(
+            filename, self.waveform_generator, self.priors, size=50, npool=2,
+            chunk_size=10)
+        self.assertTrue(np.array_equal(np.load(filename),
+                                       np.load(self.filenames['training_set'])))
+
+    def test_greedy_basis_pool_created_once(self):
+        expected_filename = 'outdir/expected_basis.npy'
+        expected_size = bilby.gw.reduced_basis.greedy_reduced_basis(
+            self.filenames['training_set'], expected_filename, tolerance=1e-10)
+        filename = 'outdir/basis.npy'
+        with mock.patch('multiprocessing.Pool', side_effect=multiprocessing.Pool) as m:
+            size = bilby.gw.reduced_basis.greedy_reduced_basis(
+                self.filenames['training_set'], filename, tolerance=1e-10,
+                npool=2, chunk_size=10)
+            self.assertEqual(1, m.call_count)
+        self.assertEqual(expected_size, size)
+        self.assertTrue(np.allclose(np.load(expected_filename), np.load(filename)))
+
+
+if __name__ == '__main__':
+    unittest.main()
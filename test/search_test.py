@@ -0,0 +1,94 @@
+from __future__ import absolute_import, division
+import unittest
+import bilby
+import numpy as np
+import pandas as pd
+
+
+class TestTemplateBankSearch(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(500)
+        self.duration = 4
+        self.sampling_frequency = 512
+        self.parameters = dict(
+            mass_1=31., mass_2=29., a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000., iota=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108)
+        self.interferometers = bilby.gw.detector.InterferometerList(['H1', 'L1'])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency, duration=self.duration,
+            start_time=self.parameters['geocent_time'] - self.duration / 2)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration, sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole)
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator)
+        intrinsic = ['mass_1', 'mass_2', 'a_1', 'a_2', 'tilt_1', 'tilt_2', 'phi_12', 'phi_jl']
+        self.bank = [dict(mass_1=mass, mass_2=mass, a_1=0., a_2=0., tilt_1=0., tilt_2=0.,
+                          phi_12=0., phi_jl=0.) for mass in [5., 10., 20.]]
+        self.bank.append({key: self.parameters[key] for key in intrinsic})
+        self.search = bilby.gw.search.TemplateBankSearch(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator, batch_size=2)
+
+    def tearDown(self):
+        del self.interferometers
+        del self.waveform_generator
+        del self.parameters
+        del self.bank
+        del self.search
+
+    def test_snr_matches_inner_products(self):
+        parameters = self.search._template(self.bank[-1])
+        snr = self.search.matched_filter_snr_time_series([parameters])[0]
+        polarizations = self.waveform_generator.frequency_domain_strain(parameters)
+        for interferometer, series in zip(self.interferometers, snr):
+            template = polarizations['plus'][interferometer.frequency_slice]
+            psd = interferometer.in_band_power_spectral_density_array
+            expected = bilby.gw.utils.noise_weighted_inner_product(
+                template, interferometer.in_band_frequency_domain_strain, psd,
+                self.duration) / bilby.gw.utils.noise_weighted_inner_product(
+                template, template, psd, self.duration) ** 0.5
+            self.assertAlmostEqual(expected, series[0])
+            self.assertEqual(len(self.search.times), len(series))
+
+    def test_search_finds_injection(self):
+        triggers = self.search.search(self.bank)
+        loudest = triggers.iloc[0]
+        self.assertEqual(3, loudest['template_index'])
+        self.assertLess(abs(loudest['geocent_time'] - self.parameters['geocent_time']), 0.02)
+        expected = sum(interferometer.meta_data['optimal_SNR'] ** 2
+                       for interferometer in self.interferometers) ** 0.5
+        self.assertLess(abs(loudest['network_snr'] - expected), 3)
+        for interferometer in self.interferometers:
+            self.assertLess(abs(loudest['{}_time'.format(interferometer.name)] -
+                                self.parameters['geocent_time']), 0.05)
+        self.assertTrue(np.all(np.diff(triggers['network_snr']) <= 0))
+
+    def test_triggers_are_clustered(self):
+        triggers = self.search.search(self.bank)
+        times = np.sort(triggers['geocent_time'].values)
+        self.assertTrue(np.all(np.diff(times) > self.search.cluster_window))
+
+    def test_search_template_bank_data_frame(self):
+        expected = self.search.search(self.bank)
+        triggers = self.search.search(pd.DataFrame(self.bank))
+        self.assertTrue(np.allclose(expected['network_snr'], triggers['network_snr']))
+
+    def test_search_pool(self):
+        expected = self.search.search(self.bank)
+        self.search.npool = 2
+        triggers = self.search.search(self.bank)
+        self.assertTrue(np.allclose(expected['network_snr'], triggers['network_snr']))
+        self.assertTrue(np.allclose(expected['geocent_time'], triggers['geocent_time']))
+
+    def test_no_triggers_below_threshold(self):
+        self.search.snr_threshold = 1000
+        triggers = self.search.search(self.bank)
+        self.assertEqual(0, len(triggers))
+
+
+if __name__ == '__main__':
+    unittest.main()
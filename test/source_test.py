@@ -0,0 +1,190 @@
+from __future__ import absolute_import, division
+import os
+import shutil
+import tempfile
+import unittest
+import bilby
+import mock
+import numpy as np
+
+
+class TestTaylorF2(unittest.TestCase):
+
+    def setUp(self):
+        self.frequency_array = np.arange(0, 1024.25, 0.25)
+        self.parameters = dict(
+            mass_1=1.5, mass_2=1.3, luminosity_distance=100., chi_1=0.05,
+            chi_2=-0.03, iota=0.4, phase=1.3, lambda_1=400., lambda_2=800.)
+        self.psd = bilby.gw.detector.PowerSpectralDensity.from_aligo()
+        self.psd_array = self.psd.power_spectral_density_interpolated(
+            self.frequency_array)
+
+    def tearDown(self):
+        del self.frequency_array
+        del self.parameters
+        del self.psd
+        del self.psd_array
+
+    def _overlap(self, waveform_1, waveform_2):
+        mask = (self.frequency_array >= 20) & np.isfinite(self.psd_array)
+
+        def inner_product(aa, bb):
+            return np.sum(np.conj(aa[mask]) * bb[mask] / self.psd_array[mask])
+
+        return (inner_product(waveform_1, waveform_2) /
+                (inner_product(waveform_1, waveform_1) *
+                 inner_product(waveform_2, waveform_2)) ** 0.5)
+
+    def test_matches_lal_binary_neutron_star(self):
+        expected = bilby.gw.source.lal_binary_neutron_star(
+            self.frequency_array, **self.parameters)
+        actual = bilby.gw.source.binary_neutron_star_taylor_f2(
+            self.frequency_array, **self.parameters)
+        for mode in ['plus', 'cross']:
+            overlap = self._overlap(expected[mode], actual[mode])
+            self.assertGreater(overlap.real, 0.9999)
+            self.assertLess(abs(overlap.imag), 1e-3)
+
+    def test_binary_black_hole_without_tides(self):
+        self.parameters['lambda_1'] = 0
+        self.parameters['lambda_2'] = 0
+        expected = bilby.gw.source.binary_neutron_star_taylor_f2(
+            self.frequency_array, **self.parameters)
+        self.parameters.pop('lambda_1')
+        self.parameters.pop('lambda_2')
+        actual = bilby.gw.source.binary_black_hole_taylor_f2(
+            self.frequency_array, **self.parameters)
+        self.assertTrue(np.array_equal(expected['plus'], actual['plus']))
+
+    def test_zero_below_minimum_frequency(self):
+        waveform = bilby.gw.source.binary_neutron_star_taylor_f2(
+            self.frequency_array, minimum_frequency=30, **self.parameters)
+        below = self.frequency_array < 30
+        self.assertTrue(np.all(waveform['plus'][below] == 0))
+        self.assertTrue(np.all(waveform['plus'][~below] != 0))
+
+    def test_unequal_mass_ordering_returns_none(self):
+        self.parameters['mass_2'] = 1.6
+        self.assertIsNone(bilby.gw.source.binary_neutron_star_taylor_f2(
+            self.frequency_array, **self.parameters))
+
+    def test_batch_matches_single_evaluations(self):
+        masses = np.array([1.3, 1.6, 1.2])
+        batch = self.parameters.copy()
+        batch['mass_2'] = masses[:, np.newaxis]
+        waveforms = bilby.gw.source.binary_neutron_star_taylor_f2(
+            self.frequency_array, **batch)
+        self.assertEqual(waveforms['plus'].shape, (3, len(self.frequency_array)))
+        self.assertTrue(np.all(np.isnan(waveforms['plus'][1])))
+        for ii in [0, 2]:
+            self.parameters['mass_2'] = masses[ii]
+            expected = bilby.gw.source.binary_neutron_star_taylor_f2(
+                self.frequency_array, **self.parameters)
+            self.assertTrue(np.allclose(expected['plus'], waveforms['plus'][ii]))
+            self.assertTrue(np.allclose(expected['cross'], waveforms['cross'][ii]))
+
+
+class TestSupernova(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+        self.frequency_array = np.linspace(0, 1024, 11)
+        self.real_pcs = np.random.normal(0, 1, (11, 7))
+        self.imag_pcs = np.random.normal(0, 1, (11, 7))
+        self.waveform = np.random.normal(0, 1, (11, 4))
+        self.file_path = os.path.join(self.outdir, 'waveform.txt')
+        np.savetxt(self.file_path, self.waveform)
+        self.coefficients = dict(pc_coeff1=0.1, pc_coeff2=-0.3, pc_coeff3=0.5,
+                                 pc_coeff4=0.2, pc_coeff5=-0.7)
+        bilby.gw.source.clear_supernova_cache()
+
+    def tearDown(self):
+        bilby.gw.source.clear_supernova_cache()
+        shutil.rmtree(self.outdir)
+        del self.frequency_array
+        del self.real_pcs
+        del self.imag_pcs
+        del self.waveform
+        del self.coefficients
+
+    def test_supernova(self):
+        waveform = bilby.gw.source.supernova(
+            self.frequency_array, file_path=self.file_path, luminosity_distance=5.)
+        scaling = 1e-3 * 10 / 5.
+        self.assertTrue(np.allclose(
+            waveform['plus'], scaling * (self.waveform[:, 0] + 1j * self.waveform[:, 1])))
+        self.assertTrue(np.allclose(
+            waveform['cross'], scaling * (self.waveform[:, 2] + 1j * self.waveform[:, 3])))
+
+    def test_supernova_file_read_once(self):
+        with mock.patch('numpy.loadtxt', side_effect=np.loadtxt) as m:
+            for _ in range(3):
+                bilby.gw.source.supernova(
+                    self.frequency_array, file_path=self.file_path, luminosity_distance=5.)
+            self.assertEqual(1, m.call_count)
+
+    def test_supernova_deprecated_arguments(self):
+        expected = bilby.gw.source.supernova(
+            self.frequency_array, file_path=self.file_path, luminosity_distance=5.)
+        with mock.patch('bilby.core.utils.logger.warning') as m:
+            waveform = bilby.gw.source.supernova(
+                self.frequency_array, self.real_pcs, self.imag_pcs, self.file_path, 5.)
+            self.assertTrue(m.called)
+        self.assertTrue(np.array_equal(expected['plus'], waveform['plus']))
+
+    def test_supernova_pca_model(self):
+        waveform = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=5., realPCs=self.real_pcs,
+            imagPCs=self.imag_pcs, **self.coefficients)
+        expected = np.zeros(len(self.frequency_array), dtype=complex)
+        for ii in range(5):
+            expected += self.coefficients['pc_coeff{}'.format(ii + 1)] * (
+                self.real_pcs[:, ii] + 1j * self.imag_pcs[:, ii])
+        expected *= 1e-23 * 10 / 5.
+        self.assertTrue(np.allclose(expected, waveform['plus']))
+        self.assertTrue(np.allclose(expected, waveform['cross']))
+
+    def test_supernova_pca_model_keyed_by_contents(self):
+        expected = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=5., realPCs=self.real_pcs,
+            imagPCs=self.imag_pcs, **self.coefficients)
+        with mock.patch('bilby.gw.source._load_text') as m:
+            bilby.gw.source.supernova_pca_model(
+                self.frequency_array, luminosity_distance=5., realPCs=self.real_pcs.copy(),
+                imagPCs=self.imag_pcs.copy(), **self.coefficients)
+            self.assertFalse(m.called)
+        real_pcs = self.real_pcs.copy()
+        real_pcs[:, 0] *= 2
+        actual = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=5., realPCs=real_pcs,
+            imagPCs=self.imag_pcs, **self.coefficients)
+        self.assertFalse(np.allclose(expected['plus'], actual['plus'], atol=0))
+
+    def test_supernova_pca_model_from_files(self):
+        real_path = os.path.join(self.outdir, 'real.txt')
+        imag_path = os.path.join(self.outdir, 'imag.txt')
+        np.savetxt(real_path, self.real_pcs)
+        np.savetxt(imag_path, self.imag_pcs)
+        expected = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=5., realPCs=self.real_pcs,
+            imagPCs=self.imag_pcs, **self.coefficients)
+        actual = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=5., realPCs=real_path,
+            imagPCs=imag_path, **self.coefficients)
+        self.assertTrue(np.allclose(expected['plus'], actual['plus']))
+
+    def test_supernova_pca_model_batch(self):
+        distances = np.array([[5.], [10.]])
+        waveforms = bilby.gw.source.supernova_pca_model(
+            self.frequency_array, luminosity_distance=distances,
+            realPCs=self.real_pcs, imagPCs=self.imag_pcs, **self.coefficients)
+        self.assertEqual((2, len(self.frequency_array)), waveforms['plus'].shape)
+        for ii in range(2):
+            expected = bilby.gw.source.supernova_pca_model(
+                self.frequency_array, luminosity_distance=distances[ii, 0],
+                realPCs=self.real_pcs, imagPCs=self.imag_pcs, **self.coefficients)
+            self.assertTrue(np.allclose(expected['plus'], waveforms['plus'][ii]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,20 @@ class TestFFT(unittest.TestCase):
         tds2 = bilby.core.utils.infft(fds, sampling_frequency)
         self.assertTrue(np.all(np.abs((tds - tds2) / tds) < 1e-12))
 
+    def test_nfft_odd_number_of_samples(self):
+        sampling_frequency = 10
+        tds = np.random.normal(0, 1, 11)
+        fds, freqs = bilby.core.utils.nfft(tds, sampling_frequency)
+        self.assertEqual(len(fds), len(freqs))
+        self.assertTrue(np.allclose(
+            fds, np.fft.rfft(np.append(tds, 0)) / sampling_frequency))
+
+    def test_rfft_rows(self):
+        tds = np.random.normal(0, 1, (2, 10))
+        fds = bilby.core.utils.rfft(tds, workers=2)
+        for ii in range(2):
+            self.assertTrue(np.allclose(fds[ii], np.fft.rfft(tds[ii])))
+
 
 class TestInferParameters(unittest.TestCase):
 
@@ -60,5 +74,42 @@ class TestInferParameters(unittest.TestCase):
         self.assertListEqual(expected, actual)
 
 
+class TestStageTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.timer = utils.StageTimer(enabled=True)
+
+    def tearDown(self):
+        del self.timer
+
+    def test_disabled_by_default(self):
+        timer = utils.StageTimer()
+        with timer('stage'):
+            pass
+        self.assertEqual(timer.report, dict())
+
+    def test_calls_and_time_are_recorded(self):
+        for _ in range(3):
+            with self.timer('stage'):
+                pass
+        report = self.timer.report
+        self.assertEqual(report['stage']['calls'], 3)
+        self.assertGreaterEqual(report['stage']['total_time'], 0)
+        self.assertAlmostEqual(report['stage']['mean_time'],
+                               report['stage']['total_time'] / 3)
+
+    def test_time_recorded_when_stage_raises(self):
+        with self.assertRaises(ValueError):
+            with self.timer('stage'):
+                raise ValueError
+        self.assertEqual(self.timer.report['stage']['calls'], 1)
+
+    def test_reset(self):
+        with self.timer('stage'):
+            pass
+        self.timer.reset()
+        self.assertEqual(self.timer.report, dict())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 from __future__ import absolute_import
+import pickle
 import unittest
 import bilby
 import numpy as np
@@ -16,6 +17,12 @@ def dummy_func_dict_return_value(frequency_array, amplitude, mu, sigma, ra, dec,
     return ht
 
 
+def dummy_func_intrinsic_return_value(frequency_array, amplitude, mu, sigma, **kwargs):
+    ht = {'plus': amplitude + mu + frequency_array + sigma,
+          'cross': amplitude + mu + frequency_array + sigma}
+    return ht
+
+
 class TestWaveformGeneratorInstantiationWithoutOptionalParameters(unittest.TestCase):
 
     def setUp(self):
@@ -100,6 +107,17 @@ class TestWaveformGeneratorInstantiationWithoutOptionalParameters(unittest.TestC
                              sorted(list(self.simulation_parameters.keys())))
 
 
+def dummy_func_analytic_return_value(frequency_array, amplitude, mu, sigma, **kwargs):
+    ht = {'plus': amplitude * (mu + frequency_array + sigma),
+          'cross': 2 * amplitude * (mu + frequency_array + sigma)}
+    return ht
+
+
+dummy_func_analytic_return_value.analytic_parameters = dict(
+    amplitude=bilby.gw.source.AnalyticParameter(
+        reference=1., rescale=bilby.gw.source._scale_linearly))
+
+
 class TestWaveformArgumentsSetting(unittest.TestCase):
     def setUp(self):
         self.waveform_generator = \
@@ -174,6 +192,35 @@ class TestSetters(unittest.TestCase):
                                                           parameter_conversion=conversion_func)
         self.assertEqual(conversion_func, self.waveform_generator.parameter_conversion)
 
+    def test_default_generator_can_be_pickled(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            1, 4096, frequency_domain_source_model=dummy_func_dict_return_value)
+        unpickled = pickle.loads(pickle.dumps(waveform_generator))
+        self.assertEqual(repr(waveform_generator), repr(unpickled))
+
+    def test_compiled_parameter_conversion(self):
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            1, 4096, frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+            parameter_conversion=bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters,
+            waveform_arguments=dict(reference_frequency=50.))
+        parameters = dict(chirp_mass=30., mass_ratio=0.8, a_1=0.1, a_2=0.2, tilt_1=0.3,
+                          cos_tilt_2=0.4, phi_12=0.5, phi_jl=0.6, iota=0.7, phase=0.8,
+                          luminosity_distance=400., ra=1., dec=0.2, psi=0.3, geocent_time=0.)
+        expected, _ = bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters(
+            parameters.copy())
+        expected = {key: expected[key] for key in self.waveform_generator.source_parameter_keys}
+        expected['reference_frequency'] = 50.
+        self.waveform_generator.parameters = parameters
+        self.assertDictEqual(expected, self.waveform_generator.parameters)
+        self.assertEqual(1, len(self.waveform_generator._compiled_conversions))
+
+    def test_setting_parameter_conversion_resets_compiled_conversions(self):
+        self.waveform_generator.parameters = self.simulation_parameters
+        self.waveform_generator.parameter_conversion = \
+            lambda parameters: (dict(parameters, amplitude=1), [])
+        self.waveform_generator.parameters = self.simulation_parameters
+        self.assertEqual(1, self.waveform_generator.parameters['amplitude'])
+
 
 class TestFrequencyDomainStrainMethod(unittest.TestCase):
 
@@ -211,36 +258,58 @@ class TestFrequencyDomainStrainMethod(unittest.TestCase):
         self.assertTrue(np.array_equal(expected['plus'], actual['plus']))
         self.assertTrue(np.array_equal(expected['cross'], actual['cross']))
 
+    def test_frequency_domain_source_model_call_with_frequency_array(self):
+        frequency_array = np.array([20., 35.5, 100., 1000.])
+        actual = self.waveform_generator.frequency_domain_strain(
+            parameters=self.simulation_parameters,
+            frequency_array=frequency_array)
+        expected = dummy_func_dict_return_value(
+            frequency_array, **self.simulation_parameters)
+        self.assertTrue(np.array_equal(expected['plus'], actual['plus']))
+        self.assertTrue(np.array_equal(expected['cross'], actual['cross']))
+
+    def test_frequency_array_without_frequency_domain_source_model(self):
+        self.waveform_generator.frequency_domain_source_model = None
+        self.waveform_generator.time_domain_source_model = dummy_func_dict_return_value
+        with self.assertRaises(ValueError):
+            self.waveform_generator.frequency_domain_strain(
+                parameters=self.simulation_parameters,
+                frequency_array=np.array([20., 40.]))
+
     def test_time_domain_source_model_call_with_ndarray(self):
         self.waveform_generator.frequency_domain_source_model = None
         self.waveform_generator.time_domain_source_model = dummy_func_array_return_value
 
-        def side_effect(value, value2):
-            return value
-
-        with mock.patch('bilby.core.utils.nfft') as m:
-            m.side_effect = side_effect
-            expected = self.waveform_generator.time_domain_strain(
-                parameters=self.simulation_parameters)
-            actual = self.waveform_generator.frequency_domain_strain(
-                parameters=self.simulation_parameters)
-            self.assertTrue(np.array_equal(expected, actual))
+        expected, _ = bilby.core.utils.nfft(
+            self.waveform_generator.time_domain_strain(parameters=self.simulation_parameters),
+            self.waveform_generator.sampling_frequency)
+        actual = self.waveform_generator.frequency_domain_strain(
+            parameters=self.simulation_parameters)
+        self.assertTrue(np.allclose(expected, actual))
 
     def test_time_domain_source_model_call_with_dict(self):
         self.waveform_generator.frequency_domain_source_model = None
         self.waveform_generator.time_domain_source_model = dummy_func_dict_return_value
 
-        def side_effect(value, value2):
-            return value, self.waveform_generator.frequency_array
+        time_domain_strain = self.waveform_generator.time_domain_strain(
+            parameters=self.simulation_parameters)
+        actual = self.waveform_generator.frequency_domain_strain(
+            parameters=self.simulation_parameters)
+        for mode in ['plus', 'cross']:
+            expected, _ = bilby.core.utils.nfft(
+                time_domain_strain[mode], self.waveform_generator.sampling_frequency)
+            self.assertTrue(np.allclose(expected, actual[mode]))
 
-        with mock.patch('bilby.core.utils.nfft') as m:
-            m.side_effect = side_effect
-            expected = self.waveform_generator.time_domain_strain(
-                parameters=self.simulation_parameters)
-            actual = self.waveform_generator.frequency_domain_strain(
-                parameters=self.simulation_parameters)
-            self.assertTrue(np.array_equal(expected['plus'], actual['plus']))
-            self.assertTrue(np.array_equal(expected['cross'], actual['cross']))
+    def test_time_domain_source_model_odd_number_of_samples(self):
+        self.waveform_generator.frequency_domain_source_model = None
+        self.waveform_generator.time_domain_source_model = dummy_func_dict_return_value
+        self.waveform_generator.fft_workers = 2
+        time_array = np.arange(4095) / 4096
+        time_domain_strain = dummy_func_dict_return_value(time_array, **self.simulation_parameters)
+        actual = self.waveform_generator._nfft_polarizations(time_domain_strain)
+        for mode in ['plus', 'cross']:
+            expected, _ = bilby.core.utils.nfft(time_domain_strain[mode], 4096)
+            self.assertTrue(np.allclose(expected, actual[mode]))
 
     def test_no_source_model_given(self):
         self.waveform_generator.time_domain_source_model = None
@@ -355,5 +424,229 @@ class TestTimeDomainStrainMethod(unittest.TestCase):
                              sorted(['amplitude', 'mu', 'sigma', 'ra', 'dec', 'geocent_time', 'psi']))
 
 
+class TestWaveformCache(unittest.TestCase):
+
+    def setUp(self):
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_intrinsic_return_value,
+            cache_size=2)
+        self.simulation_parameters = dict(amplitude=1e-2, mu=100, sigma=1,
+                                          ra=1.375, dec=-1.2108,
+                                          geocent_time=1126259642.413,
+                                          psi=2.659)
+
+    def tearDown(self):
+        del self.waveform_generator
+        del self.simulation_parameters
+
+    def test_extrinsic_parameters_reuse_waveform(self):
+        first = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.simulation_parameters['ra'] = 0.3
+        self.simulation_parameters['psi'] = 0.1
+        second = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertIs(first['plus'], second['plus'])
+        self.assertEqual(self.waveform_generator.cache_statistics,
+                         dict(hits=1, misses=1, size=1, nbytes=first['plus'].nbytes * 2))
+
+    def test_intrinsic_parameters_change_waveform(self):
+        first = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.simulation_parameters['mu'] = 200
+        second = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertFalse(np.array_equal(first['plus'], second['plus']))
+        self.assertEqual(self.waveform_generator.cache_statistics['misses'], 2)
+
+    def test_cached_arrays_are_read_only(self):
+        waveform = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        with self.assertRaises(ValueError):
+            waveform['plus'] *= 2
+        waveform['plus'] = None
+        waveform = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertIsNotNone(waveform['plus'])
+
+    def test_least_recently_used_waveform_is_removed(self):
+        for mu in [100, 200, 100, 300, 100]:
+            self.simulation_parameters['mu'] = mu
+            self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.waveform_generator.cache_statistics['hits'], 2)
+        self.assertEqual(self.waveform_generator.cache_statistics['size'], 2)
+
+    def test_memory_limit(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_intrinsic_return_value,
+            cache_size=10, cache_memory_limit=100)
+        waveform = waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(waveform_generator.cache_statistics['size'], 0)
+        waveform['plus'] *= 2
+
+    def test_frequency_array_in_key(self):
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        frequency_array = np.array([20., 35.5, 100., 1000.])
+        actual = self.waveform_generator.frequency_domain_strain(
+            self.simulation_parameters, frequency_array=frequency_array)
+        self.assertEqual(len(actual['plus']), 4)
+
+    def test_waveform_arguments_in_key(self):
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.waveform_generator.waveform_arguments['approximant'] = 'other'
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.waveform_generator.cache_statistics['misses'], 2)
+
+    def test_disabled_cache(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_intrinsic_return_value,
+            cache_size=0)
+        first = waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        second = waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertIsNot(first['plus'], second['plus'])
+        first['plus'] *= 2
+
+    def test_disabled_by_default(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_intrinsic_return_value)
+        waveform = waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        waveform['plus'] *= 2
+        self.assertEqual(waveform_generator.cache_statistics['size'], 0)
+
+    def test_invalidate_cache(self):
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.waveform_generator.invalidate_cache()
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.waveform_generator.cache_statistics['misses'], 2)
+
+
+class TestAnalyticRescaling(unittest.TestCase):
+
+    def setUp(self):
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_analytic_return_value,
+            analytic_rescaling=True)
+        self.simulation_parameters = dict(amplitude=1e-2, mu=100, sigma=1)
+
+    def tearDown(self):
+        del self.waveform_generator
+        del self.simulation_parameters
+
+    def test_rescaled_waveform_matches_source_model(self):
+        for amplitude in [1e-2, 3e-2, 1.]:
+            self.simulation_parameters['amplitude'] = amplitude
+            actual = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+            expected = dummy_func_analytic_return_value(
+                self.waveform_generator.frequency_array, **self.simulation_parameters)
+            self.assertTrue(np.allclose(expected['plus'], actual['plus']))
+            self.assertTrue(np.allclose(expected['cross'], actual['cross']))
+
+    def test_analytic_parameter_reuses_waveform(self):
+        for amplitude in [1e-2, 3e-2, 1.]:
+            self.simulation_parameters['amplitude'] = amplitude
+            self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.waveform_generator.cache_statistics['misses'], 1)
+        self.assertEqual(self.waveform_generator.cache_statistics['hits'], 2)
+
+    def test_incorrect_rescaling_is_not_used(self):
+        def source_model(frequency_array, amplitude, mu, sigma, **kwargs):
+            return dummy_func_analytic_return_value(frequency_array, amplitude ** 2, mu, sigma)
+
+        source_model.analytic_parameters = dummy_func_analytic_return_value.analytic_parameters
+        self.waveform_generator.frequency_domain_source_model = source_model
+        actual = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        expected = source_model(self.waveform_generator.frequency_array,
+                                **self.simulation_parameters)
+        self.assertTrue(np.allclose(expected['plus'], actual['plus']))
+
+    def test_disabled_by_default(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_analytic_return_value,
+            cache_size=1)
+        for amplitude in [1e-2, 3e-2]:
+            self.simulation_parameters['amplitude'] = amplitude
+            waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(waveform_generator.cache_statistics['misses'], 2)
+
+    def test_sinegaussian_hrss(self):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=bilby.gw.source.sinegaussian,
+            analytic_rescaling=True)
+        parameters = dict(hrss=1e-22, Q=9, frequency=200)
+        actual = waveform_generator.frequency_domain_strain(parameters)
+        expected = bilby.gw.source.sinegaussian(
+            waveform_generator.frequency_array, **parameters)
+        self.assertTrue(np.allclose(expected['plus'], actual['plus'], atol=0, rtol=1e-10))
+        self.assertTrue(np.allclose(expected['cross'], actual['cross'], atol=0, rtol=1e-10))
+
+
+
+class TestFrequencyDomainStrainBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=bilby.gw.source.sinegaussian)
+        self.samples = dict(hrss=np.array([1e-22, 2e-22, 3e-22]),
+                            Q=np.array([5., 9., 12.]),
+                            frequency=np.array([100., 200., 300.]))
+
+    def tearDown(self):
+        del self.waveform_generator
+        del self.samples
+
+    def expected(self, model):
+        return [model(self.waveform_generator.frequency_array,
+                      **{key: self.samples[key][ii] for key in self.samples})
+                for ii in range(3)]
+
+    def test_vectorized_model(self):
+        actual = self.waveform_generator.frequency_domain_strain_batch(self.samples)
+        for ii, expected in enumerate(self.expected(bilby.gw.source.sinegaussian)):
+            self.assertEqual(actual['plus'].shape, (3, len(self.waveform_generator.frequency_array)))
+            self.assertTrue(np.allclose(expected['plus'], actual['plus'][ii]))
+            self.assertTrue(np.allclose(expected['cross'], actual['cross'][ii]))
+
+    def test_model_which_is_not_vectorized(self):
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_intrinsic_return_value)
+        self.samples = dict(amplitude=np.array([1., 2., 3.]), mu=np.array([10., 20., 30.]),
+                            sigma=np.array([1., 1., 2.]))
+        actual = self.waveform_generator.frequency_domain_strain_batch(self.samples)
+        for ii, expected in enumerate(self.expected(dummy_func_intrinsic_return_value)):
+            self.assertTrue(np.allclose(expected['plus'], actual['plus'][ii]))
+
+    def test_array_of_parameters(self):
+        keys = ['hrss', 'Q', 'frequency']
+        actual = self.waveform_generator.frequency_domain_strain_batch(
+            np.array([self.samples[key] for key in keys]).T, keys=keys)
+        expected = self.waveform_generator.frequency_domain_strain_batch(self.samples)
+        self.assertTrue(np.array_equal(expected['plus'], actual['plus']))
+
+    def test_array_of_parameters_without_keys(self):
+        with self.assertRaises(ValueError):
+            self.waveform_generator.frequency_domain_strain_batch(np.ones((3, 3)))
+
+    def test_failed_waveforms_are_nan(self):
+        def source_model(frequency_array, amplitude, mu, sigma, **kwargs):
+            if amplitude < 0:
+                return None
+            return dummy_func_intrinsic_return_value(frequency_array, amplitude, mu, sigma)
+
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1, sampling_frequency=4096, frequency_domain_source_model=source_model)
+        actual = self.waveform_generator.frequency_domain_strain_batch(
+            dict(amplitude=[1., -1.], mu=[10., 10.], sigma=[1., 1.]))
+        self.assertFalse(np.any(np.isnan(actual['plus'][0])))
+        self.assertTrue(np.all(np.isnan(actual['plus'][1])))
+
+    def test_parameters_not_changed(self):
+        self.waveform_generator.parameters = dict(hrss=1e-21, Q=3, frequency=50)
+        self.waveform_generator.frequency_domain_strain_batch(self.samples)
+        self.assertEqual(self.waveform_generator.parameters['hrss'], 1e-21)
+
+
 if __name__ == '__main__':
     unittest.main()